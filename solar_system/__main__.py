@@ -0,0 +1,4 @@
+# coding:utf-8
+from solar_system.main import solar_main
+
+solar_main.main()
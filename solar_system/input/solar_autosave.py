@@ -0,0 +1,213 @@
+# coding:utf-8
+# license: GPLv3
+
+import concurrent.futures
+import os
+import re
+import time
+
+from solar_system.input import solar_input
+
+# сколько последних автосохранений хранить по умолчанию
+KEEP = 5
+
+# имя файла автосохранения: префикс и номер сохранения
+AUTOSAVE_NAME = "{prefix}{number:06d}.yaml"
+
+# префикс временного файла, который после записи переименовывается
+TEMP_PREFIX = ".saving-"
+
+# через сколько записанных объектов поток сохранения уступает GIL
+# (иначе основной поток ждет его до интервала переключения потоков,
+# и кадры отрисовки запаздывают)
+YIELD_EVERY = 100
+
+
+class ModelSaver:
+    '''
+    Класс, сохраняющий модель в фоновом потоке: в основном потоке
+    копируются только массивы состояния объектов, а запись файла
+    идет в отдельном потоке (во временный файл, который затем
+    атомарно заменяет сохранение, так что при падении программы
+    остается последнее целое сохранение)
+
+    Кроме сохранений по запросу умеет делать автосохранения через
+    заданное модельное или реальное время, храня несколько
+    последних из них
+    '''
+
+    def __init__(self):
+        '''
+        Функция, инициализирующая сохранение модели
+        (автосохранение по умолчанию выключено)
+        '''
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="model-saver")
+
+        self.directory = None
+        self.prefix = None
+        self.every_time = None
+        self.every_wall = None
+        self.keep = KEEP
+        self.number = 0
+
+        # последнее начатое сохранение (сохранения записываются по
+        # очереди, поэтому его завершение означает завершение всех)
+        self.last = None
+
+        # модельное и реальное время последнего автосохранения и
+        # незавершенное автосохранение (объект Future)
+        self.last_time = None
+        self.last_wall = None
+        self.pending = None
+
+    def enable(self, directory, every_time=None, every_wall=None,
+               keep=KEEP, prefix="autosave-"):
+        '''
+        Функция, включающая автосохранение
+        :param directory: папка для автосохранений
+        :param every_time: модельное время между автосохранениями
+                           в секундах (None - не учитывается)
+        :param every_wall: реальное время между автосохранениями
+                           в секундах (None - не учитывается)
+        :param keep: сколько последних автосохранений хранить
+        :param prefix: начало имен файлов автосохранений
+        '''
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.every_time = every_time
+        self.every_wall = every_wall
+        self.keep = keep
+
+        # нумерация продолжается после сохранений прошлых запусков
+        numbers = [number for number, _ in self.find_autosaves()]
+        self.number = max(numbers, default=0) + 1
+
+    def save(self, model, header, filename):
+        '''
+        Функция, сохраняющая модель в файл в фоновом потоке
+        :param model: объект Model, который нужно сохранить
+        :param header: словарь с параметрами модели (без "Objects")
+        :param filename: имя файла сохранения
+        Возвращает объект Future, завершающийся после записи файла
+        '''
+        objs = model.space_objs.copy()
+        self.last = self.executor.submit(self.write, objs, dict(header),
+                                         filename)
+        return self.last
+
+    def flush(self):
+        '''
+        Функция, дожидающаяся записи всех начатых сохранений (например,
+        перед загрузкой модели, которая могла только что сохраняться)
+        '''
+        if self.last is not None:
+            self.last.result()
+
+    def due(self, model_time):
+        '''
+        Функция, проверяющая, пора ли делать автосохранение
+        (пока предыдущее не записано, новое не делается)
+        :param model_time: текущее время модели
+        '''
+        if self.directory is None:
+            return False
+
+        now = time.monotonic()
+        # отсчет начинается заново после загрузки модели или
+        # перехода назад по времени
+        if self.last_time is None or model_time < self.last_time:
+            self.last_time = model_time
+            self.last_wall = now
+            return False
+
+        if self.pending is not None and not self.pending.done():
+            return False
+
+        return (self.every_time is not None and
+                model_time - self.last_time >= self.every_time) or \
+            (self.every_wall is not None and
+             now - self.last_wall >= self.every_wall)
+
+    def autosave(self, model, header):
+        '''
+        Функция, делающая очередное автосохранение модели
+        :param model: объект Model, который нужно сохранить
+        :param header: словарь с параметрами модели (без "Objects")
+        '''
+        self.last_time = model.time
+        self.last_wall = time.monotonic()
+
+        filename = os.path.join(self.directory, AUTOSAVE_NAME.format(
+            prefix=self.prefix, number=self.number))
+        self.number += 1
+
+        self.pending = self.save(model, header, filename)
+        self.pending.add_done_callback(lambda future: self.rotate())
+
+    def find_autosaves(self):
+        '''
+        Функция, возвращающая список пар (номер, путь) автосохранений
+        в папке автосохранений, упорядоченный по номерам
+        '''
+        pattern = re.compile(re.escape(self.prefix) + r"(\d+)\.yaml")
+        autosaves = []
+        for name in os.listdir(self.directory):
+            match = pattern.fullmatch(name)
+            if match is not None:
+                autosaves.append((int(match.group(1)),
+                                  os.path.join(self.directory, name)))
+
+        return sorted(autosaves)
+
+    def rotate(self):
+        '''
+        Функция, удаляющая старые автосохранения сверх self.keep
+        '''
+        autosaves = self.find_autosaves()
+        for _, path in autosaves[:max(0, len(autosaves) - self.keep)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def write(objs, header, filename):
+        '''
+        Функция, записывающая копию объектов модели во временный файл
+        и заменяющая им файл сохранения (выполняется в фоновом потоке)
+        :param objs: копия объекта Objects
+        :param header: словарь с параметрами модели
+        :param filename: имя файла сохранения
+        '''
+        directory, name = os.path.split(filename)
+        temp = os.path.join(directory, TEMP_PREFIX + name)
+        try:
+            solar_input.write_model_stream(temp, header,
+                                           paced(objs.iter_dump()))
+            os.replace(temp, filename)
+
+        except Exception as error:
+            print(f"Failed to save {filename}: {error}")
+            if os.path.exists(temp):
+                os.remove(temp)
+
+    def close(self):
+        '''
+        Функция, дожидающаяся записи всех начатых сохранений
+        '''
+        self.executor.shutdown(wait=True)
+
+
+def paced(objects):
+    '''
+    Генератор, выдающий описания объектов и время от времени
+    уступающий GIL другим потокам
+    objects — итератор описаний объектов
+    '''
+
+    for i, obj_data in enumerate(objects):
+        if i % YIELD_EVERY == 0:
+            time.sleep(0)
+        yield obj_data
@@ -0,0 +1,151 @@
+# coding:utf-8
+# license: GPLv3
+import json
+import math
+import os
+
+from solar_system.input import solar_input
+
+# имя файла индекса в папке сценариев и версия его формата
+INDEX_NAME = ".catalog.json"
+INDEX_VERSION = 1
+
+# расширения файлов сценариев
+EXTENSIONS = (".yaml", ".yml", ".jsonl")
+
+# ключи, по которым можно сортировать каталог
+SORT_KEYS = ("name", "bodies", "mass", "extent", "time scale", "mtime")
+
+
+def scan_file(path):
+    """Считывает сценарий и возвращает словарь с его описанием для каталога
+    path — путь к файлу сценария
+    """
+
+    header, columns = solar_input.read_model_stream(path)
+    x, y = columns["x"], columns["y"]
+    extent = max(max(x) - min(x), max(y) - min(y)) if len(x) else 0.0
+
+    return {
+            "bodies": len(x),
+            "particles": sum(columns["particle"]),
+            "mass": math.fsum(columns["m"]),
+            "extent": extent,
+            "time scale": header.get("Time scale"),
+            "format": "jsonl" if solar_input.is_json_lines(path) else "yaml",
+            "header": header
+           }
+
+
+class Catalog:
+    """Каталог сценариев папки: описания файлов (кол-во объектов, общая масса,
+    размер системы, масштаб времени, формат, время изменения) хранятся
+    в файле индекса и пересчитываются только для изменившихся файлов
+    """
+
+    def __init__(self, directory):
+        """directory — папка со сценариями
+        """
+
+        self.directory = directory
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """Считывает индекс (если его нет или он другой версии, каталог пуст)
+        """
+
+        try:
+            with open(self.index_path, 'r') as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+
+        if index.get("version") == INDEX_VERSION:
+            self.entries = index["entries"]
+
+    def save(self):
+        """Записывает индекс (через временный файл, чтобы индекс не мог
+        оказаться записанным наполовину)
+        """
+
+        temp_path = self.index_path + ".tmp"
+        try:
+            with open(temp_path, 'w') as index_file:
+                json.dump({"version": INDEX_VERSION, "entries": self.entries},
+                          index_file)
+            os.replace(temp_path, self.index_path)
+        except OSError:
+            # папка только для чтения: каталог остается в памяти
+            pass
+
+    def update(self, progress=None):
+        """Пересчитывает описания новых и изменившихся файлов и удаляет
+        описания удаленных, после чего сохраняет индекс
+        progress — функция, принимающая долю просмотренных файлов
+                   (от 0 до 1), по умолчанию не вызывается
+        Возвращает кол-во пересчитанных файлов
+        """
+
+        names = sorted(name for name in os.listdir(self.directory)
+                       if name.endswith(EXTENSIONS))
+        changed = len(set(self.entries) - set(names))
+        entries = {}
+
+        for i, name in enumerate(names):
+            if progress is not None:
+                progress(i / len(names))
+
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+
+            entry = self.entries.get(name)
+            if entry is None or entry["mtime"] != stat.st_mtime or \
+                    entry["size"] != stat.st_size:
+                try:
+                    entry = scan_file(path)
+                except Exception as error:
+                    entry = {"error": str(error)}
+                entry.update(name=name, mtime=stat.st_mtime,
+                             size=stat.st_size)
+                changed += 1
+            entries[name] = entry
+
+        self.entries = entries
+        if changed:
+            self.save()
+
+        return changed
+
+    def query(self, text="", sort="name", reverse=False):
+        """Возвращает список описаний сценариев, в имени которых есть text,
+        упорядоченный по ключу sort (нечитаемые файлы идут в конце)
+        text — строка для отбора по имени (без учета регистра)
+        sort — ключ сортировки из SORT_KEYS
+        reverse — флаг обратного порядка
+        """
+
+        text = text.lower()
+        found = [entry for entry in self.entries.values()
+                 if text in entry["name"].lower()]
+
+        readable = [entry for entry in found
+                    if entry.get(sort) is not None]
+        readable.sort(key=lambda entry: entry[sort], reverse=reverse)
+        return readable + [entry for entry in found
+                           if entry.get(sort) is None]
+
+    def get_path(self, name):
+        """Возвращает путь к файлу сценария из каталога
+        name — имя файла сценария
+        """
+
+        return os.path.join(self.directory, name)
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,283 @@
+# coding:utf-8
+# license: GPLv3
+import array
+import json
+import math
+import os
+
+# размер буфера при потоковой записи файлов модели
+WRITE_BUFFER = 2 ** 20
+
+# числовые параметры и флаги космического объекта в файле модели
+OBJECT_NUMBERS = ("x", "y", "v_x", "v_y", "r", "m")
+OBJECT_FLAGS = ("particle", "kepler")
+
+# через сколько объектов сообщать о ходе потокового чтения
+PROGRESS_EVERY = 1000
+
+
+def read_data_from_file(input_filename):
+    """Cчитывает весь YAML-файл модели в память одним документом.
+    Программа читает модели потоково (read_model_stream), а эта функция
+    остаётся эталоном, с которым сверяется потоковый разбор
+    input_filename — имя входного файла
+    """
+
+    # yaml импортируется при первом чтении, а не при запуске программы
+    import yaml
+
+    with open(input_filename, 'r') as file:
+        return yaml.safe_load(file)
+
+
+def write_data_to_file(output_filename, data):
+    """Сохраняет данные о космических объектах в файл одним документом
+    (эталон для write_model_stream)
+    Параметры:
+
+    **output_filename** — имя выходного файла
+
+    **data** — данные, которые нужно записать
+    """
+    import yaml
+
+    with open(output_filename, 'w') as out_file:
+        yaml.safe_dump(data, out_file)
+
+
+def is_json_lines(filename):
+    """Проверяет, хранится ли модель в формате JSON lines (первая строка —
+    параметры модели, каждая следующая — один объект), а не в YAML
+    filename — имя файла модели
+    """
+
+    return filename.endswith(".jsonl")
+
+
+def write_model_stream(output_filename, header, objects):
+    """Сохраняет модель в файл по одному объекту, не собирая весь документ
+    в памяти. Формат выбирается по расширению (.jsonl — JSON lines,
+    иначе YAML с той же схемой, что и у write_data_to_file)
+    Параметры:
+
+    **output_filename** — имя выходного файла
+
+    **header** — словарь с параметрами модели (без ключа "Objects")
+
+    **objects** — итератор словарей с описаниями объектов
+    """
+
+    with open(output_filename, 'w', buffering=WRITE_BUFFER) as out_file:
+        if is_json_lines(output_filename):
+            out_file.write(json.dumps(header) + "\n")
+            for obj_data in objects:
+                out_file.write(json.dumps(obj_data) + "\n")
+            return
+
+        import yaml
+
+        if header:
+            out_file.write(yaml.safe_dump(header, default_flow_style=False))
+
+        # каждый объект записывается одной строкой в потоковом стиле YAML,
+        # пустой список объектов записывается явно
+        out_file.write("Objects:")
+        count = 0
+        for obj_data in objects:
+            out_file.write("\n- {" + ", ".join(
+                f"{key}: {yaml_value(value)}"
+                for key, value in obj_data.items()) + "}")
+            count += 1
+        out_file.write("\n" if count else " []\n")
+
+
+def yaml_value(value):
+    """Записывает число, флаг или список чисел в виде, который YAML
+    прочитает обратно как то же значение
+    value — записываемое значение
+    """
+
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ".nan"
+        if math.isinf(value):
+            return ".inf" if value > 0 else "-.inf"
+        # YAML 1.1 считает числом с порядком только запись с точкой
+        text = repr(value)
+        if "." not in text and "e" in text:
+            text = text.replace("e", ".0e", 1)
+        return text
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(yaml_value(item) for item in value) + "]"
+    return json.dumps(str(value))
+
+
+def read_model_stream(input_filename, progress=None):
+    """Считывает модель из файла по одному объекту, складывая параметры
+    объектов в столбцы и не храня весь разобранный документ в памяти.
+    Формат выбирается по расширению (.jsonl — JSON lines, иначе YAML)
+    input_filename — имя входного файла
+    progress — функция, принимающая долю уже прочитанного файла
+               (от 0 до 1), по умолчанию не вызывается
+    Возвращает пару из словаря параметров модели (без ключа "Objects") и
+    словаря столбцов объектов: array.array для чисел и флагов, список
+    для цветов
+    """
+
+    columns = {key: array.array('d') for key in OBJECT_NUMBERS}
+    columns.update((key, array.array('b')) for key in OBJECT_FLAGS)
+    columns["color"] = []
+
+    def add_object(obj_data):
+        for key in OBJECT_NUMBERS:
+            columns[key].append(obj_data[key])
+        for key in OBJECT_FLAGS:
+            columns[key].append(bool(obj_data.get(key, False)))
+        columns["color"].append(obj_data["color"])
+
+        if progress is not None and len(columns["color"]) % \
+                PROGRESS_EVERY == 0:
+            progress(file.tell() / size)
+
+    with open(input_filename, 'rb') as file:
+        size = max(1, os.fstat(file.fileno()).st_size)
+
+        if is_json_lines(input_filename):
+            header = json.loads(file.readline() or "{}")
+            for line in file:
+                if line.strip():
+                    add_object(json.loads(line))
+        else:
+            header = read_yaml_stream(file, add_object)
+
+    header.pop("Objects", None)
+    return header, columns
+
+
+def read_yaml_stream(file, add_object):
+    """Разбирает YAML-файл модели по событиям парсера: параметры модели
+    собираются в словарь, а каждый объект из списка "Objects" сразу
+    передаётся в add_object
+    file — открытый файл модели
+    add_object — функция, принимающая словарь с описанием объекта
+    Возвращает словарь параметров модели
+    """
+
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    events = yaml.parse(file, Loader=loader)
+    scalars = ScalarConstructor(yaml)
+
+    header = {}
+    for event in events:
+        if isinstance(event, (yaml.StreamStartEvent, yaml.DocumentStartEvent)):
+            continue
+        if not isinstance(event, yaml.MappingStartEvent):
+            raise ValueError("model file must contain a mapping")
+        break
+    else:
+        return header
+
+    for event in events:
+        if isinstance(event, yaml.MappingEndEvent):
+            break
+        key = build_value(yaml, events, event, scalars)
+        event = next(events)
+        if key == "Objects" and isinstance(event, yaml.SequenceStartEvent):
+            for item in events:
+                if isinstance(item, yaml.SequenceEndEvent):
+                    break
+                add_object(build_value(yaml, events, item, scalars))
+        else:
+            header[key] = build_value(yaml, events, event, scalars)
+
+    return header
+
+
+class ScalarConstructor:
+    """Переводит скалярные значения YAML в объекты Python по правилам
+    безопасного загрузчика (без построения узлов всего документа)
+    """
+
+    # сколько различных нечисловых значений запоминать (ключи объектов
+    # повторяются в каждом объекте)
+    CACHE_SIZE = 1000
+
+    def __init__(self, yaml):
+        """yaml — модуль PyYAML
+        """
+
+        self.yaml = yaml
+        self.constructor = yaml.SafeLoader("")
+        self.cache = {}
+
+    def __call__(self, event):
+        """event — событие ScalarEvent парсера
+        """
+
+        value = event.value
+        plain = event.implicit[0] and not event.style
+        if plain:
+            # десятичные числа разбираются напрямую, без регулярных
+            # выражений распознавателя YAML
+            if value.isdigit() and (value[0] != "0" or value == "0"):
+                return int(value)
+            if "." in value and value[0] in "0123456789+-.":
+                try:
+                    return float(value)
+                except ValueError:
+                    pass
+            if value in self.cache:
+                return self.cache[value]
+
+        tag = self.constructor.resolve(self.yaml.ScalarNode, value,
+                                       event.implicit)
+        construct = self.constructor.yaml_constructors.get(tag)
+        if construct is None:
+            result = value
+        else:
+            result = construct(self.constructor,
+                               self.yaml.ScalarNode(tag, value))
+
+        if plain and len(self.cache) < self.CACHE_SIZE:
+            self.cache[value] = result
+        return result
+
+
+def build_value(yaml, events, event, scalars):
+    """Собирает значение YAML (скаляр, список или словарь), начинающееся
+    с события event
+    yaml — модуль PyYAML
+    events — итератор остальных событий парсера
+    event — первое событие значения
+    scalars — объект ScalarConstructor
+    """
+
+    if isinstance(event, yaml.ScalarEvent):
+        return scalars(event)
+
+    if isinstance(event, yaml.SequenceStartEvent):
+        items = []
+        for item in events:
+            if isinstance(item, yaml.SequenceEndEvent):
+                return items
+            items.append(build_value(yaml, events, item, scalars))
+
+    if isinstance(event, yaml.MappingStartEvent):
+        mapping = {}
+        for key in events:
+            if isinstance(key, yaml.MappingEndEvent):
+                return mapping
+            key = build_value(yaml, events, key, scalars)
+            mapping[key] = build_value(yaml, events, next(events), scalars)
+
+    raise ValueError(f"unsupported YAML element: {event}")
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,98 @@
+# coding:utf-8
+# license: GPLv3
+
+import struct
+
+# Заголовок файла записи
+HEADER = b"SSREC\x01"
+
+# Типы записей
+STEP = 0
+TOGGLE = 1
+CHANGEFLOW = 2
+LOAD = 3
+SAVE = 4
+MOVE = 5
+ZOOM = 6
+RESET = 7
+SEEK = 8
+
+# Форматы данных записей (None - строка, предваряемая своей длиной)
+FORMATS = {
+           STEP: struct.Struct("<d"),
+           TOGGLE: struct.Struct("<?"),
+           CHANGEFLOW: struct.Struct("<d"),
+           LOAD: None,
+           SAVE: None,
+           MOVE: struct.Struct("<dd"),
+           ZOOM: struct.Struct("<ddd"),
+           RESET: struct.Struct("<"),
+           SEEK: struct.Struct("<d")
+          }
+
+TAG = struct.Struct("<B")
+LENGTH = struct.Struct("<H")
+
+
+class Recorder:
+    '''
+    Класс, записывающий последовательность шагов модели и
+    команд пользователя в компактный двоичный файл
+    '''
+
+    def __init__(self, output_filename):
+        '''
+        Функция, инициализирующая запись
+        :param output_filename: имя файла, в который будет вестись запись
+        '''
+        self.file = open(output_filename, 'wb')
+        self.file.write(HEADER)
+
+    def write(self, tag, *values):
+        '''
+        Функция, добавляющая запись в файл
+        :param tag: тип записи (STEP, TOGGLE, ...)
+        :param values: данные записи в соответствии с FORMATS[tag]
+        '''
+        self.file.write(TAG.pack(tag))
+        if FORMATS[tag] is None:
+            text = values[0].encode("utf-8")
+            self.file.write(LENGTH.pack(len(text)))
+            self.file.write(text)
+        else:
+            self.file.write(FORMATS[tag].pack(*values))
+
+    def close(self):
+        '''
+        Функция, завершающая запись
+        '''
+        self.file.close()
+
+
+def read_records(input_filename):
+    '''
+    Генератор, возвращающий записи из файла в виде пар (tag, values)
+    input_filename — имя файла с записью
+    '''
+
+    with open(input_filename, 'rb') as file:
+        if file.read(len(HEADER)) != HEADER:
+            raise ValueError(f"{input_filename} is not a record file")
+
+        while True:
+            tag_bytes = file.read(TAG.size)
+            if not tag_bytes:
+                break
+
+            tag, = TAG.unpack(tag_bytes)
+            if FORMATS[tag] is None:
+                length, = LENGTH.unpack(file.read(LENGTH.size))
+                values = (file.read(length).decode("utf-8"),)
+            else:
+                values = FORMATS[tag].unpack(file.read(FORMATS[tag].size))
+
+            yield tag, values
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,289 @@
+# coding:utf-8
+# license: GPLv3
+
+import asyncio
+import errno
+import os
+import stat
+import struct
+import threading
+import numpy as np
+
+# Заголовки кадра состояния (сервер -> клиент) и запроса (клиент -> сервер)
+FRAME_MAGIC = b"SSFR"
+REQUEST_MAGIC = b"SSRQ"
+
+# Кадр: заголовок, номер шага, модельное время, кол-во объектов N,
+# затем N индексов объектов (uint32) и N строк (x, y, v_x, v_y) в float64
+FRAME = struct.Struct("<4sQdI")
+
+# Запрос: заголовок, прореживание (не чаще одного кадра за столько
+# шагов модели), кол-во индексов K (0 - все объекты), затем K индексов
+# объектов (uint32)
+REQUEST = struct.Struct("<4sII")
+
+INDEX = np.dtype("<u4")
+STATE = np.dtype("<f8")
+
+
+def is_socket(path):
+    '''
+    Функция, проверяющая, что по пути лежит сокет Unix
+    :param path: путь к файлу
+    '''
+
+    try:
+        return stat.S_ISSOCK(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return False
+
+
+def parse_address(address):
+    '''
+    Функция, разбирающая адрес сервера
+    :param address: "unix:ПУТЬ" для сокета Unix, "ХОСТ:ПОРТ" или "ПОРТ"
+                    для сокета TCP (по умолчанию на localhost)
+    Возвращает пару ("unix", путь) или ("tcp", (хост, порт))
+    '''
+
+    if address.startswith("unix:"):
+        return "unix", address[len("unix:"):]
+
+    host, _, port = address.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+def encode_request(decimation=1, indices=None):
+    '''
+    Функция, кодирующая запрос клиента
+    :param decimation: наименьшее кол-во шагов модели между кадрами
+    :param indices: список индексов нужных объектов, по умолчанию все
+    '''
+
+    indices = np.asarray([] if indices is None else indices, dtype=INDEX)
+    return REQUEST.pack(REQUEST_MAGIC, decimation, len(indices)) + \
+        indices.tobytes()
+
+
+def encode_frame(frame, indices=None):
+    '''
+    Функция, кодирующая кадр состояния модели
+    :param frame: словарь кадра, созданный StateServer.publish
+    :param indices: массив индексов нужных объектов, по умолчанию все
+    '''
+
+    state = frame["state"]
+    if indices is None:
+        indices = np.arange(len(state), dtype=INDEX)
+    else:
+        indices = indices[indices < len(state)]
+        state = state[indices]
+
+    return b"".join((FRAME.pack(FRAME_MAGIC, frame["step"], frame["time"],
+                                len(indices)),
+                     indices.astype(INDEX).tobytes(),
+                     state.astype(STATE).tobytes()))
+
+
+def read_frame(stream):
+    '''
+    Функция, читающая кадр состояния из потока (например,
+    socket.makefile('rb')) на стороне клиента
+    :param stream: двоичный поток
+    Возвращает словарь кадра (step, time, indices, pos, vel) или None,
+    если поток закрыт (в том числе посреди кадра при остановке сервера)
+    '''
+
+    header = stream.read(FRAME.size)
+    if len(header) < FRAME.size:
+        return None
+
+    magic, step, time, n = FRAME.unpack(header)
+    if magic != FRAME_MAGIC:
+        raise ValueError("Broken frame stream")
+
+    size = n * (INDEX.itemsize + 4 * STATE.itemsize)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+
+    indices = np.frombuffer(data, dtype=INDEX, count=n)
+    state = np.frombuffer(data, dtype=STATE, offset=n * INDEX.itemsize) \
+        .reshape(n, 4)
+
+    return {"step": step, "time": time, "indices": indices,
+            "pos": state[:, :2], "vel": state[:, 2:]}
+
+
+class StateServer:
+    '''
+    Класс локального сервера, передающего кадры состояния модели
+    внешним программам: сервер asyncio работает в отдельном потоке,
+    а модель только оставляет ему свой последний кадр, поэтому
+    медленные клиенты получают самый новый кадр и пропускают
+    остальные, не задерживая модель
+    '''
+
+    def __init__(self, address):
+        '''
+        Функция, запускающая сервер
+        :param address: адрес сервера (см. parse_address)
+        '''
+        self.kind, self.address = parse_address(address)
+        self.clients = []
+        self.latest = None
+        self.notify_pending = False
+
+        self.loop = asyncio.new_event_loop()
+        self.server = None
+        started = threading.Event()
+        self.error = None
+
+        self.thread = threading.Thread(target=self.run, args=(started,),
+                                       daemon=True)
+        self.thread.start()
+        started.wait()
+
+        if self.error is not None:
+            raise self.error
+
+    def run(self, started):
+        '''
+        Функция потока сервера
+        :param started: событие, устанавливаемое после открытия сокета
+        '''
+        asyncio.set_event_loop(self.loop)
+
+        try:
+            if self.kind == "unix":
+                # старый сокет удаляется, а любой другой файл по этому
+                # пути (например, при опечатке в адресе) - нет
+                if is_socket(self.address):
+                    os.remove(self.address)
+                elif os.path.lexists(self.address):
+                    raise FileExistsError(errno.EEXIST, "Not a socket",
+                                          self.address)
+                start = asyncio.start_unix_server(self.handle, self.address)
+            else:
+                start = asyncio.start_server(self.handle, *self.address)
+            self.server = self.loop.run_until_complete(start)
+        except OSError as error:
+            self.error = error
+            started.set()
+            return
+
+        started.set()
+        self.loop.run_forever()
+
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        self.loop.run_until_complete(asyncio.gather(*tasks,
+                                                    return_exceptions=True))
+        self.server.close()
+        self.loop.run_until_complete(self.server.wait_closed())
+        self.loop.close()
+
+    def publish(self, model):
+        '''
+        Функция, оставляющая клиентам новый кадр состояния модели
+        (вызывается из потока модели после каждого шага, без клиентов
+        ничего не делает)
+        :param model: объект solar_model.Model
+        '''
+        if not self.clients:
+            return
+
+        objs = model.get_link()
+        self.latest = {"step": model.steps, "time": model.time,
+                       "state": np.column_stack((objs.get_positions(),
+                                                 objs.vel))}
+
+        # клиенты будятся один раз, сколько бы кадров ни пришло
+        if not self.notify_pending:
+            self.notify_pending = True
+            self.loop.call_soon_threadsafe(self.notify)
+
+    def notify(self):
+        '''
+        Функция, сообщающая всем клиентам о новом кадре
+        (выполняется в потоке сервера)
+        '''
+        self.notify_pending = False
+        for client in self.clients:
+            client["new frame"].set()
+
+    async def handle(self, reader, writer):
+        '''
+        Функция, обслуживающая одного клиента: отправляет ему
+        самый новый кадр, как только он готов его принять
+        :param reader: поток чтения запросов клиента
+        :param writer: поток записи кадров клиенту
+        '''
+        client = {"decimation": 1, "indices": None, "last step": None,
+                  "new frame": asyncio.Event()}
+        requests = asyncio.ensure_future(self.read_requests(reader, client))
+        self.clients.append(client)
+        if self.latest is not None:
+            client["new frame"].set()
+
+        try:
+            while True:
+                await client["new frame"].wait()
+                client["new frame"].clear()
+                if requests.done():
+                    break
+
+                frame = self.latest
+                last_step = client["last step"]
+                if last_step is not None and \
+                        0 <= frame["step"] - last_step < client["decimation"]:
+                    continue
+
+                client["last step"] = frame["step"]
+                writer.write(encode_frame(frame, client["indices"]))
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # сервер останавливается или клиент отключился
+            pass
+        finally:
+            self.clients.remove(client)
+            requests.cancel()
+            writer.close()
+
+    async def read_requests(self, reader, client):
+        '''
+        Функция, читающая запросы клиента
+        :param reader: поток чтения запросов клиента
+        :param client: словарь с настройками клиента
+        '''
+        try:
+            while True:
+                header = await reader.readexactly(REQUEST.size)
+                magic, decimation, n = REQUEST.unpack(header)
+                if magic != REQUEST_MAGIC:
+                    break
+
+                data = await reader.readexactly(n * INDEX.itemsize)
+                client["decimation"] = max(1, decimation)
+                client["indices"] = np.frombuffer(data, dtype=INDEX) \
+                    if n else None
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+        # клиент отключился, поэтому ожидание кадра прерывается
+        client["new frame"].set()
+
+    def close(self):
+        '''
+        Функция, останавливающая сервер
+        '''
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+        if self.kind == "unix" and is_socket(self.address):
+            os.remove(self.address)
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,465 @@
+# coding:utf-8
+# license: GPLv3
+import array
+import bisect
+import json
+import os
+import numpy as np
+
+# начало заголовка файла траекторий и полный размер заголовка (остаток
+# заполняется описанием в JSON и пробелами)
+MAGIC = b"SSTRJ\x01"
+HEADER_SIZE = 4096
+
+# версия формата пирамиды уровней детализации
+PYRAMID_VERSION = 1
+
+# способы прореживания: "minmax" - в каждой группе остаются точки с
+# наименьшими и наибольшими координатами, "lttb" - точка, образующая
+# треугольник наибольшей площади с соседними группами
+MODES = ("minmax", "lttb")
+
+# во сколько раз уменьшается кол-во точек на каждом следующем уровне
+FACTOR = 4
+
+# уровни строятся, пока на уровне больше MIN_POINTS точек
+MIN_POINTS = 1024
+
+# сколько точек на пиксель выбирается при запросе
+POINTS_PER_PIXEL = 4
+
+# кол-во строк, обрабатываемых за раз при построении уровня
+CHUNK_ROWS = 2 ** 16
+
+
+class TrajectoryRecorder:
+    '''
+    Класс, записывающий координаты объектов модели через заданное
+    кол-во шагов в двоичный файл: заголовок и строки float64 вида
+    (время, x0, y0, x1, y1, ...)
+
+    Столбцы соответствуют объектам в момент начала записи: после
+    слияния объектов столбцы удаленных объектов заполняются nan, а
+    после возврата модели назад записанные позже строки удаляются
+    '''
+
+    def __init__(self, output_filename, model, every=1):
+        '''
+        Функция, начинающая запись (первая строка - текущее состояние)
+        :param output_filename: имя файла, в который будет вестись запись
+        :param model: объект solar_model.Model
+        :param every: раз в сколько шагов записываются координаты
+        '''
+        self.model = model
+        self.every = every
+        self.steps = 0
+
+        objs = model.get_link()
+        bodies = len(objs)
+        header = json.dumps({"bodies": bodies, "every": every,
+                             "m": objs.m.tolist()}).encode()
+        self.file = open(output_filename, 'wb')
+        self.file.write((MAGIC + header).ljust(HEADER_SIZE))
+
+        # номера столбцов текущих объектов и их изменения при слияниях
+        # (модельное время и номера столбцов после слияния)
+        self.columns = np.arange(bodies)
+        self.changes = [(model.time, self.columns)]
+        self.row = np.full(1 + 2 * bodies, np.nan)
+        self.times = array.array('d')
+
+        model.add_compact_listener(self.compact)
+        model.add_restore_listener(self.restore)
+        self.write_row()
+
+    def write(self):
+        '''
+        Функция, вызываемая после каждого шага модели
+        '''
+        self.steps += 1
+        if self.steps % self.every == 0:
+            self.write_row()
+
+    def write_row(self):
+        '''
+        Функция, записывающая строку с текущими координатами
+        '''
+        self.row[0] = self.model.time
+        self.row[1:] = np.nan
+        pos = self.row[1:].reshape(-1, 2)
+        pos[self.columns] = self.model.get_positions()
+        self.file.write(self.row.tobytes())
+        self.times.append(self.model.time)
+
+    def compact(self, keep):
+        '''
+        Функция, убирающая столбцы слившихся объектов
+        :param keep: булев массив оставшихся объектов
+        '''
+        self.columns = self.columns[keep]
+        self.changes.append((self.model.time, self.columns))
+
+    def restore(self):
+        '''
+        Функция, удаляющая строки, записанные позже модельного времени
+        восстановленной модели
+        '''
+        time = self.model.time
+        count = bisect.bisect_right(self.times, time)
+        del self.times[count:]
+        self.file.truncate(HEADER_SIZE + count * self.row.nbytes)
+        self.file.seek(0, os.SEEK_END)
+
+        while len(self.changes) > 1 and self.changes[-1][0] > time:
+            self.changes.pop()
+        self.columns = self.changes[-1][1]
+
+    def close(self):
+        '''
+        Функция, завершающая запись
+        '''
+        self.file.close()
+
+
+class Trajectory:
+    '''
+    Класс записанных траекторий: строки файла отображаются в память
+    (np.memmap), так что файл не считывается целиком
+    '''
+
+    def __init__(self, path):
+        '''
+        :param path: путь к файлу траекторий
+        '''
+        with open(path, 'rb') as file:
+            header = file.read(HEADER_SIZE)
+        if not header.startswith(MAGIC):
+            raise ValueError(f"{path} is not a trajectory file")
+
+        self.path = path
+        self.header = json.loads(header[len(MAGIC):])
+        self.bodies = self.header["bodies"]
+
+        width = 1 + 2 * self.bodies
+        rows = (os.path.getsize(path) - HEADER_SIZE) // (8 * width)
+        self.data = np.memmap(path, dtype=np.float64, mode='r',
+                              offset=HEADER_SIZE, shape=(rows, width)) \
+            if rows else np.zeros((0, width))
+
+    def __len__(self):
+        return len(self.data)
+
+    @property
+    def times(self):
+        '''
+        Массив моментов записи строк
+        '''
+        return self.data[:, 0]
+
+    def positions(self, start=0, stop=None):
+        '''
+        Функция, возвращающая массив размера (rows, bodies, 2)
+        координат объектов в строках start..stop
+        '''
+        return self.data[start:stop, 1:].reshape(-1, self.bodies, 2)
+
+
+def reduce_minmax(index, pos):
+    '''
+    Функция, прореживающая точки группами по FACTOR ** 2: в группе
+    остаются FACTOR (= 4) точек с наименьшими и наибольшими x и y (в
+    порядке времени), так что график каждой координаты от времени
+    сохраняет все выбросы
+    :param index: массив размера (P, N) номеров строк точек
+    :param pos: массив размера (P, N, 2) координат точек
+    (P кратно FACTOR ** 2)
+    Возвращает массивы номеров строк и координат выбранных точек
+    '''
+    groups = len(index) // FACTOR ** 2
+    pos = pos.reshape(groups, FACTOR ** 2, *pos.shape[1:])
+    index = index.reshape(groups, FACTOR ** 2, -1)
+
+    # столбцы удаленных объектов (nan) не участвуют в выборе
+    low = np.where(np.isnan(pos), np.inf, pos)
+    high = np.where(np.isnan(pos), -np.inf, pos)
+    chosen = np.stack((low[..., 0].argmin(axis=1),
+                       high[..., 0].argmax(axis=1),
+                       low[..., 1].argmin(axis=1),
+                       high[..., 1].argmax(axis=1)), axis=1)
+    chosen.sort(axis=1)
+
+    index = np.take_along_axis(index, chosen, axis=1)
+    pos = np.take_along_axis(pos, chosen[..., np.newaxis], axis=1)
+    return index.reshape(-1, index.shape[-1]), \
+        pos.reshape(-1, *pos.shape[2:])
+
+
+def reduce_lttb(index, pos, before, after):
+    '''
+    Функция, прореживающая точки группами по FACTOR: в группе остается
+    точка, образующая треугольник наибольшей площади со средними
+    точками соседних групп (вариант LTTB, в котором вместо выбранной
+    точки предыдущей группы берется ее средняя точка, что позволяет
+    обрабатывать все группы одновременно)
+    :param index: массив размера (P, N) номеров строк точек
+    :param pos: массив размера (P, N, 2) координат точек
+    (P кратно FACTOR)
+    :param before: средние точки группы перед первой (N, 2)
+    :param after: средние точки группы после последней (N, 2)
+    Возвращает массивы номеров строк и координат выбранных точек
+    '''
+    groups = len(index) // FACTOR
+    pos = pos.reshape(groups, FACTOR, *pos.shape[1:])
+    index = index.reshape(groups, FACTOR, -1)
+
+    means = nan_mean(pos, axis=1)
+    previous = np.concatenate((before[np.newaxis], means[:-1]))
+    following = np.concatenate((means[1:], after[np.newaxis]))
+
+    a = (following - previous)[:, np.newaxis]
+    b = pos - previous[:, np.newaxis]
+    area = np.abs(a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0])
+    chosen = np.nan_to_num(area, nan=-1).argmax(axis=1)[:, np.newaxis]
+
+    index = np.take_along_axis(index, chosen, axis=1)[:, 0]
+    pos = np.take_along_axis(pos, chosen[..., np.newaxis], axis=1)[:, 0]
+    return index, pos
+
+
+def nan_mean(pos, axis):
+    '''
+    Функция, возвращающая среднее значение без учета nan (nan, если
+    все значения - nan)
+    '''
+    present = ~np.isnan(pos)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(present, pos, 0).sum(axis=axis) / \
+            present.sum(axis=axis)
+
+
+def group_means(pos, start, stop, size):
+    '''
+    Функция, возвращающая средние точки группы точек start..stop
+    (или первой/последней точки, если группа выходит за массив)
+    :param pos: массив размера (P, N, 2) координат точек уровня
+    :param size: кол-во точек уровня
+    '''
+    start, stop = max(start, 0), min(stop, size)
+    if start >= stop:
+        return np.asarray(pos[min(start, size - 1)])
+    return nan_mean(np.asarray(pos[start:stop]), axis=0)
+
+
+def pad(index, pos, multiple):
+    '''
+    Функция, дополняющая массивы точек повторами последней точки
+    до длины, кратной multiple
+    '''
+    extra = -len(index) % multiple
+    if extra == 0:
+        return index, pos
+    return (np.concatenate((index, np.repeat(index[-1:], extra, axis=0))),
+            np.concatenate((pos, np.repeat(pos[-1:], extra, axis=0))))
+
+
+def pyramid_path(path):
+    '''
+    Функция, возвращающая путь к папке пирамиды записи траекторий
+    :param path: путь к файлу траекторий
+    '''
+    return path + ".lod"
+
+
+def build_pyramid(path, progress=None):
+    '''
+    Функция, строящая пирамиду уровней детализации для записи
+    траекторий в папке рядом с ней: для каждого способа прореживания
+    уровень k содержит в FACTOR ** k раз меньше точек, чем запись, и
+    строится из предыдущего уровня частями по CHUNK_ROWS строк
+    :param path: путь к файлу траекторий
+    :param progress: функция, принимающая долю построенных уровней
+                     (от 0 до 1), по умолчанию не вызывается
+    Возвращает словарь с описанием пирамиды
+    '''
+    trajectory = Trajectory(path)
+    directory = pyramid_path(path)
+    os.makedirs(directory, exist_ok=True)
+
+    rows = len(trajectory)
+    stat = os.stat(path)
+    levels = 0
+    while rows // FACTOR ** (levels + 1) > MIN_POINTS:
+        levels += 1
+    meta = {"version": PYRAMID_VERSION, "size": stat.st_size,
+            "mtime": stat.st_mtime, "rows": rows,
+            "bodies": trajectory.bodies, "levels": {}}
+
+    for number, mode in enumerate(MODES):
+        # уровень 0 - сама запись
+        index = np.broadcast_to(np.arange(rows)[:, np.newaxis],
+                                (rows, trajectory.bodies))
+        pos = trajectory.positions()
+        sizes = []
+        for level in range(1, levels + 1):
+            index, pos = build_level(directory, mode, level, index, pos)
+            sizes.append(len(index))
+            if progress is not None:
+                progress((number * levels + level) / (len(MODES) * levels))
+        meta["levels"][mode] = sizes
+
+    with open(os.path.join(directory, "pyramid.json"), 'w') as meta_file:
+        json.dump(meta, meta_file)
+    return meta
+
+
+def build_level(directory, mode, level, index, pos):
+    '''
+    Функция, строящая уровень пирамиды из предыдущего уровня
+    и записывающая его в файлы .npy
+    :param directory: папка пирамиды
+    :param mode: способ прореживания
+    :param level: номер уровня
+    :param index: массив размера (P, N) номеров строк точек
+                  предыдущего уровня
+    :param pos: массив размера (P, N, 2) координат точек
+                предыдущего уровня
+    Возвращает отображенные в память массивы уровня
+    '''
+    size = len(index)
+    group = FACTOR ** 2 if mode == "minmax" else FACTOR
+    points = group // FACTOR
+    count = -(-size // group) * points
+
+    name = os.path.join(directory, f"{mode}_{level}")
+    new_index = np.lib.format.open_memmap(name + "_index.npy", mode='w+',
+                                          dtype=np.int64,
+                                          shape=(count, index.shape[1]))
+    new_pos = np.lib.format.open_memmap(name + "_pos.npy", mode='w+',
+                                        dtype=np.float64,
+                                        shape=(count, *pos.shape[1:]))
+
+    chunk = CHUNK_ROWS // group * group
+    for start in range(0, size, chunk):
+        stop = min(start + chunk, size)
+        part = pad(np.asarray(index[start:stop]),
+                   np.asarray(pos[start:stop]), group)
+        if mode == "minmax":
+            part = reduce_minmax(*part)
+        else:
+            part = reduce_lttb(*part,
+                               group_means(pos, start - group, start, size),
+                               group_means(pos, stop, stop + group, size))
+        first = start // group * points
+        new_index[first:first + len(part[0])] = part[0]
+        new_pos[first:first + len(part[1])] = part[1]
+
+    new_index.flush()
+    new_pos.flush()
+    return new_index, new_pos
+
+
+class Pyramid:
+    '''
+    Класс пирамиды уровней детализации записи траекторий: по запросу
+    интервала времени и ширины графика в пикселях выбирается самый
+    подробный уровень, на котором в интервал попадает не больше
+    POINTS_PER_PIXEL точек на пиксель, и читается только нужный
+    отрезок уровня (время запроса пропорционально кол-ву пикселей,
+    а не кол-ву записанных точек)
+    '''
+
+    def __init__(self, path):
+        '''
+        Функция, открывающая пирамиду записи (и строящая ее, если ее
+        нет или запись изменилась после построения)
+        :param path: путь к файлу траекторий
+        '''
+        self.trajectory = Trajectory(path)
+        self.directory = pyramid_path(path)
+
+        meta = self.read_meta(path)
+        if meta is None:
+            meta = build_pyramid(path)
+        self.meta = meta
+
+        self.levels = {}
+        for mode in MODES:
+            self.levels[mode] = [None] + [
+                tuple(np.load(os.path.join(self.directory,
+                                           f"{mode}_{level}_{kind}.npy"),
+                              mmap_mode='r')
+                      for kind in ("index", "pos"))
+                for level in range(1, len(meta["levels"][mode]) + 1)]
+
+    def read_meta(self, path):
+        '''
+        Функция, возвращающая описание построенной пирамиды (или None,
+        если она не построена или устарела)
+        :param path: путь к файлу траекторий
+        '''
+        try:
+            with open(os.path.join(self.directory, "pyramid.json"),
+                      'r') as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        stat = os.stat(path)
+        if meta.get("version") != PYRAMID_VERSION or \
+                meta["size"] != stat.st_size or \
+                meta["mtime"] != stat.st_mtime:
+            return None
+        return meta
+
+    def fetch(self, body, start_time=None, end_time=None, pixels=1000,
+              mode="minmax"):
+        '''
+        Функция, возвращающая точки траектории объекта за интервал
+        времени с подробностью, достаточной для графика заданной ширины
+        :param body: номер объекта (столбца записи)
+        :param start_time: начало интервала, по умолчанию начало записи
+        :param end_time: конец интервала, по умолчанию конец записи
+        :param pixels: ширина графика в пикселях
+        :param mode: способ прореживания из MODES
+        Возвращает массивы времени (T,) и координат (T, 2) точек
+        (моменты, когда объекта уже не было, пропускаются) и номер
+        выбранного уровня; из двух крайних групп уровня берутся только
+        точки внутри интервала, поэтому их выбросы могут быть потеряны
+        '''
+        if mode not in MODES:
+            raise ValueError(f"Unknown decimation mode: {mode}")
+        times = self.trajectory.times
+        start = 0 if start_time is None else \
+            int(np.searchsorted(times, start_time, "left"))
+        stop = len(times) if end_time is None else \
+            int(np.searchsorted(times, end_time, "right"))
+
+        levels = self.levels[mode]
+        level = 0
+        while level + 1 < len(levels) and \
+                (stop - start) / FACTOR ** level > POINTS_PER_PIXEL * pixels:
+            level += 1
+
+        if level == 0:
+            index = np.arange(start, stop)
+            pos = self.trajectory.positions(start, stop)[:, body]
+        else:
+            # группа уровня - FACTOR ** level строк записи (для minmax
+            # группа вчетверо больше, но и точек в ней четыре)
+            group = FACTOR ** (level + 1) if mode == "minmax" \
+                else FACTOR ** level
+            points = group // FACTOR ** level
+            first = start // group * points
+            last = -(-stop // group) * points
+            index = np.asarray(levels[level][0][first:last, body])
+            pos = np.asarray(levels[level][1][first:last, body])
+            inside = (index >= start) & (index < stop)
+            index, pos = index[inside], pos[inside]
+
+        present = ~np.isnan(pos).any(axis=1)
+        index, pos = index[present], pos[present]
+        return np.asarray(times[index]), pos, level
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,473 @@
+# coding:utf-8
+import argparse
+import collections
+import concurrent.futures
+import os
+import sys
+import math
+import time
+
+import numpy as np
+
+# модель работает без окна, поэтому pygame используется
+# с пустым видеодрайвером, а его приветствие не должно попасть
+# в поток кадров на стандартном выводе
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame as pg
+from solar_system.main import solar_main as s_main
+from solar_system.input import solar_input as s_input
+from solar_system.input import solar_record as s_record
+from solar_system.input import solar_trajectory as s_trajectory
+from solar_system.model import solar_events as s_events
+from solar_system.model import solar_orbits as s_orbits
+
+
+def replay(model_manager, input_filename, apply_saves=False):
+    '''
+    Функция, воспроизводящая запись шагов модели и команд
+    пользователя с максимальной скоростью
+    :param model_manager: объект ModelManager, которым управляет запись
+    :param input_filename: имя файла с записью
+    :param apply_saves: флаг, показывающий надо ли выполнять записанные
+                        сохранения модели в файлы
+    Возвращает словарь со статистикой воспроизведения
+    '''
+
+    stats = {"steps": 0, "model time": 0}
+
+    for tag, values in s_record.read_records(input_filename):
+        if tag == s_record.STEP:
+            model_manager.step(*values)
+            stats["steps"] += 1
+            stats["model time"] += values[0]
+
+        elif tag == s_record.LOAD:
+            error = model_manager.load_now(*values)
+            if error is not None:
+                print(error, file=sys.stderr)
+            stats["model time"] = 0
+            pg.event.clear()
+
+        elif tag == s_record.SAVE:
+            if apply_saves:
+                model_manager.call(pg.event.Event(s_main.ModelManager.SAVE,
+                                                  {"file": values[0]}))
+
+        elif tag == s_record.TOGGLE:
+            model_manager.call(pg.event.Event(s_main.ModelManager.TOGGLE,
+                                              {"mode": values[0]}))
+
+        elif tag == s_record.CHANGEFLOW:
+            model_manager.call(pg.event.Event(s_main.ModelManager.CHANGEFLOW,
+                                              {"scale": values[0]}))
+
+        elif tag == s_record.MOVE:
+            model_manager.move_camera({"x": values[0], "y": values[1]})
+
+        elif tag == s_record.ZOOM:
+            model_manager.zoom_camera(values[0],
+                                      {"x": values[1], "y": values[2]})
+
+        elif tag == s_record.RESET:
+            model_manager.default_camera()
+
+        elif tag == s_record.SEEK:
+            model_manager.seek(*values)
+            stats["model time"] = model_manager.model.time
+
+    return stats
+
+
+def run(model_manager, until, dt=None):
+    '''
+    Функция, продвигающая модель до указанного модельного времени
+    с максимальной скоростью
+    :param model_manager: объект ModelManager с загруженной моделью
+    :param until: модельное время (в секундах), до которого
+                  нужно продвинуть модель
+    :param dt: шаг модели, по умолчанию шаг кадра при скорости из файла
+    Возвращает словарь со статистикой
+    '''
+
+    steps = model_manager.model.steps
+    if model_manager.start_jump(until):
+        model_manager.jump(dt=dt)
+        model_manager.jump_target = None
+
+    return {"steps": model_manager.model.steps - steps,
+            "model time": model_manager.model.time}
+
+
+def build_pyramid(path, report):
+    '''
+    Функция, строящая пирамиду уровней детализации записи траекторий
+    и выводящая ее описание
+    :param path: путь к файлу траекторий
+    :param report: поток, в который выводится описание
+    '''
+
+    start = time.perf_counter()
+    meta = s_trajectory.build_pyramid(path)
+    elapsed = time.perf_counter() - start
+
+    print(f"Trajectory: {meta['rows']} samples of {meta['bodies']} bodies",
+          file=report)
+    for mode, sizes in meta["levels"].items():
+        print(f"Pyramid ({mode}): {len(sizes)} levels of "
+              f"{', '.join(map(str, sizes)) or '-'} samples", file=report)
+    print(f"Pyramid build time: {elapsed:.3f} s", file=report)
+
+
+def print_elements(pos, vel, m, primary, report):
+    '''
+    Функция, выводящая элементы орбит тел относительно центрального
+    тела для одного состояния
+    :param pos: массив размера (N, 2) координат тел
+    :param vel: массив размера (N, 2) скоростей тел
+    :param m: массив масс тел
+    :param primary: индекс центрального тела (None - самое массивное)
+    :param report: поток, в который выводятся элементы
+    '''
+
+    elements = s_orbits.relative_elements(pos, vel, m, primary)
+    for body in np.nonzero(~np.isnan(elements["e"]))[0]:
+        if np.isnan(elements["a"][body]):
+            print(f"Body {body}: unbound, e {elements['e'][body]:.4f}",
+                  file=report)
+            continue
+        print(f"Body {body}: a {elements['a'][body]:.6e} m, "
+              f"e {elements['e'][body]:.6f}, "
+              f"period {elements['period'][body] / s_main.YEAR:.6f} yr, "
+              f"omega {math.degrees(elements['omega'][body]):.3f} deg",
+              file=report)
+
+
+def print_analysis(result, report):
+    '''
+    Функция, выводящая периоды и прецессию орбит, найденные по рядам
+    (см. solar_orbits.OrbitAnalysis.result)
+    :param result: словарь массивов результатов по телам
+    :param report: поток, в который выводятся результаты
+    '''
+
+    # рад/с в угловые секунды за столетие
+    arcsec_century = math.degrees(1) * 3600 * 100 * s_main.YEAR
+    for body in np.nonzero(result["frames"])[0]:
+        print(f"Body {body}: a {result['a'][body]:.6e} m, "
+              f"e {result['e'][body]:.6f}, "
+              f"period {result['period'][body] / s_main.YEAR:.6f} yr, "
+              f"anomalistic "
+              f"{result['anomalistic period'][body] / s_main.YEAR:.6f} yr, "
+              f"precession "
+              f"{result['precession'][body] * arcsec_century:.1f} "
+              f"arcsec/century", file=report)
+
+
+def analyze(path, primary, report):
+    '''
+    Функция, анализирующая орбиты в сохраненном файле: для записи
+    траекторий - периоды и прецессию по рядам, для файла модели -
+    элементы орбит в сохраненном состоянии
+    :param path: путь к файлу
+    :param primary: индекс центрального тела (None - самое массивное)
+    :param report: поток, в который выводятся результаты
+    '''
+
+    start = time.perf_counter()
+    try:
+        trajectory = s_trajectory.Trajectory(path)
+    except ValueError:
+        trajectory = None
+
+    if trajectory is not None:
+        print(f"Frames: {len(trajectory)}", file=report)
+        print_analysis(s_orbits.analyze_trajectory(trajectory,
+                                                   primary=primary), report)
+    else:
+        _, columns = s_input.read_model_stream(path)
+        pos = np.column_stack((columns["x"], columns["y"]))
+        vel = np.column_stack((columns["v_x"], columns["v_y"]))
+        print_elements(pos, vel, np.asarray(columns["m"]), primary, report)
+
+    print(f"Analysis time: {time.perf_counter() - start:.3f} s",
+          file=report)
+
+
+def save_png(data, size, path):
+    '''
+    Функция, сохраняющая кадр в файл PNG (выполняется в пуле потоков)
+    :param data: байты кадра в формате RGB
+    :param size: размеры кадра (w, h)
+    :param path: путь к файлу кадра
+    '''
+
+    pg.image.save(pg.image.fromstring(data, size, "RGB"), path)
+
+
+def export(model_manager, output, frames, frame_time, substeps=1,
+           frame_format="png", workers=4):
+    '''
+    Функция, отрисовывающая модель во внеэкранную поверхность через
+    равные промежутки модельного времени и записывающая кадры в виде
+    последовательности PNG или сырого потока RGB
+    :param model_manager: объект ModelManager с загруженной моделью
+    :param output: папка для кадров PNG или файл для потока RGB
+                   ("-" - стандартный вывод)
+    :param frames: кол-во кадров
+    :param frame_time: модельное время между кадрами
+    :param substeps: кол-во шагов модели между кадрами
+    :param frame_format: "png" или "raw"
+    :param workers: кол-во потоков, кодирующих кадры
+    Возвращает словарь со статистикой экспорта
+    '''
+
+    visual = model_manager.visual
+    size = (visual.surf.get_width(), visual.surf.get_height())
+
+    if frame_format == "png":
+        os.makedirs(output, exist_ok=True)
+        pool = concurrent.futures.ThreadPoolExecutor(workers)
+        stream = None
+    else:
+        # кадры сырого потока должны идти по порядку, поэтому
+        # их пишет единственный поток
+        pool = concurrent.futures.ThreadPoolExecutor(1)
+        if output == "-":
+            stream = sys.stdout.buffer
+        else:
+            stream = open(output, 'wb')
+
+    # ограничение на кол-во кадров, ожидающих записи
+    pending = collections.deque()
+    max_pending = 2 * workers
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        for i in range(substeps):
+            model_manager.step(frame_time / substeps)
+
+        visual.update()
+        data = pg.image.tostring(visual.get_surface(), "RGB")
+
+        if stream is None:
+            path = os.path.join(output, f"frame_{frame:06d}.png")
+            pending.append(pool.submit(save_png, data, size, path))
+        else:
+            pending.append(pool.submit(stream.write, data))
+
+        while len(pending) > max_pending:
+            pending.popleft().result()
+
+    for future in pending:
+        future.result()
+    pool.shutdown()
+
+    if stream is not None:
+        stream.flush()
+        if stream is not sys.stdout.buffer:
+            stream.close()
+
+    elapsed = time.perf_counter() - start
+
+    return {"frames": frames, "size": size, "wall time": elapsed,
+            "fps": frames / elapsed if elapsed > 0 else float("inf")}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solar system model "
+                                                 "without a window")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--replay", metavar="FILE",
+                      help="replay steps and commands recorded "
+                           "by solar_main.py --record FILE")
+    mode.add_argument("--export", metavar="SCENARIO",
+                      help="render frames of the model loaded from "
+                           "SCENARIO")
+    mode.add_argument("--run", metavar="SCENARIO",
+                      help="run the model loaded from SCENARIO "
+                           "without rendering up to --until")
+    mode.add_argument("--analyze", metavar="FILE",
+                      help="print orbital elements of a saved model or "
+                           "periods and precession rates of a recording "
+                           "made by --trajectory")
+    mode.add_argument("--pyramid", metavar="TRAJECTORY",
+                      help="build the level-of-detail pyramid for "
+                           "positions recorded by --trajectory")
+    parser.add_argument("--until", type=float, default=1,
+                        help="model time in years to run to (with --run)")
+    parser.add_argument("--step", type=float,
+                        help="model time step in seconds (with --run), "
+                             "by default the scenario time scale divided "
+                             "by FPS")
+    parser.add_argument("--event", action="append", default=[],
+                        metavar="SPEC",
+                        help="detect an event during --run and stop the "
+                             "run at it: 'collision', 'approach:DISTANCE', "
+                             "'escape:RADIUS' or 'crossing:X,Y,DX,DY', "
+                             "optionally followed by '@BODY,BODY,...' "
+                             "(may be repeated)")
+    parser.add_argument("--no-stop", action="store_true",
+                        help="report events without stopping the run")
+    parser.add_argument("--trajectory", metavar="FILE",
+                        help="record body positions during --run to FILE "
+                             "and build its level-of-detail pyramid")
+    parser.add_argument("--elements", action="store_true",
+                        help="print orbital elements after --run")
+    parser.add_argument("--primary", type=int,
+                        help="central body for orbital elements, by "
+                             "default the most massive body")
+    parser.add_argument("--trajectory-every", type=int, default=1,
+                        metavar="STEPS",
+                        help="record positions every STEPS model steps")
+    parser.add_argument("--apply-saves", action="store_true",
+                        help="write the model files saved during the "
+                             "recording")
+    parser.add_argument("--output", default="frames",
+                        help="directory for PNG frames or file for raw "
+                             "RGB frames ('-' for stdout)")
+    parser.add_argument("--format", choices=("png", "raw"), default="png",
+                        help="frame format")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="number of frames to export")
+    parser.add_argument("--frame-time", type=float,
+                        help="model time between frames, by default "
+                             "the scenario time scale divided by FPS")
+    parser.add_argument("--substeps", type=int, default=1,
+                        help="model steps between frames")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="frame encoding threads")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="stream model state to local clients at "
+                             "ADDRESS ('unix:PATH', 'HOST:PORT' or 'PORT')")
+    s_main.add_autosave_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        events = [s_events.parse_event(spec, not args.no_stop)
+                  for spec in args.event]
+    except ValueError as error:
+        parser.error(str(error))
+
+    s_main.init_pygame()
+
+    # при выводе кадров в стандартный вывод статистика идет в поток ошибок
+    report = sys.stderr if args.output == "-" else sys.stdout
+
+    model_manager = s_main.ModelManager(s_main.MODEL_POS, s_main.MODEL_SIZE)
+    s_main.setup_autosave(model_manager, args)
+    if args.serve is not None:
+        from solar_system.input import solar_server as s_server
+        model_manager.server = s_server.StateServer(args.serve)
+
+    if args.replay is not None:
+        start = time.perf_counter()
+        stats = replay(model_manager, args.replay, args.apply_saves)
+        elapsed = time.perf_counter() - start
+
+        print(f"Steps: {stats['steps']}", file=report)
+        print(f"Model time: {stats['model time']:.1f} s", file=report)
+        print(f"Wall time: {elapsed:.3f} s", file=report)
+
+    elif args.run is not None:
+        error = model_manager.load_now(args.run)
+        if error is not None:
+            sys.exit(error)
+        pg.event.clear()
+        if events:
+            model_manager.model.events = s_events.EventDetector(events)
+        if args.trajectory is not None:
+            model_manager.trajectory = s_trajectory.TrajectoryRecorder(
+                args.trajectory, model_manager.model, args.trajectory_every)
+
+        start = time.perf_counter()
+        stats = run(model_manager, args.until * s_main.YEAR, args.step)
+        elapsed = time.perf_counter() - start
+        pg.event.clear()
+
+        print(f"Steps: {stats['steps']}", file=report)
+        print(f"Model time: {stats['model time']:.1f} s", file=report)
+        print(f"Wall time: {elapsed:.3f} s", file=report)
+        if elapsed > 0:
+            print(f"Steps per second: {stats['steps'] / elapsed:.1f}",
+                  file=report)
+        print(f"State memory ({model_manager.model.precision}): "
+              f"{model_manager.model.get_link().nbytes() / 2 ** 20:.2f} MiB",
+              file=report)
+        metrics = model_manager.model.neighbours.get_metrics()
+        print(f"Neighbour lists: {metrics['builds']} builds, "
+              f"rebuild rate {metrics['rebuild rate']:.3f}, "
+              f"hit rate {metrics['hit rate']:.3f}", file=report)
+
+        detector = model_manager.model.events
+        if detector is not None:
+            for occurrence in detector.occurrences:
+                bodies = ", ".join(map(str, occurrence["bodies"]))
+                print(f"Event: {occurrence['event']} at "
+                      f"{occurrence['time']:.3f} s (bodies {bodies})",
+                      file=report)
+            if detector.stopped:
+                print(f"Stopped by event at {detector.stop_time:.3f} s "
+                      f"({detector.stop_time / (args.until * s_main.YEAR):.1%}"
+                      f" of the run)", file=report)
+
+        if args.elements:
+            objs = model_manager.model.get_link()
+            print_elements(objs.get_positions(), objs.vel, objs.m,
+                           args.primary, report)
+
+        if model_manager.trajectory is not None:
+            model_manager.trajectory.close()
+            build_pyramid(args.trajectory, report)
+            if args.elements:
+                print_analysis(s_orbits.analyze_trajectory(
+                    s_trajectory.Trajectory(args.trajectory),
+                    primary=args.primary), report)
+
+    elif args.pyramid is not None:
+        build_pyramid(args.pyramid, report)
+
+    elif args.analyze is not None:
+        analyze(args.analyze, args.primary, report)
+
+    else:
+        error = model_manager.load_now(args.export)
+        if error is not None:
+            sys.exit(error)
+        pg.event.clear()
+
+        frame_time = args.frame_time
+        if frame_time is None:
+            frame_time = model_manager.default_speed / s_main.FPS
+
+        stats = export(model_manager, args.output, args.frames, frame_time,
+                       args.substeps, args.format, args.workers)
+
+        print(f"Frames: {stats['frames']} "
+              f"({stats['size'][0]}x{stats['size'][1]} {args.format})",
+              file=report)
+        print(f"Wall time: {stats['wall time']:.3f} s", file=report)
+        print(f"Output FPS: {stats['fps']:.1f}", file=report)
+
+    if model_manager.model is not None:
+        print(f"Bodies: {len(model_manager.model.get_link())}", file=report)
+        print(f"State digest: {model_manager.model.get_digest()}",
+              file=report)
+
+        if model_manager.model.diagnostics.series:
+            sample = model_manager.model.diagnostics.series[-1]
+            print(f"Drift: energy {sample['energy drift']:.3e}, "
+                  f"momentum {sample['momentum drift']:.3e}, "
+                  f"angular momentum {sample['angular drift']:.3e}",
+                  file=report)
+
+    if model_manager.server is not None:
+        model_manager.server.close()
+    model_manager.saver.close()
+
+    pg.quit()
+
+
+if __name__ == "__main__":
+    main()
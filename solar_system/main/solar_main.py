@@ -0,0 +1,2400 @@
+# coding:utf-8
+import time
+
+# момент запуска, от которого отсчитывается время до первого кадра
+LAUNCH_TIME = time.perf_counter()
+
+import argparse
+import collections
+import os
+import threading
+import pygame as pg
+
+from solar_system.visual import solar_vis as s_vis
+from solar_system.model import solar_model as s_model
+from solar_system.model import solar_diag as s_diag
+from solar_system.model import solar_timeline as s_timeline
+from solar_system.input import solar_input as s_input
+from solar_system.input import solar_record as s_record
+from solar_system.input import solar_autosave as s_autosave
+from solar_system.input import solar_catalog as s_catalog
+from solar_system.main import solar_profile as s_profile
+
+# pygame_gui импортируется при построении интерфейса (после первого кадра)
+gui = None
+
+FPS = 30
+WIN_SIZE = {"w": 900, "h": 800}
+MODEL_POS = {"x": WIN_SIZE["w"] * 0.05,
+             "y": WIN_SIZE["h"] * 0.15}
+MODEL_SIZE = {"w": WIN_SIZE["w"] * 0.9,
+              "h": WIN_SIZE["h"] * 0.80}
+
+# скорость смещения камеры (пикселей в секунду) и скорость ее
+# приближения (процентов в секунду) при зажатых клавишах
+CAMERA_SPEED = 300
+ZOOM_SPEED = 100
+# приближение камеры (в процентах) за один щелчок колеса мыши
+WHEEL_ZOOM = 10
+
+# время (в секундах), которое перемотка модели занимает за один кадр,
+# и наименьший промежуток между обновлениями надписи времени модели
+JUMP_BUDGET = 0.1
+JUMP_LABEL_PERIOD = 0.25
+
+# время (в секундах) без движения слайдера истории, после которого
+# модель возвращается к выбранному на нем моменту
+SEEK_DELAY = 0.2
+
+# кол-во делений слайдера истории
+TIMELINE_TICKS = 1000
+
+# промежуток (в секундах), за который считается частота шагов модели
+# в плитке, и зазор (в пикселях) между плитками
+RATE_PERIOD = 1
+TILE_GAP = 4
+
+# наибольшее кол-во шагов в очереди потока модели плитки (секунда
+# кадров): если модель не успевает за отрисовкой, новые шаги
+# пропускаются, а плитка помечается как перегруженная
+MAX_PENDING = FPS
+
+# кол-во секунд в модельном годе и месяце
+YEAR = 365 * 24 * 60 * 60
+MONTH = 30 * 24 * 60 * 60
+
+# папка с файлами моделей в исходниках проекта (если программа
+# установлена без нее, файлы выбираются из текущей папки)
+MODELS_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__),
+                                           os.pardir, os.pardir,
+                                           "models-data"))
+if not os.path.isdir(MODELS_DIR):
+    MODELS_DIR = os.curdir
+
+
+class ManageObj:
+    '''
+    Абстрактный класс, предоставляющий общий
+    функционал для объектов, за котором может
+    следить EventManager
+    '''
+
+    def __init__(self):
+        '''
+        Функция инициализирующая объект
+        '''
+        self.event_manager = None
+
+    def idle(self):
+        '''
+        Функция, описывающая дефолтное поведение объекта
+        '''
+        pass
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию объекта на полученное событие
+        :param event: полученное событие, на которое объект
+                      должен прореагировать
+        '''
+        pass
+
+    def set_manager(self, event_manager):
+        '''
+        Функция, устанавливающая связь с обработчиком
+        событий
+        :param event_manager: объект EventManager, с которым
+                              нужно установить связь
+        '''
+
+        self.event_manager = event_manager
+        add_event = pg.event.Event(EventManager.ADDOBJ,
+                                   {"target": self})
+        pg.event.post(add_event)
+
+
+class TimeManager(ManageObj):
+    '''
+    Класс менеджера времени
+    '''
+
+    # События менеджера времени
+
+    REMOVEOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно удалить
+    '''
+
+    ADDOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно добавить
+    '''
+
+    class Stopwatch:
+        '''
+        Класс секудомера
+        '''
+
+        def __init__(self, scale=1):
+            '''
+            Функция, иницализирующая секундомер
+            :param scale: скорость течения времени секундомер относительно
+                          реального времени, по умолчанию равна 1
+            '''
+            self.dt = 0
+            self.running = False
+            self.scale = scale
+            self.current_time = 0
+            add_event = pg.event.Event(TimeManager.ADDOBJ, {"target": self})
+            pg.event.post(add_event)
+
+        def update(self, dt):
+            '''
+            Функция, обновляющая значение времени секундомера
+            :param dt: реальное кол-во прошедшего времени
+            '''
+
+            if self.running:
+                self.current_time += self.scale * dt
+                self.dt = self.scale * dt
+
+        def get_time(self):
+            '''
+            Функция, возвращающая кол-во прошедшего времени с момента
+            последнего перезапуска
+            '''
+
+            return self.current_time
+
+        def get_tick(self):
+            '''
+            Функция, возвращающая последнее обновление времени
+            '''
+
+            return self.dt
+
+        def play(self):
+            '''
+            Функция, активирующая секундомер
+            '''
+
+            self.running = True
+
+        def pause(self):
+            '''
+            Функция, приостанавливающая секундомер
+            '''
+
+            self.running = False
+
+        def restart(self, init_time=0):
+            '''
+            Функция перезапускающая секундомер
+            :param init_time: начальное время секундомера, по умолчанию
+                              равно 0
+            '''
+
+            self.current_time = init_time
+
+        def change_flow(self, scale, addjust_time=False):
+            '''
+            Функция, изменяющая скорость течения времени секундомера
+            относительно реального
+            :param scale: новая относительная
+            :param addjsut_time: флаг, показывающий надо ли подстроить
+                                 уже прошедшее время под новое течение
+                                 времени
+            '''
+            if addjust_time:
+                self.current_time *= scale / self.scale
+            self.scale = scale
+
+    def __init__(self, fps):
+        '''
+        Функция инициализирующая менеджера времени
+        '''
+        self.fps = fps
+        self.total_time = 0
+        self.pool = []
+        self.clock = pg.time.Clock()
+
+        super().__init__()
+
+    def idle(self):
+        '''
+        Функция, описывающая дефолтное поведение менеджера времени
+        (отсчет времени, проверка таймеров и т.д.)
+        '''
+        dt = self.clock.tick(self.fps) / 1000
+        self.total_time += dt
+
+        for obj in self.pool:
+            obj.update(dt)
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию объекта на полученное событие
+        :param event: полученное событие, на которое объект
+                      должен прореагировать
+        '''
+        if event.type == TimeManager.ADDOBJ:
+            if event.target not in self.pool:
+                self.pool.append(event.target)
+
+        elif event.type == TimeManager.REMOVEOBJ:
+            if event.target in self.pool:
+                self.pool.remove(event.target)
+
+    def get_time(self):
+        '''
+        Функция, возвращающая время в секундах,
+        прошедшее со старта программы
+        '''
+        return self.total_time
+
+
+class EventManager:
+    '''
+    Класс менеджра событий, который обрабатывает как
+    pygame события, так и пользовательские события
+    '''
+
+    # События менеджера событий
+
+    REMOVEOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно удалить
+    '''
+
+    ADDOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно добавить
+    '''
+
+    def __init__(self):
+        '''
+        Функция для инициализация объекта менеджера событий
+        '''
+        self.pool = []
+        self.timer = TimeManager(FPS)
+
+        self.timer.set_manager(self)
+
+    def add_obj(self, obj):
+        '''
+        Функция, которая добавляет переданный объект в
+        список отслеживаемых объектов, если его там уже не было
+        :param obj: обЪект, который нужно добавить в
+                    список(объект должен иметь метод
+                    idle(), описывающий дефолтное поведение
+                    объекта, метод call(), принимающий
+                    объект события
+        '''
+        if obj not in self.pool:
+            self.pool.append(obj)
+            obj.set_manager(self)
+            return True
+        return False
+
+    def remove_obj(self, obj):
+        '''
+        Функция, исключающая переданный объект из списка
+        отслеживаемых объектов (если он там был)
+        :param obj: объект, который будет исключен из
+                    списка отслеживаемых объектов
+        '''
+        if obj in self.pool:
+            self.pool.remove(obj)
+            return True
+        return False
+
+    def get_pool(self):
+        '''
+        Функция, возращающая список отслеживаемых объектов
+        '''
+        return self.pool
+
+    def run(self):
+        '''
+        Функция, забирающая события из очереди событий pygame,
+        обрабатывающая их, пересылающая часть событий в
+        объекты из списка отслеживаемых объектов, вызывающая
+        дефолтное поведение объектов из списка отслеживаемых
+        объектов и возращающая флаг продолжения работы
+        '''
+
+        running = True
+        for event in pg.event.get():
+
+            if event.type == pg.QUIT:
+                running = False
+
+            elif event.type == EventManager.REMOVEOBJ:
+                self.remove_obj(event.target)
+
+            elif event.type == EventManager.ADDOBJ:
+                self.add_obj(event.target)
+
+            else:
+                for obj in self.pool:
+                    obj.call(event)
+
+        for obj in self.pool:
+            obj.idle()
+
+        return running
+
+    def get_time(self):
+        '''
+        Функция, возвращающая время в секундах,
+        прошедшее со старта программы
+        '''
+        return self.timer.get_time()
+
+
+class ProfileManager(ManageObj):
+    '''
+    Класс менеджера профилирования: по клавишам F9 (cProfile) и
+    F10 (выделения памяти по менеджерам) или по событию PROFILE
+    включает и выключает запись профиля работающей программы
+    '''
+
+    # События менеджера профилирования
+
+    PROFILE = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут allocations - флаг, показывающий что нужно
+    включить или выключить трассировку выделений памяти,
+    а не запись профиля cProfile
+    '''
+
+    def __init__(self, directory):
+        '''
+        Функция, инициализирующая менеджер профилирования
+        :param directory: папка, в которую сохраняются профили
+        '''
+        super().__init__()
+        self.profiler = s_profile.Profiler(directory)
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию менеджера профилирования на
+        полученное событие
+        :param event: полученное событие, на которое менеджер
+                      должен прореагировать
+        '''
+
+        if event.type == pg.KEYDOWN and event.key in (pg.K_F9, pg.K_F10):
+            profile_event = pg.event.Event(ProfileManager.PROFILE,
+                                           {"allocations":
+                                            event.key == pg.K_F10})
+            pg.event.post(profile_event)
+
+        elif event.type == ProfileManager.PROFILE:
+            self.toggle(event.allocations)
+
+    def toggle(self, allocations):
+        '''
+        Функция, включающая или выключающая профилирование
+        :param allocations: флаг, показывающий что переключается
+                            трассировка выделений памяти, а не cProfile
+        '''
+
+        profiler = self.profiler
+        if not allocations:
+            if profiler.is_profiling():
+                profiler.stop_profile()
+            else:
+                profiler.start_profile()
+        elif profiler.is_tracing():
+            profiler.stop_tracing()
+        else:
+            managers = [obj for obj in self.event_manager.get_pool()
+                        if obj is not self]
+            profiler.start_tracing(managers)
+
+    def stop(self):
+        '''
+        Функция, завершающая профилирование, если оно идет
+        (например, при выходе из программы)
+        '''
+
+        self.profiler.stop_profile()
+        self.profiler.stop_tracing()
+
+
+class VisualManager(ManageObj):
+    '''
+    Класс менеджера отрисовки, выполняющий роль
+    пройслойки между между модулем solar_vis.py и остальной программой.
+    '''
+
+    # События менеджера событий
+
+    REMOVEOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно удалить
+    '''
+
+    ADDOBJ = pg.event.custom_type()
+    '''
+    Событие данного типа должно иметь
+    атрибут target, указывающий на объект,
+    который нужно добавить
+    '''
+
+    SETUI = pg.event.custom_type()
+    '''
+    События данного типа должно иметь
+    атрибут ui, указывающий на объект UIManager,
+    который нужно установить
+    '''
+
+    def __init__(self, win_size):
+        '''
+        Функция, инициализирующая менеджер отрисовки.
+        :param win_size: словарь вида {"w", "h"}, размеры окна
+        '''
+
+        super().__init__()
+        self.ui = None
+        self.main_screen = s_vis.MainScreen(win_size)
+        self.first_frame = True
+
+    def idle(self):
+        '''
+        Функция, описывающая дефолтное поведение менеджера отрисовки
+        '''
+
+        self.main_screen.update()
+
+        if self.first_frame:
+            self.first_frame = False
+            report_startup("first frame")
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию менеджера отрисовки на полученное
+        событие
+        :param event: полученное событие, на которое менеджер отрисовки
+                      должен прореагировать
+        '''
+        if event.type == VisualManager.ADDOBJ:
+            self.main_screen.add_obj(event.target)
+            if event.target is not self.ui and self.ui is not None:
+                self.main_screen.remove_obj(self.ui)
+                self.main_screen.add_obj(self.ui)
+
+        elif event.type == VisualManager.REMOVEOBJ:
+            self.main_screen.remove_obj(event.target)
+
+        elif event.type == VisualManager.SETUI:
+            self.ui = event.ui
+
+
+class UIManager(ManageObj):
+    '''
+    Класс пользовательского интерфейса
+    '''
+
+    # События менеджера пользовательско интерфейса
+
+    UPDATELABEL = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут target - название надписи, которую
+    нужно обновить, и атрибут text - новая текст
+    надписи
+    '''
+
+    LOADPROGRESS = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут progress - доля выполненной загрузки
+    модели (от 0 до 1), и атрибут text - название
+    текущего этапа загрузки
+    '''
+
+    LOADFINISHED = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут loaded (boolean value) - была ли
+    новая модель загружена (False, если загрузка
+    была отменена или завершилась ошибкой), и
+    атрибут error - текст ошибки загрузки (None,
+    если ошибки не было)
+    '''
+
+    MESSAGE = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут text - сообщение (например, об ошибке),
+    которое показывается в надписи загрузки до
+    начала следующей загрузки или перемотки
+    '''
+
+    JUMPPROGRESS = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут progress - доля выполненной перемотки
+    модели (от 0 до 1)
+    '''
+
+    JUMPFINISHED = pg.event.custom_type()
+
+    '''
+    Событие данного типа сообщает о завершении
+    (или отмене) перемотки модели
+    '''
+
+    UPDATETIMELINE = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут progress - положение текущего момента
+    модели в ее истории (от 0 до 1)
+    '''
+
+    CATALOGUPDATED = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут changed - кол-во пересчитанных
+    описаний в каталоге сценариев, и атрибут
+    error - текст ошибки обновления (None, если
+    ошибки не было)
+    '''
+
+    # классы элементов pygame_gui (заполняются при построении интерфейса)
+    button = None
+    file_dialog = None
+    horiz_slider = None
+    label = None
+    selection_list = None
+    text_entry = None
+    window = None
+
+    def __init__(self, win_size):
+        '''
+        Функция, инициализирующая менеджер пользовательского
+        интерфейса (сами элементы интерфейса строятся в build
+        после первого кадра)
+        :param win_size: словарь вида {"w", "h"}, размеры окна
+        '''
+
+        super().__init__()
+        self.screen = None
+        self.win_size = dict(win_size)
+        self.gui_manager = None
+        self.ui_pool = {}
+        self.stopwatch = TimeManager.Stopwatch()
+        self.stopwatch.play()
+        self.stopwatch.change_flow(0.1)
+
+        # плитка, в которую загружаются и из которой сохраняются модели
+        self.active_tile = 0
+
+        # каталог сценариев (создается при первом открытии), поток,
+        # обновляющий его индекс, и ошибка последнего обновления
+        self.catalog = None
+        self.catalog_thread = None
+        self.catalog_error = None
+
+        # сообщение, полученное до построения интерфейса (например,
+        # об ошибке загрузки модели из командной строки)
+        self.message = None
+
+    def idle(self):
+        '''
+        Функция, описывающая дефолтное поведение пользовательского
+        интерфейса (построение интерфейса, если его еще нет)
+        '''
+
+        if self.gui_manager is None:
+            self.build()
+            report_startup("UI ready")
+
+    def build(self):
+        '''
+        Функция, импортирующая pygame_gui и строящая
+        элементы интерфейса
+        '''
+
+        global gui
+        import pygame_gui as gui
+
+        UIManager.button = gui.elements.ui_button.UIButton
+        UIManager.file_dialog = gui.windows.ui_file_dialog.UIFileDialog
+        UIManager.horiz_slider = \
+            gui.elements.ui_horizontal_slider.UIHorizontalSlider
+        UIManager.label = gui.elements.ui_label.UILabel
+        UIManager.selection_list = \
+            gui.elements.ui_selection_list.UISelectionList
+        UIManager.text_entry = gui.elements.ui_text_entry_line.UITextEntryLine
+        UIManager.window = gui.elements.ui_window.UIWindow
+
+        self.gui_manager = gui.UIManager((self.win_size["w"],
+                                          self.win_size["h"]))
+
+        load_button_params = {
+                              "relative_rect": pg.Rect(20, 20, 100, 50),
+                              "text": "Load model",
+                              "manager": self.gui_manager
+                             }
+        load_button = UIManager.button(**load_button_params)
+
+        save_button_params = {
+                              "relative_rect": pg.Rect(120, 20, 100, 50),
+                              "text": "Save model",
+                              "manager": self.gui_manager
+                             }
+        save_button = UIManager.button(**save_button_params)
+
+        pause_button_params = {
+                               "relative_rect": pg.Rect(220, 20, 100, 50),
+                               "text": "Pause",
+                               "manager": self.gui_manager
+                              }
+        pause_button = UIManager.button(**pause_button_params)
+
+        play_button_params = {
+                               "relative_rect": pg.Rect(320, 20, 100, 50),
+                               "text": "Play",
+                               "manager": self.gui_manager
+                              }
+        play_button = UIManager.button(**play_button_params)
+
+        cancel_button_params = {
+                                "relative_rect": pg.Rect(320, 70, 100, 25),
+                                "text": "Cancel",
+                                "manager": self.gui_manager
+                               }
+        cancel_button = UIManager.button(**cancel_button_params)
+        cancel_button.hide()
+
+        load_label_params = {
+                             "relative_rect": pg.Rect(20, 70, 300, 25),
+                             "manager": self.gui_manager,
+                             "text": ""
+                            }
+        load_label = UIManager.label(**load_label_params)
+        load_label.hide()
+
+        drift_label_params = {
+                              "relative_rect": pg.Rect(20, 95, 440, 25),
+                              "manager": self.gui_manager,
+                              "text": ""
+                             }
+        drift_label = UIManager.label(**drift_label_params)
+
+        body_label_params = {
+                             "relative_rect": pg.Rect(20, 120, 860, 25),
+                             "manager": self.gui_manager,
+                             "text": ""
+                            }
+        body_label = UIManager.label(**body_label_params)
+
+        jump_entry_params = {
+                             "relative_rect": pg.Rect(680, 95, 100, 25),
+                             "manager": self.gui_manager
+                            }
+        jump_entry = UIManager.text_entry(**jump_entry_params)
+        jump_entry.set_allowed_characters(list("0123456789."))
+
+        jump_button_params = {
+                              "relative_rect": pg.Rect(780, 95, 100, 25),
+                              "text": "Jump to year",
+                              "manager": self.gui_manager
+                             }
+        jump_button = UIManager.button(**jump_button_params)
+
+        speed_slider_params = {
+                               "relative_rect": pg.Rect(320, 70, 400, 25),
+                               "manager": self.gui_manager,
+                               "start_value": 0,
+                               "value_range": (-6, 12),
+                               "anchors": {
+                                           "left": "right",
+                                           "right": "right",
+                                           "top": "top",
+                                           "bottom": "top"
+                                          }
+                            }
+        speed_slider_params["relative_rect"].topright = (-20, 70)
+        speed_slider = UIManager.horiz_slider(**speed_slider_params)
+
+        speed_label_params = {
+                              "relative_rect": pg.Rect(320, 20, 200, 50),
+                              "manager": self.gui_manager,
+                              "text": "Current speed: 1",
+                              "anchors": {
+                                          "left": "right",
+                                          "right": "right",
+                                          "top": "top",
+                                          "bottom": "top"
+                                         }
+                            }
+        speed_label_params["relative_rect"].topright = (-220, 20)
+        speed_label = UIManager.label(**speed_label_params)
+
+        timer_label_params = {
+                              "relative_rect": pg.Rect(0, 20, 200, 50),
+                              "manager": self.gui_manager,
+                              "text": "Model time: 0y 0m",
+                              "anchors": {
+                                          "left": "right",
+                                          "right": "right",
+                                          "top": "top",
+                                          "bottom": "top"
+                                         }
+                             }
+        timer_label_params["relative_rect"].topright = (-20, 20)
+        timer_label = UIManager.label(**timer_label_params)
+
+        timeline_slider_params = {
+                                  "relative_rect": pg.Rect(20, 765, 660, 25),
+                                  "manager": self.gui_manager,
+                                  "start_value": TIMELINE_TICKS,
+                                  "value_range": (0, TIMELINE_TICKS)
+                                 }
+        timeline_slider = UIManager.horiz_slider(**timeline_slider_params)
+
+        timeline_label_params = {
+                                 "relative_rect": pg.Rect(680, 765, 200, 25),
+                                 "manager": self.gui_manager,
+                                 "text": "History: 0y 0m"
+                                }
+        timeline_label = UIManager.label(**timeline_label_params)
+
+        self.ui_pool = {
+                        "load button": load_button,
+                        "save button": save_button,
+                        "pause button": pause_button,
+                        "play button": play_button,
+                        "cancel button": cancel_button,
+                        "load label": load_label,
+                        "drift label": drift_label,
+                        "body label": body_label,
+                        "jump entry": jump_entry,
+                        "jump button": jump_button,
+                        "speed slider": {
+                                         "slider": speed_slider,
+                                         "last value": 0
+                                        },
+                        "speed label": speed_label,
+                        "timer label": timer_label,
+                        "timeline slider": {
+                                            "slider": timeline_slider,
+                                            "last value": TIMELINE_TICKS
+                                           },
+                        "timeline label": timeline_label
+                       }
+
+        if self.message is not None:
+            message_event = pg.event.Event(UIManager.MESSAGE,
+                                           {"text": self.message})
+            pg.event.post(message_event)
+            self.message = None
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию пользовательский интерфейс на
+        полученное событие
+        :param event: полученное событие, на которое пользовательский
+                      интерфейс должен прореагировать
+        '''
+        if event.type == ModelManager.SELECTTILE:
+            self.active_tile = event.tile
+
+        # до построения интерфейса обновлять нечего (надписи
+        # обновятся со следующими событиями), а сообщения
+        # откладываются до построения
+        if self.gui_manager is None:
+            if event.type == UIManager.MESSAGE:
+                self.message = event.text
+            elif event.type == UIManager.LOADFINISHED:
+                self.message = event.error
+            return
+
+        self.gui_manager.process_events(event)
+        self.gui_manager.update(self.stopwatch.get_tick())
+
+        if event.type == pg.USEREVENT:
+            if event.user_type == gui.UI_BUTTON_PRESSED:
+                self.button_handling(event)
+
+            elif event.user_type == gui.UI_HORIZONTAL_SLIDER_MOVED:
+                self.slider_handling(event)
+
+            elif event.user_type == gui.UI_FILE_DIALOG_PATH_PICKED:
+                self.file_dialog_handling(event)
+
+            elif event.user_type in (
+                    gui.UI_TEXT_ENTRY_CHANGED,
+                    gui.UI_SELECTION_LIST_DOUBLE_CLICKED_SELECTION,
+                    gui.UI_WINDOW_CLOSE):
+                self.catalog_handling(event)
+
+        elif event.type == UIManager.CATALOGUPDATED:
+            # полный текст ошибки не помещается в строку состояния
+            # каталога и показывается в надписи загрузки
+            self.catalog_error = event.error
+            if event.error is not None:
+                message_event = pg.event.Event(UIManager.MESSAGE,
+                                               {"text": event.error})
+                pg.event.post(message_event)
+            if "catalog" in self.ui_pool:
+                self.refresh_catalog()
+
+        elif event.type == UIManager.UPDATELABEL:
+            if event.target in self.ui_pool.keys():
+                self.ui_pool[event.target].set_text(event.text)
+
+        elif event.type == UIManager.LOADPROGRESS:
+            load_text = f"Loading: {event.progress * 100:.0f}% ({event.text})"
+            self.ui_pool["load label"].set_text(load_text)
+            self.ui_pool["load label"].show()
+            self.ui_pool["cancel button"].show()
+
+        elif event.type == UIManager.UPDATETIMELINE:
+            value = round(event.progress * TIMELINE_TICKS)
+            self.ui_pool["timeline slider"]["slider"].set_current_value(value)
+            self.ui_pool["timeline slider"]["last value"] = value
+
+        elif event.type == UIManager.JUMPPROGRESS:
+            jump_text = f"Jumping: {event.progress * 100:.0f}%"
+            self.ui_pool["load label"].set_text(jump_text)
+            self.ui_pool["load label"].show()
+            self.ui_pool["cancel button"].show()
+
+        elif event.type == UIManager.JUMPFINISHED:
+            self.ui_pool["load label"].hide()
+            self.ui_pool["cancel button"].hide()
+
+        elif event.type == UIManager.MESSAGE:
+            self.ui_pool["load label"].set_text(event.text)
+            self.ui_pool["load label"].show()
+            self.ui_pool["cancel button"].hide()
+
+        elif event.type == UIManager.LOADFINISHED:
+            self.ui_pool["load label"].hide()
+            self.ui_pool["cancel button"].hide()
+
+            if event.error is not None:
+                self.ui_pool["load label"].set_text(event.error)
+                self.ui_pool["load label"].show()
+
+            if event.loaded:
+                self.ui_pool["speed slider"]["slider"].set_current_value(0)
+                self.ui_pool["speed slider"]["last value"] = 0
+
+                self.ui_pool["timeline slider"]["slider"].set_current_value(
+                    TIMELINE_TICKS)
+                self.ui_pool["timeline slider"]["last value"] = TIMELINE_TICKS
+
+                self.ui_pool["timer label"].set_text("Model time: 0y 0m")
+                self.ui_pool["timeline label"].set_text("History: 0y 0m")
+                self.ui_pool["speed label"].set_text("Current speed: 1")
+                self.ui_pool["drift label"].set_text("")
+                self.ui_pool["body label"].set_text("")
+
+    def button_handling(self, event):
+        '''
+        Функция, обрабатывающая события, связанные с кнопками
+        :param event: полученное событие, на которое пользовательский
+                      интерфейс должен прореагировать
+        '''
+        if event.user_type == gui.UI_BUTTON_PRESSED:
+            if event.ui_element is self.ui_pool["load button"]:
+                self.open_catalog()
+
+            elif "catalog" in self.ui_pool and \
+                    event.ui_element in self.ui_pool["catalog"]["buttons"]:
+                self.catalog_handling(event)
+
+            elif event.ui_element is self.ui_pool["save button"]:
+                win_params = {
+                              "rect": pg.Rect(20, 20, 500, 400),
+                              "manager": self.gui_manager,
+                              "window_title": "Choose the file to save",
+                              "initial_file_path": MODELS_DIR
+                             }
+                file_dialog = UIManager.file_dialog(**win_params)
+                self.ui_pool.update({"file save": file_dialog})
+
+            elif event.ui_element is self.ui_pool["pause button"]:
+                pause_event = pg.event.Event(ModelManager.TOGGLE,
+                                             {"mode": False})
+                pg.event.post(pause_event)
+
+            elif event.ui_element is self.ui_pool["play button"]:
+                play_event = pg.event.Event(ModelManager.TOGGLE,
+                                            {"mode": True})
+                pg.event.post(play_event)
+
+            elif event.ui_element is self.ui_pool["cancel button"]:
+                cancel_event = pg.event.Event(ModelManager.CANCELLOAD)
+                pg.event.post(cancel_event)
+
+            elif event.ui_element is self.ui_pool["jump button"]:
+                try:
+                    years = float(self.ui_pool["jump entry"].get_text())
+                except ValueError:
+                    return
+                jump_event = pg.event.Event(ModelManager.JUMP,
+                                            {"time": years * YEAR})
+                pg.event.post(jump_event)
+
+    def slider_handling(self, event):
+        '''
+        Функция, обрабатывающая события, связанные со слайдерами
+        :param event: полученное событие, на которое пользовательский
+                      интерфейс должен прореагировать
+        '''
+        if event.user_type == gui.UI_HORIZONTAL_SLIDER_MOVED:
+            if event.ui_element == self.ui_pool["speed slider"]["slider"]:
+                value = event.ui_element.get_current_value()
+
+                if value != self.ui_pool["speed slider"]["last value"]:
+                    self.ui_pool["speed slider"]["last value"] = value
+
+                    scale = 10 ** (value / 10)
+
+                    speed_text = f"Current speed: {scale:.4f}"
+                    self.ui_pool["speed label"].set_text(speed_text)
+
+                    scale_event = pg.event.Event(ModelManager.CHANGEFLOW,
+                                                 {"scale": scale})
+                    pg.event.post(scale_event)
+
+            elif event.ui_element == \
+                    self.ui_pool["timeline slider"]["slider"]:
+                value = event.ui_element.get_current_value()
+
+                if value != self.ui_pool["timeline slider"]["last value"]:
+                    self.ui_pool["timeline slider"]["last value"] = value
+
+                    seek_event = pg.event.Event(ModelManager.SEEK,
+                                                {"progress": value /
+                                                 TIMELINE_TICKS,
+                                                 "tile": self.active_tile})
+                    pg.event.post(seek_event)
+
+    def file_dialog_handling(self, event):
+        '''
+        Функция, обрабатывающая события, связанные со окном выбора файла
+        :param event: полученное событие, на которое пользовательский
+                      интерфейс должен прореагировать
+        '''
+
+        if event.user_type == gui.UI_FILE_DIALOG_PATH_PICKED:
+            if "file load" in self.ui_pool:
+                if event.ui_element is self.ui_pool["file load"]:
+                    load_event = pg.event.Event(ModelManager.LOAD,
+                                                {"file": event.text,
+                                                 "tile": self.active_tile})
+                    pg.event.post(load_event)
+                    self.ui_pool.pop("file load")
+
+            if "file save" in self.ui_pool:
+                if event.ui_element is self.ui_pool["file save"]:
+                    load_event = pg.event.Event(ModelManager.SAVE,
+                                                {"file": event.text,
+                                                 "tile": self.active_tile})
+                    pg.event.post(load_event)
+                    self.ui_pool.pop("file save")
+
+    def open_catalog(self):
+        '''
+        Функция, открывающая окно каталога сценариев: список строится
+        по индексу каталога сразу, а индекс обновляется в фоновом потоке
+        (после обновления список перестраивается)
+        '''
+        if "catalog" in self.ui_pool:
+            return
+        if self.catalog is None:
+            self.catalog = s_catalog.Catalog(MODELS_DIR)
+
+        window = UIManager.window(rect=pg.Rect(20, 20, 700, 440),
+                                  manager=self.gui_manager,
+                                  window_display_title="Choose the model "
+                                                       "to load")
+
+        filter_entry = UIManager.text_entry(
+            relative_rect=pg.Rect(10, 10, 220, 30),
+            manager=self.gui_manager, container=window)
+
+        # кнопки сортировки по ключам каталога
+        buttons = {}
+        sort_names = {
+                      "name": "Name",
+                      "bodies": "Bodies",
+                      "mass": "Mass",
+                      "extent": "Size",
+                      "time scale": "Speed",
+                      "mtime": "Date"
+                     }
+        for i, key in enumerate(s_catalog.SORT_KEYS):
+            sort_button = UIManager.button(
+                relative_rect=pg.Rect(240 + 72 * i, 10, 72, 30),
+                text=sort_names[key], manager=self.gui_manager,
+                container=window)
+            buttons[sort_button] = key
+
+        item_list = UIManager.selection_list(
+            relative_rect=pg.Rect(10, 50, 660, 290),
+            item_list=[], manager=self.gui_manager, container=window)
+
+        status_label = UIManager.label(
+            relative_rect=pg.Rect(10, 350, 440, 30), text="",
+            manager=self.gui_manager, container=window)
+
+        browse_button = UIManager.button(
+            relative_rect=pg.Rect(460, 350, 100, 30), text="Browse...",
+            manager=self.gui_manager, container=window)
+        buttons[browse_button] = "browse"
+
+        load_button = UIManager.button(
+            relative_rect=pg.Rect(570, 350, 100, 30), text="Load",
+            manager=self.gui_manager, container=window)
+        buttons[load_button] = "load"
+
+        self.ui_pool["catalog"] = {
+                                   "window": window,
+                                   "filter": filter_entry,
+                                   "list": item_list,
+                                   "status": status_label,
+                                   "buttons": buttons,
+                                   "rows": {},
+                                   "sort": "name",
+                                   "reverse": False
+                                  }
+        self.refresh_catalog()
+
+        if self.catalog_thread is None or not self.catalog_thread.is_alive():
+            self.catalog_error = None
+            self.catalog_thread = threading.Thread(target=self.update_catalog,
+                                                   daemon=True)
+            self.catalog_thread.start()
+
+    def update_catalog(self):
+        '''
+        Функция, обновляющая индекс каталога сценариев
+        (выполняется в фоновом потоке)
+        '''
+        try:
+            changed = self.catalog.update()
+            error = None
+        except OSError as exception:
+            changed = 0
+            error = f"Failed to update the model catalog: {exception}"
+
+        updated_event = pg.event.Event(UIManager.CATALOGUPDATED,
+                                       {"changed": changed, "error": error})
+        pg.event.post(updated_event)
+
+    def refresh_catalog(self):
+        '''
+        Функция, перестраивающая список окна каталога по текущему
+        индексу, строке отбора и порядку сортировки
+        '''
+        catalog_ui = self.ui_pool["catalog"]
+        entries = self.catalog.query(catalog_ui["filter"].get_text(),
+                                     catalog_ui["sort"],
+                                     catalog_ui["reverse"])
+
+        catalog_ui["rows"] = {self.format_entry(entry): entry["name"]
+                              for entry in entries}
+        catalog_ui["list"].set_item_list(list(catalog_ui["rows"]))
+
+        status = f"{len(entries)} of {len(self.catalog.entries)} models"
+        if self.catalog_thread is not None and \
+                self.catalog_thread.is_alive():
+            status += " (updating...)"
+        elif self.catalog_error is not None:
+            status += " (update failed)"
+        catalog_ui["status"].set_text(status)
+
+    def catalog_handling(self, event):
+        '''
+        Функция, обрабатывающая события, связанные с окном каталога
+        :param event: полученное событие, на которое пользовательский
+                      интерфейс должен прореагировать
+        '''
+        if "catalog" not in self.ui_pool:
+            return
+        catalog_ui = self.ui_pool["catalog"]
+
+        if event.user_type == gui.UI_WINDOW_CLOSE:
+            if event.ui_element is catalog_ui["window"]:
+                self.ui_pool.pop("catalog")
+
+        elif event.user_type == gui.UI_TEXT_ENTRY_CHANGED:
+            if event.ui_element is catalog_ui["filter"]:
+                self.refresh_catalog()
+
+        elif event.user_type == gui.UI_SELECTION_LIST_DOUBLE_CLICKED_SELECTION:
+            if event.ui_element is catalog_ui["list"]:
+                self.load_from_catalog(event.text)
+
+        elif event.user_type == gui.UI_BUTTON_PRESSED:
+            action = catalog_ui["buttons"][event.ui_element]
+
+            if action == "load":
+                row = catalog_ui["list"].get_single_selection()
+                if row is not None:
+                    self.load_from_catalog(row)
+
+            elif action == "browse":
+                catalog_ui["window"].kill()
+                self.ui_pool.pop("catalog")
+                win_params = {
+                              "rect": pg.Rect(20, 20, 500, 400),
+                              "manager": self.gui_manager,
+                              "window_title": "Choose the file to load",
+                              "initial_file_path": MODELS_DIR
+                             }
+                file_dialog = UIManager.file_dialog(**win_params)
+                self.ui_pool.update({"file load": file_dialog})
+
+            else:
+                # повторное нажатие на ключ сортировки меняет порядок
+                catalog_ui["reverse"] = action == catalog_ui["sort"] and \
+                    not catalog_ui["reverse"]
+                catalog_ui["sort"] = action
+                self.refresh_catalog()
+
+    def load_from_catalog(self, row):
+        '''
+        Функция, загружающая выбранный в каталоге сценарий
+        :param row: строка списка каталога
+        '''
+        catalog_ui = self.ui_pool["catalog"]
+        name = catalog_ui["rows"].get(row)
+        if name is None:
+            return
+
+        load_event = pg.event.Event(ModelManager.LOAD,
+                                    {"file": self.catalog.get_path(name),
+                                     "tile": self.active_tile})
+        pg.event.post(load_event)
+        catalog_ui["window"].kill()
+        self.ui_pool.pop("catalog")
+
+    @staticmethod
+    def format_entry(entry):
+        '''
+        Функция, возвращающая строку списка каталога для описания
+        сценария
+        :param entry: описание сценария из каталога
+        '''
+        if "error" in entry:
+            error = entry["error"].splitlines()[0]
+            return f"{entry['name']} | unreadable: {error}"
+
+        date = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["mtime"]))
+        return f"{entry['name']} | {entry['bodies']} bodies | " \
+               f"mass {entry['mass']:.3g} kg | size {entry['extent']:.3g} m" \
+               f" | speed x{entry['time scale']} | {entry['format']}" \
+               f" | {date}"
+
+    def draw(self):
+        '''
+        Функция, отрисовывающая пользовательский интерфейс
+        '''
+        if self.gui_manager is not None:
+            self.gui_manager.draw_ui(self.screen.get_surface())
+
+    def set_screen(self, screen):
+        '''
+        Функция, устанавливающая связь с холстом
+        :param screen: объект solar_vis.Screen, с которым
+                              нужно установить связь
+        '''
+        self.screen = screen
+
+        add_event = pg.event.Event(VisualManager.ADDOBJ,
+                                   {"target": self})
+        pg.event.post(add_event)
+
+        add_ui_event = pg.event.Event(VisualManager.SETUI,
+                                      {"ui": self})
+        pg.event.post(add_ui_event)
+
+
+class ModelLoader(threading.Thread):
+    '''
+    Класс фонового загрузчика модели: читает файл, создает
+    модель и ее отображение в отдельном потоке, сообщая о ходе
+    загрузки событиями UIManager.LOADPROGRESS, и по окончании
+    отправляет событие ModelManager.LOADED
+    '''
+
+    class Cancelled(Exception):
+        '''
+        Исключение, прерывающее отмененную загрузку
+        '''
+        pass
+
+    def __init__(self, file, pos, size):
+        '''
+        Функция, инициализирующая загрузчик модели
+        :param file: путь к файлу, из которого нужно загрузить модель
+        :param pos: словарь {x, y} с позицией левого верхнего
+                    угла отображения модели
+        :param size: словарь вида {"w", "h"}, размеры отображения модели
+        '''
+        super().__init__(daemon=True)
+        self.file = file
+        self.pos = dict(pos)
+        self.size = dict(size)
+        self.cancelled = threading.Event()
+        self.last_progress = None
+
+        self.data = None
+        self.model = None
+        self.visual = None
+        self.error = None
+
+    def run(self):
+        '''
+        Функция, выполняющая загрузку модели в фоновом потоке
+        '''
+        try:
+            self.report(0, "reading file")
+            data, columns = s_input.read_model_stream(
+                self.file, lambda part: self.report(0.35 * part,
+                                                    "reading file"))
+
+            self.report(0.35, "creating objects")
+            model = s_model.Model(data.get("Collisions", "reflect"),
+                                  data.get("Propagation", "nbody"),
+                                  detection=data.get("Detection",
+                                                     "overlap"),
+                                  precision=data.get("Precision", "double"),
+                                  softening=data.get("Softening", 0.0),
+                                  regularization=data.get("Regularization",
+                                                          True))
+            model.load_columns(columns)
+
+            # сохранения продолжают модельное время, с которым записаны
+            model.time = data.get("Time", 0.0)
+
+            self.report(0.4, "measuring")
+            max_distance = 2.1 * model.get_max_distance(
+                lambda part: self.report(0.4 + 0.5 * part, "measuring"))
+            scale = min(self.size.values()) / max_distance
+
+            self.report(0.9, "creating sprites")
+            visual = s_vis.ModelVisual(scale, model, self.pos, self.size)
+
+            self.data = data
+            self.model = model
+            self.visual = visual
+
+        except ModelLoader.Cancelled:
+            pass
+
+        except Exception as error:
+            self.error = error
+
+        loaded_event = pg.event.Event(ModelManager.LOADED, {"loader": self})
+        pg.event.post(loaded_event)
+
+    def report(self, progress, text):
+        '''
+        Функция, сообщающая о ходе загрузки (не чаще, чем раз в процент)
+        и прерывающая загрузку, если она была отменена
+        :param progress: доля выполненной загрузки (от 0 до 1)
+        :param text: название текущего этапа загрузки
+        '''
+        if self.cancelled.is_set():
+            raise ModelLoader.Cancelled()
+
+        progress = int(progress * 100) / 100
+        if progress != self.last_progress:
+            self.last_progress = progress
+            progress_event = pg.event.Event(UIManager.LOADPROGRESS,
+                                            {"progress": progress,
+                                             "text": text})
+            pg.event.post(progress_event)
+
+    def cancel(self):
+        '''
+        Функция, отменяющая загрузку
+        '''
+        self.cancelled.set()
+
+    def get_error(self):
+        '''
+        Функция, возвращающая текст ошибки загрузки (None, если
+        ошибки не было)
+        '''
+        if self.error is None:
+            return None
+        return f"Failed to load {self.file}: {self.error}"
+
+
+class ModelWorker(threading.Thread):
+    '''
+    Класс потока, продвигающего модель своей плитки независимо от
+    отрисовки (модели разных плиток продвигаются параллельно, так
+    как numpy отпускает GIL на время вычислений с массивами)
+
+    Очередь шагов ограничена: модель, не успевающая за отрисовкой,
+    идет медленнее заданной скорости, а не отстает все больше
+    '''
+
+    def __init__(self, model_manager, max_pending=MAX_PENDING):
+        '''
+        Функция, инициализирующая поток
+        :param model_manager: объект ModelManager, модель которого
+                              продвигает поток
+        :param max_pending: наибольшее кол-во шагов в очереди
+        '''
+
+        super().__init__(daemon=True)
+        self.model_manager = model_manager
+        self.max_pending = max_pending
+        self.pending = collections.deque()
+
+        # сумма шагов в очереди и признак того, что последний шаг
+        # был пропущен из-за переполнения очереди
+        self.lag = 0
+        self.saturated = False
+        self.condition = threading.Condition()
+        self.generation = 0
+        self.stopped = False
+
+        # частота шагов модели (шагов в секунду)
+        self.rate = 0
+
+    def submit(self, dt):
+        '''
+        Функция, добавляющая шаг модели в очередь (если очередь
+        заполнена, шаг пропускается)
+        :param dt: изменение времени модели
+        Возвращает True, если шаг добавлен в очередь
+        '''
+
+        with self.condition:
+            self.saturated = len(self.pending) >= self.max_pending
+            if self.saturated:
+                return False
+            self.pending.append(dt)
+            self.lag += dt
+            self.condition.notify()
+            return True
+
+    def clear(self):
+        '''
+        Функция, отбрасывающая еще не сделанные шаги (например,
+        перед заменой модели или ее перемоткой)
+        '''
+
+        with self.condition:
+            self.pending.clear()
+            self.lag = 0
+            self.saturated = False
+            self.generation += 1
+
+    def get_lag(self):
+        '''
+        Функция, возвращающая модельное время, на которое
+        модель отстает от поставленных ей шагов
+        '''
+
+        with self.condition:
+            return self.lag
+
+    def run(self):
+        '''
+        Функция потока: делает шаги из очереди по одному, захватывая
+        блокировку менеджера модели на время каждого шага
+        '''
+
+        steps = 0
+        start = time.perf_counter()
+
+        while True:
+            with self.condition:
+                while not self.pending and not self.stopped:
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                dt = self.pending.popleft()
+                # при опустевшей очереди сумма обнуляется, чтобы не
+                # накапливались ошибки округления
+                self.lag = self.lag - dt if self.pending else 0
+                generation = self.generation
+
+            with self.model_manager.lock:
+                if generation == self.generation:
+                    self.model_manager.step(dt)
+
+            steps += 1
+            now = time.perf_counter()
+            if now - start >= RATE_PERIOD:
+                self.rate = steps / (now - start)
+                steps = 0
+                start = now
+
+    def stop(self):
+        '''
+        Функция, останавливающая поток
+        '''
+
+        with self.condition:
+            self.stopped = True
+            self.condition.notify()
+        self.join()
+
+
+class ModelManager(ManageObj):
+    '''
+    Класс менеджера модели, являющийся прослойкой между
+    solar_model.py и остальной программой
+    '''
+
+    # События менеджера модели
+
+    LOAD = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут file, содержащий путь к файлу,
+    из которого нужно загрузить модель
+    '''
+
+    SAVE = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут file, содержащий путь к файлу,
+    в который нужно сохранить модель
+    '''
+
+    CHANGEFLOW = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут scale - новая скорость течения времени
+    в модели относительно дефолтной скорости течения времени в модели
+    (загружается из файла)
+    '''
+
+    TOGGLE = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут mode (boolean value) - режим, в который
+    нужно переключить модель
+    '''
+
+    CANCELLOAD = pg.event.custom_type()
+
+    '''
+    Событие данного типа отменяет текущую фоновую
+    загрузку или перемотку модели (если она идет)
+    '''
+
+    JUMP = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут time - модельное время (в секундах),
+    до которого нужно перемотать модель без отрисовки
+    '''
+
+    SEEK = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут progress - момент истории модели (от 0 до 1),
+    к которому нужно вернуть модель
+    '''
+
+    LOADED = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут loader - объект ModelLoader, который
+    завершил свою работу
+    '''
+
+    SELECTTILE = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибут tile - номер плитки, которая становится
+    активной (ей передаются клавиши управления камерой
+    и ее время показывается в надписях)
+    '''
+
+    SETCAMERA = pg.event.custom_type()
+
+    '''
+    Событие данного типа должно иметь
+    атрибуты camera - камера (словарь {scale, offset}) и
+    source - номер плитки, камеру которой нужно повторить
+    в остальных плитках, если камеры синхронизированы
+    '''
+
+    # События менеджера модели, кроме SELECTTILE и SETCAMERA, могут
+    # иметь атрибут tile - номер плитки, которой они адресованы
+    # (без него событие получают все плитки)
+
+    def __init__(self, pos, size, tile=0, threaded=False):
+        '''
+        Функция инициализирующая менеджер модели
+        :param pos: словарь вида {"x", "y"}, позиция плитки модели
+        :param size: словарь вида {"w", "h"}, размеры плитки модели
+        :param tile: номер плитки (при сравнении нескольких моделей)
+        :param threaded: флаг, показывающий надо ли продвигать модель
+                         в отдельном потоке (независимо от отрисовки)
+        '''
+        self.size = dict(size)
+        self.pos = dict(pos)
+        self.tile = tile
+        self.active = tile == 0
+        self.sync_camera = False
+
+        # блокировка модели, захватываемая на время ее шагов, обработки
+        # событий и отрисовки
+        self.lock = threading.RLock()
+        self.worker = None
+        if threaded:
+            self.worker = ModelWorker(self)
+            self.worker.start()
+
+        self.model = None
+        self.visual = None
+        self.screen = None
+        self.stopwatch = None
+        self.default_speed = 1
+        self.loader = None
+        self.recorder = None
+        self.server = None
+        self.trajectory = None
+        self.saver = s_autosave.ModelSaver()
+        self.jump_target = None
+        self.jump_start = 0
+        self.jump_label_time = 0
+        self.timeline = None
+        self.seek_target = None
+        self.seek_request = 0
+
+        self.camera_watch = TimeManager.Stopwatch()
+        self.camera_watch.play()
+
+    def call(self, event):
+        '''
+        Функция, описывающая реакцию менеджера модели на
+        полученное событие (события, адресованные другим плиткам,
+        пропускаются)
+        :param event: полученное событие, на которое менеджер модели
+                      должен прореагировать
+        '''
+
+        if event.type != ModelManager.SELECTTILE and \
+                getattr(event, "tile", self.tile) != self.tile:
+            return
+
+        with self.lock:
+            self.handle_event(event)
+
+    def handle_event(self, event):
+        '''
+        Функция, обрабатывающая событие при захваченной
+        блокировке модели
+        :param event: полученное событие, на которое менеджер модели
+                      должен прореагировать
+        '''
+
+        if event.type == ModelManager.LOAD:
+            if self.loader is not None:
+                self.loader.cancel()
+
+            # загружаемый файл может еще записываться в фоне
+            self.saver.flush()
+            self.loader = ModelLoader(event.file, self.pos, self.size)
+            self.loader.start()
+
+        elif event.type == ModelManager.CANCELLOAD:
+            if self.loader is not None:
+                self.loader.cancel()
+            if self.jump_target is not None:
+                self.finish_jump()
+
+        elif event.type == ModelManager.JUMP:
+            self.start_jump(event.time)
+
+        elif event.type == ModelManager.SEEK:
+            if self.timeline is not None:
+                start = self.timeline.get_start_time()
+                end = self.timeline.get_end_time()
+                self.preview_seek(start + (end - start) * event.progress)
+
+        elif event.type == ModelManager.LOADED:
+            if event.loader is self.loader:
+                self.loader = None
+                self.swap_model(event.loader)
+
+        elif event.type == ModelManager.SAVE:
+            if self.model is not None:
+                self.record(s_record.SAVE, event.file)
+                self.saver.save(self.model, self.get_header(), event.file)
+
+        elif event.type == ModelManager.CHANGEFLOW:
+            if self.stopwatch is not None:
+                self.record(s_record.CHANGEFLOW, event.scale)
+                self.stopwatch.change_flow(event.scale * self.default_speed)
+
+        elif event.type == ModelManager.TOGGLE:
+            if self.stopwatch is not None:
+                self.record(s_record.TOGGLE, event.mode)
+                if event.mode:
+                    self.stopwatch.play()
+                else:
+                    self.stopwatch.pause()
+                    # пауза не ждет шагов, уже поставленных в очередь
+                    if self.worker is not None:
+                        self.worker.clear()
+
+        elif event.type == ModelManager.SELECTTILE:
+            self.active = event.tile == self.tile
+
+        elif event.type == ModelManager.SETCAMERA:
+            if self.sync_camera and event.source != self.tile and \
+                    self.visual is not None:
+                self.visual.camera = {"scale": event.camera["scale"],
+                                      "offset": event.camera["offset"].copy()}
+
+        elif event.type == pg.KEYDOWN:
+            self.key_handling(event)
+
+        elif event.type == pg.MOUSEWHEEL:
+            self.wheel_handling(event)
+
+        elif event.type == pg.MOUSEBUTTONDOWN:
+            if self.worker is not None and self.contains(event.pos):
+                select_event = pg.event.Event(ModelManager.SELECTTILE,
+                                              {"tile": self.tile})
+                pg.event.post(select_event)
+
+            self.mouse_handling(event)
+
+    def swap_model(self, loader):
+        '''
+        Функция, заменяющая текущую модель на модель, загруженную
+        в фоне (если загрузка не была отменена)
+        :param loader: объект ModelLoader, завершивший загрузку
+        '''
+
+        if loader.model is None or loader.cancelled.is_set():
+            finished_event = pg.event.Event(UIManager.LOADFINISHED,
+                                            {"loaded": False,
+                                             "error": loader.get_error()})
+            pg.event.post(finished_event)
+            return
+
+        if self.model is not None:
+            remove_event = pg.event.Event(VisualManager.REMOVEOBJ,
+                                          {"target": self.visual})
+            pg.event.post(remove_event)
+
+        if self.worker is not None:
+            self.worker.clear()
+
+        self.record(s_record.LOAD, loader.file)
+        self.jump_target = None
+        self.seek_target = None
+        self.model = loader.model
+        self.model.diagnostics = s_diag.Diagnostics()
+        self.model.diagnostics.add_alert_listener(self.drift_alert)
+        self.timeline = s_timeline.Timeline(self.model)
+
+        self.stopwatch = TimeManager.Stopwatch()
+        self.stopwatch.play()
+        self.stopwatch.restart(self.model.time)
+        self.stopwatch.change_flow(loader.data["Time scale"])
+        self.default_speed = loader.data["Time scale"]
+
+        self.visual = loader.visual
+        self.visual.lock = self.lock
+        self.visual.set_screen(self.screen)
+        add_event = pg.event.Event(VisualManager.ADDOBJ,
+                                   {"target": self.visual})
+        pg.event.post(add_event)
+
+        finished_event = pg.event.Event(UIManager.LOADFINISHED,
+                                        {"loaded": True, "error": None})
+        pg.event.post(finished_event)
+
+    def start_jump(self, target):
+        '''
+        Функция, начинающая перемотку модели до указанного времени:
+        отрисовка модели приостанавливается, а модель продвигается
+        так быстро, как позволяет процессор
+        :param target: модельное время (в секундах), до которого
+                       нужно перемотать модель
+        Возвращает True, если перемотка начата
+        '''
+
+        if self.model is None or self.jump_target is not None:
+            return False
+
+        if target <= self.model.time:
+            text = f"Model time is already past {format_time(target)}"
+            message_event = pg.event.Event(UIManager.MESSAGE, {"text": text})
+            pg.event.post(message_event)
+            return False
+
+        if self.worker is not None:
+            self.worker.clear()
+
+        self.jump_target = target
+        self.jump_start = self.model.time
+        remove_event = pg.event.Event(VisualManager.REMOVEOBJ,
+                                      {"target": self.visual})
+        pg.event.post(remove_event)
+        return True
+
+    def jump(self, budget=None, dt=None):
+        '''
+        Функция, продвигающая модель к цели перемотки
+        :param budget: наибольшее время (в секундах), которое можно
+                       потратить, по умолчанию без ограничения
+        :param dt: шаг модели, по умолчанию равен шагу кадра
+                   при текущей скорости
+        Возвращает True, если цель перемотки достигнута (или модель
+        остановлена событием)
+        '''
+
+        if dt is None:
+            dt = self.stopwatch.scale / FPS
+        deadline = None if budget is None else time.perf_counter() + budget
+        events = self.model.events
+
+        while self.jump_target - self.model.time > 1e-9 * dt:
+            self.step(min(dt, self.jump_target - self.model.time))
+            if events is not None and events.stopped:
+                return True
+            if deadline is not None and time.perf_counter() > deadline:
+                return False
+
+        return True
+
+    def finish_jump(self):
+        '''
+        Функция, завершающая (или отменяющая) перемотку модели
+        и возобновляющая ее отрисовку
+        '''
+
+        self.jump_target = None
+        self.stopwatch.restart(self.model.time)
+
+        add_event = pg.event.Event(VisualManager.ADDOBJ,
+                                   {"target": self.visual})
+        pg.event.post(add_event)
+        finished_event = pg.event.Event(UIManager.JUMPFINISHED)
+        pg.event.post(finished_event)
+
+    def preview_seek(self, target):
+        '''
+        Функция, приостанавливающая модель и показывающая приближенное
+        состояние модели в прошедший момент (сама модель возвращается
+        к нему, когда слайдер истории перестанет двигаться)
+        :param target: модельное время (в секундах)
+        '''
+
+        if self.model is None or self.jump_target is not None:
+            return
+
+        self.stopwatch.pause()
+        self.seek_target = target
+        self.seek_request = time.perf_counter()
+        self.visual.preview = self.timeline.positions_at(target)
+
+    def seek(self, target):
+        '''
+        Функция, возвращающая модель к последнему шагу, сделанному
+        не позже указанного момента ее истории
+        :param target: модельное время (в секундах)
+        '''
+
+        if self.worker is not None:
+            self.worker.clear()
+
+        self.record(s_record.SEEK, target)
+        self.seek_target = None
+        self.visual.preview = None
+        self.stopwatch.pause()
+        self.stopwatch.restart(self.timeline.seek(target))
+        self.publish()
+
+    def drift_alert(self, sample):
+        '''
+        Функция, сообщающая о превышении порога ухода
+        сохраняющихся величин модели
+        :param sample: словарь измерения solar_diag.Diagnostics
+        '''
+
+        print(f"Conservation drift above "
+              f"{self.model.diagnostics.threshold:g} "
+              f"at model time {sample['time']:.0f} s: "
+              f"energy {sample['energy drift']:.2e}, "
+              f"momentum {sample['momentum drift']:.2e}, "
+              f"angular momentum {sample['angular drift']:.2e}")
+
+    def load_now(self, file):
+        '''
+        Функция, загружающая модель из файла без фонового потока
+        (для работы без окна)
+        :param file: путь к файлу, из которого нужно загрузить модель
+        Возвращает текст ошибки загрузки (None, если модель загружена)
+        '''
+
+        self.saver.flush()
+        loader = ModelLoader(file, self.pos, self.size)
+        loader.run()
+        self.swap_model(loader)
+
+        return loader.get_error()
+
+    def step(self, dt):
+        '''
+        Функция, продвигающая модель на dt (и записывающая шаг,
+        если ведется запись)
+        :param dt: изменение времени модели
+        '''
+
+        self.record(s_record.STEP, dt)
+        self.model.update(dt)
+        self.timeline.record(dt)
+        self.publish()
+        if self.trajectory is not None:
+            self.trajectory.write()
+
+        if self.saver.due(self.model.time):
+            self.saver.autosave(self.model, self.get_header())
+
+    def get_header(self):
+        '''
+        Функция, возвращающая словарь с параметрами модели для
+        файла сохранения (без объектов)
+        '''
+
+        data = {"Time scale": self.default_speed}
+        if self.model.time:
+            data["Time"] = self.model.time
+        if self.model.collisions != "reflect":
+            data["Collisions"] = self.model.collisions
+        if self.model.propagation != "nbody":
+            data["Propagation"] = self.model.propagation
+        if self.model.detection != "overlap":
+            data["Detection"] = self.model.detection
+        if self.model.precision != "double":
+            data["Precision"] = self.model.precision
+        if self.model.softening:
+            data["Softening"] = self.model.softening
+        if not self.model.regularization:
+            data["Regularization"] = False
+
+        return data
+
+    def record(self, tag, *values):
+        '''
+        Функция, добавляющая запись о шаге или команде,
+        если ведется запись
+        :param tag: тип записи из solar_record
+        :param values: данные записи
+        '''
+
+        if self.recorder is not None:
+            self.recorder.write(tag, *values)
+
+    def move_camera(self, offset):
+        '''
+        Функция, смещающая камеру отображения модели
+        :param offset: словарь {x, y} с координатами смещения камеры
+        '''
+
+        if self.visual is not None:
+            self.record(s_record.MOVE, offset["x"], offset["y"])
+            self.visual.move_camera(offset)
+            self.share_camera()
+
+    def zoom_camera(self, zoom, center=None):
+        '''
+        Функция, приближающая камеру отображения модели
+        :param zoom: кол-во процентов, которое приблизится камера
+        :param center: словарь {x, y} с неподвижной точкой подэкрана,
+                       по умолчанию центр подэкрана
+        '''
+
+        if center is None:
+            center = {"x": self.size["w"] / 2, "y": self.size["h"] / 2}
+
+        if self.visual is not None:
+            self.record(s_record.ZOOM, zoom, center["x"], center["y"])
+            self.visual.zoom_camera(zoom, center)
+            self.share_camera()
+
+    def default_camera(self):
+        '''
+        Функция, возвращающая камеру отображения модели в
+        дефолтное состояние
+        '''
+
+        if self.visual is not None:
+            self.record(s_record.RESET)
+            self.visual.default_camera()
+            self.share_camera()
+
+    def share_camera(self):
+        '''
+        Функция, передающая камеру плитки остальным плиткам,
+        если камеры синхронизированы
+        '''
+
+        if self.sync_camera and self.visual is not None:
+            camera_event = pg.event.Event(ModelManager.SETCAMERA,
+                                          {"camera": self.visual.camera,
+                                           "source": self.tile})
+            pg.event.post(camera_event)
+
+    def contains(self, point):
+        '''
+        Функция, проверяющая, лежит ли точка окна в плитке модели
+        :param point: координаты точки окна (x, y)
+        '''
+
+        return 0 <= point[0] - self.pos["x"] < self.size["w"] and \
+            0 <= point[1] - self.pos["y"] < self.size["h"]
+
+    def key_handling(self, event):
+        '''
+        Функция, обрабатывающая события, связанные с нажатием клавиш
+        (смещение и приближение камеры при зажатых клавишах
+        обрабатывается в camera_handling)
+        :param event: полученное событие, на которое менеджер модели
+                      должен прореагировать
+        '''
+
+        if event.type == pg.KEYDOWN:
+            if event.key == pg.K_c and self.worker is not None:
+                self.sync_camera = not self.sync_camera
+                if self.active:
+                    self.share_camera()
+
+            if self.visual is not None and self.active:
+                if event.key == pg.K_r:
+                    self.default_camera()
+
+    def mouse_handling(self, event):
+        '''
+        Функция, выбирающая объект модели под курсором при нажатии
+        левой кнопки мыши (правая кнопка снимает выбор)
+        :param event: полученное событие, на которое менеджер модели
+                      должен прореагировать
+        '''
+
+        if self.visual is None or not self.contains(event.pos):
+            return
+
+        if event.button == 1:
+            with self.lock:
+                self.visual.pick(event.pos[0] - self.pos["x"],
+                                 event.pos[1] - self.pos["y"])
+                self.update_body_label()
+
+        elif event.button == 3:
+            self.visual.selected = None
+            self.update_body_label()
+
+    def wheel_handling(self, event):
+        '''
+        Функция, приближающая камеру вокруг курсора мыши
+        при прокрутке колеса
+        :param event: полученное событие, на которое менеджер модели
+                      должен прореагировать
+        '''
+
+        if event.type == pg.MOUSEWHEEL:
+            mouse_pos = pg.mouse.get_pos()
+            if self.worker is not None and not self.contains(mouse_pos):
+                return
+
+            if self.visual is not None:
+                mouse_x, mouse_y = mouse_pos
+                center = {"x": mouse_x - self.pos["x"],
+                          "y": mouse_y - self.pos["y"]}
+                zoom = 100 * ((1 + WHEEL_ZOOM / 100) ** event.y - 1)
+                self.zoom_camera(zoom, center)
+
+    def camera_handling(self):
+        '''
+        Функция, плавно смещающая и приближающая камеру, пока
+        зажаты клавиши управления камерой
+        '''
+
+        if self.visual is None or not self.active:
+            return
+
+        dt = self.camera_watch.get_tick()
+        pressed = pg.key.get_pressed()
+        step = CAMERA_SPEED * dt
+
+        offset = {
+                  "x": (pressed[pg.K_d] - pressed[pg.K_a]) * step,
+                  "y": (pressed[pg.K_s] - pressed[pg.K_w]) * step
+                 }
+        if offset["x"] or offset["y"]:
+            self.move_camera(offset)
+
+        zoom_dir = pressed[pg.K_q] - pressed[pg.K_e]
+        if zoom_dir:
+            zoom = 100 * ((1 + ZOOM_SPEED / 100) ** (zoom_dir * dt) - 1)
+            self.zoom_camera(zoom)
+
+    def idle(self):
+        '''
+        Функция, описывающая дефолтное поведение менеджера модели
+        '''
+
+        with self.lock:
+            self.camera_handling()
+            self.advance()
+
+    def advance(self):
+        '''
+        Функция, продвигающая модель за кадр (или ставящая шаг
+        в очередь потока модели) при захваченной блокировке модели
+        '''
+
+        if self.seek_target is not None:
+            # без приближенного состояния модель возвращается сразу
+            if self.visual.preview is None or \
+                    time.perf_counter() - self.seek_request > SEEK_DELAY:
+                self.seek(self.seek_target)
+                self.update_labels()
+
+        elif self.jump_target is not None:
+            reached = self.jump(JUMP_BUDGET)
+
+            if time.perf_counter() - self.jump_label_time > JUMP_LABEL_PERIOD:
+                self.jump_label_time = time.perf_counter()
+                self.update_labels()
+                progress = (self.model.time - self.jump_start) / \
+                    (self.jump_target - self.jump_start)
+                progress_event = pg.event.Event(UIManager.JUMPPROGRESS,
+                                                {"progress": progress})
+                pg.event.post(progress_event)
+
+            if reached:
+                self.finish_jump()
+                self.update_labels()
+
+        elif self.stopwatch is not None:
+            if self.stopwatch.running:
+                if self.worker is not None:
+                    self.worker.submit(self.stopwatch.get_tick())
+                else:
+                    self.step(self.stopwatch.get_tick())
+                self.update_labels()
+
+    def update_labels(self):
+        '''
+        Функция, обновляющая надписи с временем модели и уходом
+        сохраняющихся величин (при нескольких плитках - подпись
+        плитки, а надписи окна - только для активной плитки)
+        '''
+
+        if self.worker is not None:
+            lag = self.worker.get_lag() / self.stopwatch.scale \
+                if self.stopwatch.scale else 0
+            marker = "*" if self.active else ""
+            saturated = ", saturated" if self.worker.saturated else ""
+            self.visual.caption = (f"{self.tile + 1}{marker}: "
+                                   f"{format_time(self.model.time)}, "
+                                   f"{self.worker.rate:.0f} steps/s, "
+                                   f"lag {lag:.2f} s{saturated}")
+
+        if not self.active:
+            return
+
+        time_str = f"Model time: {format_time(self.model.time)}"
+        label_update_event = pg.event.Event(UIManager.UPDATELABEL,
+                                            {"target": "timer label",
+                                             "text": time_str})
+        pg.event.post(label_update_event)
+
+        start = self.timeline.get_start_time()
+        end = self.timeline.get_end_time()
+        progress = (self.model.time - start) / (end - start) \
+            if end > start else 1
+        timeline_event = pg.event.Event(UIManager.UPDATETIMELINE,
+                                        {"progress": progress})
+        pg.event.post(timeline_event)
+
+        history_str = f"History: {format_time(end)}"
+        label_update_event = pg.event.Event(UIManager.UPDATELABEL,
+                                            {"target": "timeline label",
+                                             "text": history_str})
+        pg.event.post(label_update_event)
+
+        if self.model.diagnostics.series:
+            sample = self.model.diagnostics.series[-1]
+            drift_str = (f"Drift: E {sample['energy drift']:.1e}, "
+                         f"P {sample['momentum drift']:.1e}, "
+                         f"L {sample['angular drift']:.1e}")
+            if self.model.diagnostics.alarm:
+                drift_str += " (!)"
+            label_update_event = pg.event.Event(UIManager.UPDATELABEL,
+                                                {"target": "drift label",
+                                                 "text": drift_str})
+            pg.event.post(label_update_event)
+
+        self.update_body_label()
+
+    def update_body_label(self):
+        '''
+        Функция, обновляющая надпись с координатами, скоростью и
+        массой выбранного объекта
+        '''
+
+        body_str = ""
+        selected = self.visual.selected
+        if selected is not None:
+            objs = self.model.get_link()
+            x, y = objs.absolute(objs.pos[selected:selected + 1])[0]
+            v_x, v_y = objs.vel[selected]
+            body_str = (f"Body {selected}: x {x:.3e} m, y {y:.3e} m, "
+                        f"v ({v_x:.3e}, {v_y:.3e}) m/s, "
+                        f"mass {objs.m[selected]:.3e} kg")
+
+        label_update_event = pg.event.Event(UIManager.UPDATELABEL,
+                                            {"target": "body label",
+                                             "text": body_str})
+        pg.event.post(label_update_event)
+
+    def publish(self):
+        '''
+        Функция, передающая состояние модели клиентам
+        сервера состояния, если он запущен
+        '''
+
+        if self.server is not None:
+            self.server.publish(self.model)
+
+    def set_screen(self, screen):
+        '''
+        Функция, устанавливающая связь с холстом
+        :param screen: объект solar_vis.Screen, с которым
+                              нужно установить связь
+        '''
+        self.screen = screen
+
+
+def format_time(model_time):
+    '''
+    Функция, возвращающая строку с модельным временем
+    в годах и месяцах
+    :param model_time: модельное время (в секундах)
+    '''
+
+    model_time = int(model_time)
+    years = model_time // YEAR
+    months = model_time % YEAR // MONTH
+
+    return f"{years}y {months}m"
+
+
+def report_startup(stage):
+    '''
+    Функция, сообщающая время от запуска программы до этапа запуска
+    :param stage: название этапа
+    '''
+
+    print(f"Startup: {stage} after "
+          f"{(time.perf_counter() - LAUNCH_TIME) * 1000:.0f} ms")
+
+
+def init_pygame():
+    '''
+    Функция, инициализирующая только нужные модули pygame
+    (без звука и джойстиков, которые долго инициализируются)
+    '''
+
+    pg.display.init()
+    pg.font.init()
+
+
+def add_autosave_arguments(parser):
+    '''
+    Функция, добавляющая параметры автосохранения в разбор
+    аргументов командной строки
+    :param parser: объект argparse.ArgumentParser
+    '''
+
+    parser.add_argument("--autosave", metavar="DIR",
+                        help="periodically save the model to DIR in "
+                             "the background")
+    parser.add_argument("--autosave-years", type=float,
+                        help="model time in years between autosaves")
+    parser.add_argument("--autosave-minutes", type=float,
+                        help="wall time in minutes between autosaves "
+                             "(5 if neither interval is given)")
+    parser.add_argument("--autosave-keep", type=int,
+                        default=s_autosave.KEEP,
+                        help="number of latest autosaves to keep")
+
+
+def setup_autosave(model_manager, args):
+    '''
+    Функция, включающая автосохранение модели, если оно
+    задано в аргументах командной строки
+    :param model_manager: объект ModelManager
+    :param args: разобранные аргументы (см. add_autosave_arguments)
+    '''
+
+    if args.autosave is None:
+        return
+
+    every_time = None
+    if args.autosave_years is not None:
+        every_time = args.autosave_years * YEAR
+    every_wall = None
+    if args.autosave_minutes is not None:
+        every_wall = args.autosave_minutes * 60
+    elif every_time is None:
+        every_wall = 5 * 60
+
+    model_manager.saver.enable(args.autosave, every_time, every_wall,
+                               args.autosave_keep,
+                               f"autosave-{model_manager.tile}-")
+
+
+def tile_rects(count):
+    '''
+    Функция, делящая область модели на плитки (почти квадратной сеткой)
+    :param count: кол-во плиток
+    Возвращает список пар (pos, size) словарей позиции и размеров плиток
+    '''
+
+    cols = 1
+    while cols * cols < count:
+        cols += 1
+    rows = (count + cols - 1) // cols
+
+    w = (MODEL_SIZE["w"] - TILE_GAP * (cols - 1)) / cols
+    h = (MODEL_SIZE["h"] - TILE_GAP * (rows - 1)) / rows
+
+    rects = []
+    for i in range(count):
+        row, col = divmod(i, cols)
+        pos = {"x": MODEL_POS["x"] + col * (w + TILE_GAP),
+               "y": MODEL_POS["y"] + row * (h + TILE_GAP)}
+        rects.append((pos, {"w": w, "h": h}))
+
+    return rects
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solar system model")
+    parser.add_argument("--record", metavar="FILE",
+                        help="record model steps and user commands to FILE "
+                             "(can be replayed with solar_headless.py)")
+    parser.add_argument("--serve", metavar="ADDRESS",
+                        help="stream model state to local clients at "
+                             "ADDRESS ('unix:PATH', 'HOST:PORT' or 'PORT')")
+    parser.add_argument("--tiles", type=int, default=1,
+                        help="number of models shown side by side, each "
+                             "stepped by its own thread (recording and "
+                             "streaming apply to the first one)")
+    parser.add_argument("--load", metavar="FILE", action="append",
+                        default=[],
+                        help="model file to load at start (repeat to load "
+                             "the next tiles)")
+    parser.add_argument("--sync-camera", action="store_true",
+                        help="move the cameras of all tiles together "
+                             "(toggled with C)")
+    parser.add_argument("--profile-dir", default="profiles",
+                        help="directory for profiles captured with F9 "
+                             "(cProfile) and F10 (allocations)")
+    add_autosave_arguments(parser)
+    args = parser.parse_args()
+
+    init_pygame()
+    event_manager = EventManager()
+    visual_manager = VisualManager(WIN_SIZE)
+
+    if args.tiles > 1:
+        model_managers = [ModelManager(pos, size, tile, threaded=True)
+                          for tile, (pos, size)
+                          in enumerate(tile_rects(args.tiles))]
+    else:
+        model_managers = [ModelManager(MODEL_POS, MODEL_SIZE)]
+
+    model_manager = model_managers[0]
+    if args.record is not None:
+        model_manager.recorder = s_record.Recorder(args.record)
+    if args.serve is not None:
+        from solar_system.input import solar_server as s_server
+        model_manager.server = s_server.StateServer(args.serve)
+    ui_manager = UIManager(WIN_SIZE)
+    profile_manager = ProfileManager(args.profile_dir)
+
+    visual_manager.set_manager(event_manager)
+    profile_manager.set_manager(event_manager)
+    ui_manager.set_manager(event_manager)
+    ui_manager.set_screen(visual_manager.main_screen)
+
+    for tile_manager in model_managers:
+        tile_manager.sync_camera = args.sync_camera and args.tiles > 1
+        setup_autosave(tile_manager, args)
+        tile_manager.set_manager(event_manager)
+        tile_manager.set_screen(visual_manager.main_screen)
+
+    for tile, file in enumerate(args.load[:len(model_managers)]):
+        load_event = pg.event.Event(ModelManager.LOAD,
+                                    {"file": file, "tile": tile})
+        pg.event.post(load_event)
+
+    while event_manager.run():
+        pass
+
+    profile_manager.stop()
+
+    for tile_manager in model_managers:
+        if tile_manager.worker is not None:
+            tile_manager.worker.stop()
+        tile_manager.saver.close()
+
+    if model_manager.recorder is not None:
+        model_manager.recorder.close()
+    if model_manager.server is not None:
+        model_manager.server.close()
+
+    pg.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# coding:utf-8
+import cProfile
+import os
+import pstats
+import time
+import tracemalloc
+
+# сколько строк выводится в сводке после остановки профилирования
+TOP_N = 20
+
+# глубина стека, запоминаемая для каждого выделения памяти
+TRACE_FRAMES = 10
+
+
+class Profiler:
+    '''
+    Класс профилировщика работающей программы: по запросу включает
+    cProfile и/или tracemalloc, а после остановки сохраняет результаты
+    в файлы с отметкой времени и выводит сводку
+
+    Пока профилирование выключено, профилировщик ничего не делает: он
+    не участвует в цикле обработки событий. При трассировке выделений
+    памяти методы call и idle менеджеров из списка EventManager на
+    время трассировки подменяются обертками, которые считают
+    выделенную каждым менеджером память за кадр
+
+    cProfile профилирует только основной поток (шаги моделей,
+    продвигаемых в своих потоках, в него не попадают), а tracemalloc
+    следит за всеми потоками
+    '''
+
+    def __init__(self, directory):
+        '''
+        Функция, инициализирующая профилировщик
+        :param directory: папка, в которую сохраняются результаты
+        '''
+        self.directory = directory
+        self.profile = None
+        self.managers = []
+        self.own_tracemalloc = False
+
+        # по каждому менеджеру: выделенная за текущий кадр память и
+        # список значений по кадрам (наибольший прирост памяти во время
+        # вызова и прирост памяти, оставшийся после вызова)
+        self.frame = {}
+        self.frames = {}
+
+    def is_profiling(self):
+        '''
+        Функция, возвращающая флаг работы cProfile
+        '''
+        return self.profile is not None
+
+    def is_tracing(self):
+        '''
+        Функция, возвращающая флаг трассировки выделений памяти
+        '''
+        return bool(self.managers)
+
+    def start_profile(self):
+        '''
+        Функция, начинающая запись профиля cProfile
+        '''
+        if self.profile is not None:
+            return
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+        print("Profiling started")
+
+    def stop_profile(self):
+        '''
+        Функция, завершающая запись профиля, сохраняющая его в файл
+        .pstats и выводящая самые затратные функции
+        Возвращает путь к файлу профиля
+        '''
+        if self.profile is None:
+            return None
+        self.profile.disable()
+        profile, self.profile = self.profile, None
+
+        path = self.make_path("profile", "pstats")
+        profile.dump_stats(path)
+        print(f"Profile saved to {path}")
+        pstats.Stats(profile).sort_stats("cumulative").print_stats(TOP_N)
+
+        return path
+
+    def start_tracing(self, managers):
+        '''
+        Функция, начинающая трассировку выделений памяти
+        :param managers: список менеджеров (объектов с методами call и
+                         idle), между которыми распределяется память
+        '''
+        if self.managers:
+            return
+        # трассировка, включенная не профилировщиком (например,
+        # python -X tracemalloc), после остановки продолжается
+        self.own_tracemalloc = not tracemalloc.is_tracing()
+        if self.own_tracemalloc:
+            tracemalloc.start(TRACE_FRAMES)
+
+        self.managers = list(managers)
+        self.frame = {}
+        self.frames = {}
+        for manager in self.managers:
+            name = self.manager_name(manager)
+            self.frame[name] = [0, 0]
+            self.frames[name] = []
+            manager.call = self.wrap(manager.call, name, False)
+            manager.idle = self.wrap(manager.idle, name, True)
+        print("Allocation tracing started")
+
+    def stop_tracing(self):
+        '''
+        Функция, завершающая трассировку выделений памяти, сохраняющая
+        снимок tracemalloc в файл .snapshot и выводящая строки кода,
+        занимающие больше всего памяти, и память по менеджерам
+        Возвращает путь к файлу снимка
+        '''
+        if not self.managers:
+            return None
+
+        # обертки удаляются, и снова видны методы классов
+        for manager in self.managers:
+            del manager.call
+            del manager.idle
+        self.managers = []
+
+        # память самих профилировщиков в сводку не входит
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, module.__file__)
+             for module in (tracemalloc, cProfile, pstats)] +
+            [tracemalloc.Filter(False, __file__)])
+        if self.own_tracemalloc:
+            tracemalloc.stop()
+
+        path = self.make_path("allocations", "snapshot")
+        snapshot.dump(path)
+        print(f"Allocation snapshot saved to {path}")
+
+        print(f"Top {TOP_N} lines by allocated memory:")
+        for stat in snapshot.statistics("lineno")[:TOP_N]:
+            print(f"  {stat}")
+
+        print("Memory per frame by manager (KiB, mean / max):")
+        for name, frames in self.frames.items():
+            if not frames:
+                continue
+            peak = [frame[0] / 1024 for frame in frames]
+            kept = [frame[1] / 1024 for frame in frames]
+            print(f"  {name}: "
+                  f"allocated {sum(peak) / len(peak):.1f} / {max(peak):.1f}, "
+                  f"retained {sum(kept) / len(kept):.1f} / {max(kept):.1f} "
+                  f"over {len(frames)} frames")
+
+        return path
+
+    def wrap(self, method, name, ends_frame):
+        '''
+        Функция, возвращающая обертку метода менеджера, которая
+        измеряет выделенную во время вызова память
+        :param method: метод call или idle менеджера
+        :param name: имя менеджера в сводке
+        :param ends_frame: флаг, показывающий что вызов завершает кадр
+                           менеджера (idle вызывается раз в кадр)
+        '''
+        def traced(*args):
+            before = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            try:
+                return method(*args)
+            finally:
+                current, peak = tracemalloc.get_traced_memory()
+                frame = self.frame[name]
+                frame[0] = max(frame[0], peak - before)
+                frame[1] += current - before
+                if ends_frame:
+                    self.frames[name].append(tuple(frame))
+                    self.frame[name] = [0, 0]
+
+        return traced
+
+    def make_path(self, kind, extension):
+        '''
+        Функция, возвращающая путь к новому файлу результатов
+        :param kind: вид результатов (начало имени файла)
+        :param extension: расширение файла
+        '''
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.directory, f"{kind}-{stamp}.{extension}")
+
+        # несколько профилей за одну секунду нумеруются
+        number = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory,
+                                f"{kind}-{stamp}-{number}.{extension}")
+            number += 1
+        return path
+
+    @staticmethod
+    def manager_name(manager):
+        '''
+        Функция, возвращающая имя менеджера для сводки (у плиток
+        моделей добавляется номер плитки)
+        :param manager: объект менеджера
+        '''
+        name = type(manager).__name__
+        tile = getattr(manager, "tile", None)
+        if tile is not None:
+            name += f"[{tile}]"
+        return name
+
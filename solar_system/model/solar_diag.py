@@ -0,0 +1,152 @@
+# coding:utf-8
+import collections
+import numpy as np
+
+# раз в сколько шагов модели вычисляются сохраняющиеся величины
+DIAG_EVERY = 10
+
+# относительный уход, при превышении которого вызываются
+# функции тревоги
+DRIFT_THRESHOLD = 1e-3
+
+# во сколько раз уход должен превысить уход последней тревоги, чтобы
+# тревога сработала снова (иначе уход, колеблющийся около порога,
+# вызывал бы тревогу при каждом его пересечении)
+ALERT_ESCALATION = 2
+
+# наибольшее кол-во хранимых измерений
+MAX_SAMPLES = 10000
+
+
+class Diagnostics:
+    '''
+    Класс наблюдения за сохраняющимися величинами модели (полной
+    энергией, импульсом и моментом импульса массивных объектов):
+    хранит ряд их относительных уходов от начальных значений и
+    сообщает о превышении порога (повторно - только когда уход
+    станет в ALERT_ESCALATION раз больше, чем при прошлой тревоге)
+    '''
+
+    def __init__(self, every=DIAG_EVERY, threshold=DRIFT_THRESHOLD,
+                 max_samples=MAX_SAMPLES):
+        '''
+        Функция, инициализирующая наблюдение
+        :param every: раз в сколько шагов модели делается измерение
+        :param threshold: порог относительного ухода для тревоги
+        :param max_samples: наибольшее кол-во хранимых измерений
+        '''
+        self.every = every
+        self.threshold = threshold
+        self.series = collections.deque(maxlen=max_samples)
+        self.initial = None
+        self.alarm = False
+        self.alert_level = threshold
+        self.listeners = []
+        self.alert_listeners = []
+
+    def add_listener(self, listener):
+        '''
+        Функция, добавляющая функцию, которая вызывается после
+        каждого измерения
+        :param listener: функция, принимающая словарь измерения
+        '''
+        self.listeners.append(listener)
+
+    def add_alert_listener(self, listener):
+        '''
+        Функция, добавляющая функцию, которая вызывается, когда
+        уход одной из величин превышает порог
+        :param listener: функция, принимающая словарь измерения
+        '''
+        self.alert_listeners.append(listener)
+
+    def measure(self, time, m, pos, vel, potential):
+        '''
+        Функция, вычисляющая сохраняющиеся величины и их уход
+        :param time: модельное время измерения
+        :param m: массив масс объектов
+        :param pos: массив размера (N, 2) координат объектов
+        :param vel: массив размера (N, 2) скоростей объектов
+        :param potential: потенциальная энергия взаимодействия объектов
+        Возвращает словарь измерения
+        '''
+        total = m.sum()
+        center = (m @ pos) / total if total > 0 else np.zeros(2)
+        rel_pos = pos - center
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+
+        energy = 0.5 * (m @ speed ** 2) + potential
+        momentum = m @ vel
+        angular = m @ (rel_pos[:, 0] * vel[:, 1] - rel_pos[:, 1] * vel[:, 0])
+
+        # масштабы, относительно которых считается уход импульса и
+        # момента импульса (сами величины могут быть равны нулю)
+        momentum_scale = m @ speed
+        angular_scale = m @ (np.hypot(rel_pos[:, 0], rel_pos[:, 1]) * speed)
+
+        if self.initial is None:
+            self.initial = {"energy": energy, "momentum": momentum,
+                            "angular": angular,
+                            "momentum scale": momentum_scale or 1,
+                            "angular scale": angular_scale or 1}
+
+        initial = self.initial
+        sample = {
+                  "time": time,
+                  "energy": energy,
+                  "momentum": momentum,
+                  "angular": angular,
+                  "energy drift": (energy - initial["energy"]) /
+                                  (abs(initial["energy"]) or 1),
+                  "momentum drift": np.hypot(*(momentum -
+                                               initial["momentum"])) /
+                                    initial["momentum scale"],
+                  "angular drift": (angular - initial["angular"]) /
+                                   initial["angular scale"]
+                 }
+        self.series.append(sample)
+
+        for listener in self.listeners:
+            listener(sample)
+
+        drift = max(abs(sample["energy drift"]), sample["momentum drift"],
+                    abs(sample["angular drift"]))
+        self.alarm = drift > self.threshold
+        if drift > self.alert_level:
+            self.alert_level = ALERT_ESCALATION * drift
+            for listener in self.alert_listeners:
+                listener(sample)
+
+        return sample
+
+    def rebase(self):
+        '''
+        Функция, сбрасывающая начальные значения, так что следующее
+        измерение станет новой точкой отсчета (например, после слияния
+        объектов, при котором энергия не сохраняется)
+        '''
+        self.initial = None
+        self.alarm = False
+        self.alert_level = self.threshold
+
+    def discard_after(self, time):
+        '''
+        Функция, удаляющая измерения, сделанные позже указанного
+        модельного времени (например, после возврата модели назад)
+        :param time: модельное время
+        '''
+        while self.series and self.series[-1]["time"] > time:
+            self.series.pop()
+
+    def get_series(self):
+        '''
+        Функция, возвращающая массивы numpy ряда измерений: время и
+        относительные уходы энергии, импульса и момента импульса
+        '''
+        keys = ("time", "energy drift", "momentum drift", "angular drift")
+        return {key: np.array([sample[key] for sample in self.series])
+                for key in keys}
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
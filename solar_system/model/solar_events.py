@@ -0,0 +1,576 @@
+# coding:utf-8
+import numpy as np
+from solar_system.model import solar_neighbours
+
+# на сколько частей делится шаг при поиске смены знака функции события
+# (кроме равных частей проверяются и экстремумы функции внутри шага)
+SUBDIVISIONS = 4
+
+# точность времени события в долях шага
+TIME_TOLERANCE = 1e-9
+
+# направления пересечения нуля функцией события
+DIRECTIONS = (-1, 0, 1)
+
+
+def hermite(pos0, vel0, pos1, vel1, dt, s):
+    '''
+    Функция, возвращающая координаты и скорости в долю шага s по
+    кубическому интерполянту Эрмита между состояниями в начале и конце
+    шага (для массивов размера (C, k, 2) и s размера (C,))
+    :param pos0, vel0: координаты и скорости в начале шага
+    :param pos1, vel1: координаты и скорости в конце шага
+    :param dt: шаг модели
+    :param s: массив долей шага (от 0 до 1)
+    '''
+    s = s[:, np.newaxis, np.newaxis]
+    s2 = s * s
+    s3 = s2 * s
+
+    pos = (2 * s3 - 3 * s2 + 1) * pos0 + (s3 - 2 * s2 + s) * dt * vel0 + \
+        (3 * s2 - 2 * s3) * pos1 + (s3 - s2) * dt * vel1
+    vel = (6 * s2 - 6 * s) * (pos0 - pos1) / dt + \
+        (3 * s2 - 4 * s + 1) * vel0 + (3 * s2 - 2 * s) * vel1
+
+    return pos, vel
+
+
+class Event:
+    '''
+    Базовый класс события: функция события g задается для каждой
+    составляющей (тела или пары тел), и событие происходит, когда g
+    одной из составляющих проходит через ноль в заданном направлении
+
+    Наследники задают составляющие (метод components) и функцию
+    события с ее производной по времени (метод function)
+    '''
+
+    name = "event"
+
+    def __init__(self, bodies=None, terminal=True, direction=-1):
+        '''
+        Функция, инициализирующая событие
+        :param bodies: список индексов тел, для которых проверяется
+                       событие, по умолчанию все подходящие тела
+        :param terminal: флаг, показывающий надо ли остановить модель
+                         после события
+        :param direction: направление прохождения нуля: -1 - с убыванием
+                          g, 1 - с возрастанием, 0 - любое
+        '''
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Unknown event direction: {direction}")
+
+        self.bodies = None if bodies is None else \
+            np.array(sorted(set(bodies)), dtype=int)
+        self.terminal = terminal
+        self.direction = direction
+
+    def select(self, objs, default):
+        '''
+        Функция, возвращающая индексы тел события, которые есть в
+        наборе объектов
+        :param objs: объект solar_obj.Objects
+        :param default: индексы тел по умолчанию
+        '''
+        if self.bodies is None:
+            return default
+        return self.bodies[self.bodies < len(objs)]
+
+    def components(self, objs, dt):
+        '''
+        Функция, возвращающая массив размера (C, k) индексов тел
+        каждой составляющей события, которая может пройти через ноль
+        за только что сделанный шаг
+        :param objs: объект solar_obj.Objects (в конце шага)
+        :param dt: шаг модели
+        '''
+        raise NotImplementedError
+
+    def function(self, pos, vel, objs, bodies):
+        '''
+        Функция, возвращающая значения функции события и ее производной
+        по времени (массивы размера (C,))
+        :param pos: массив размера (C, k, 2) координат тел составляющих
+        :param vel: массив размера (C, k, 2) скоростей тел составляющих
+        :param objs: объект solar_obj.Objects
+        :param bodies: массив размера (C, k) индексов тел составляющих
+        '''
+        raise NotImplementedError
+
+    def compact(self, keep):
+        '''
+        Функция, перенумеровывающая тела события после удаления
+        объектов (удаленные тела больше не проверяются)
+        :param keep: булев массив оставшихся объектов (по старым
+                     индексам)
+        '''
+        if self.bodies is None:
+            return
+        bodies = self.bodies[self.bodies < len(keep)]
+        self.bodies = (np.cumsum(keep) - 1)[bodies[keep[bodies]]]
+
+    def invalidate(self):
+        '''
+        Функция, сбрасывающая данные, которые событие хранит между
+        шагами (после слияния объектов или восстановления модели)
+        '''
+
+    def describe(self):
+        '''
+        Функция, возвращающая строку с описанием события для отчета
+        '''
+        return self.name
+
+
+class PairEvent(Event):
+    '''
+    Базовый класс событий для пар тел: g - квадрат расстояния между
+    телами минус квадрат порога (квадрат расстояния, в отличие от
+    самого расстояния, гладко зависит от времени и при прохождении тел
+    друг сквозь друга), по умолчанию проверяются пары массивных тел
+
+    Проверяются только пары из списка соседей с порогом события (за
+    шаг пройти через порог могут лишь пары, которые сблизились до
+    него с запасом на смещение тел за шаг), поэтому все пары тел
+    сразу не строятся
+    '''
+
+    def __init__(self, distance=0, radii=True, **kwargs):
+        '''
+        :param distance: расстояние, добавляемое к порогу пары
+                         в списке соседей
+        :param radii: флаг, показывающий входит ли в порог пары
+                      сумма радиусов тел
+        Остальные параметры - как у Event
+        '''
+        super().__init__(**kwargs)
+        self.neighbours = solar_neighbours.NeighbourList(distance=distance,
+                                                         radii=radii)
+
+    def components(self, objs, dt):
+        bodies = self.select(objs, np.arange(objs.n_massive))
+        return self.neighbours.get_pairs(objs, bodies, dt, swept=True)
+
+    def invalidate(self):
+        self.neighbours.invalidate()
+
+    def threshold(self, objs, bodies):
+        '''
+        Функция, возвращающая порог расстояния для каждой пары
+        :param objs: объект solar_obj.Objects
+        :param bodies: массив размера (C, 2) индексов тел пар
+        '''
+        raise NotImplementedError
+
+    def function(self, pos, vel, objs, bodies):
+        d = pos[:, 1] - pos[:, 0]
+        dv = vel[:, 1] - vel[:, 0]
+        return (d * d).sum(axis=1) - self.threshold(objs, bodies) ** 2, \
+            2 * (d * dv).sum(axis=1)
+
+
+class Collision(PairEvent):
+    '''
+    Класс события касания двух тел (расстояние равно сумме радиусов)
+    '''
+
+    name = "collision"
+
+    def threshold(self, objs, bodies):
+        return objs.r[bodies].sum(axis=1)
+
+
+class Approach(PairEvent):
+    '''
+    Класс события сближения двух тел на расстояние меньше заданного
+    '''
+
+    name = "approach"
+
+    def __init__(self, distance, **kwargs):
+        '''
+        :param distance: наименьшее допустимое расстояние
+        Остальные параметры - как у Event
+        '''
+        super().__init__(distance=distance, radii=False, **kwargs)
+        self.distance = distance
+
+    def threshold(self, objs, bodies):
+        return self.distance
+
+    def describe(self):
+        return f"{self.name} below {self.distance:g} m"
+
+
+class Escape(Event):
+    '''
+    Класс события удаления тела от центрального тела дальше заданного
+    расстояния (g - квадрат этого расстояния минус квадрат расстояния
+    до тела)
+    '''
+
+    name = "escape"
+
+    def __init__(self, radius, center=None, **kwargs):
+        '''
+        :param radius: расстояние, удаление дальше которого - событие
+        :param center: индекс центрального тела, по умолчанию самое
+                       массивное тело
+        Остальные параметры - как у Event
+        '''
+        super().__init__(**kwargs)
+        self.radius = radius
+        self.center = center
+
+    def components(self, objs, dt):
+        if len(objs) == 0:
+            return np.zeros((0, 2), dtype=int)
+        center = int(np.argmax(objs.m)) if self.center is None \
+            else self.center
+        bodies = self.select(objs, np.arange(len(objs)))
+        bodies = bodies[bodies != center]
+        return np.column_stack((np.full(len(bodies), center), bodies))
+
+    def function(self, pos, vel, objs, bodies):
+        d = pos[:, 1] - pos[:, 0]
+        dv = vel[:, 1] - vel[:, 0]
+        return self.radius ** 2 - (d * d).sum(axis=1), \
+            -2 * (d * dv).sum(axis=1)
+
+    def compact(self, keep):
+        super().compact(keep)
+        if self.center is not None:
+            self.center = int(keep[:self.center].sum()) \
+                if keep[self.center] else None
+
+    def describe(self):
+        return f"{self.name} beyond {self.radius:g} m"
+
+
+class Crossing(Event):
+    '''
+    Класс события пересечения телом прямой, проходящей через точку
+    point в направлении direction (g - расстояние со знаком от тела
+    до прямой)
+    '''
+
+    name = "crossing"
+
+    def __init__(self, point, line, direction=0, **kwargs):
+        '''
+        :param point: координаты (x, y) точки прямой
+        :param line: вектор (dx, dy) направления прямой
+        :param direction: направление пересечения: 1 - слева направо
+                          относительно направления прямой, -1 - справа
+                          налево, 0 - любое
+        Остальные параметры - как у Event
+        '''
+        super().__init__(direction=direction, **kwargs)
+        self.point = np.array(point, dtype=float)
+        line = np.array(line, dtype=float)
+        length = np.hypot(*line)
+        if length == 0:
+            raise ValueError("Zero line direction")
+        self.line = line / length
+
+    def components(self, objs, dt):
+        bodies = self.select(objs, np.arange(len(objs)))
+        return bodies[:, np.newaxis]
+
+    def function(self, pos, vel, objs, bodies):
+        d = pos[:, 0] - self.point
+        return (self.line[1] * d[:, 0] - self.line[0] * d[:, 1],
+                self.line[1] * vel[:, 0, 0] - self.line[0] * vel[:, 0, 1])
+
+    def describe(self):
+        return f"{self.name} of line through " \
+               f"({self.point[0]:g}, {self.point[1]:g})"
+
+
+# виды событий по их именам (для описания событий строкой)
+EVENTS = {"collision": Collision, "approach": Approach,
+          "escape": Escape, "crossing": Crossing}
+
+
+def parse_event(spec, terminal=True):
+    '''
+    Функция, создающая событие по его описанию строкой вида
+    "вид[:параметры][@тела]", например "collision", "approach:1e9",
+    "escape:1e13@1,2" или "crossing:0,0,1,0" (точка и направление
+    прямой)
+    :param spec: строка описания события
+    :param terminal: флаг, показывающий надо ли остановить модель
+                     после события
+    '''
+    spec, _, bodies = spec.partition("@")
+    kind, _, params = spec.partition(":")
+    if kind not in EVENTS:
+        raise ValueError(f"Unknown event: {kind}")
+
+    params = [float(value) for value in params.split(",") if value]
+    bodies = [int(value) for value in bodies.split(",")] if bodies \
+        else None
+
+    counts = {"collision": 0, "approach": 1, "escape": 1, "crossing": 4}
+    if len(params) != counts[kind]:
+        raise ValueError(f"Wrong number of parameters for event {kind}: "
+                         f"{len(params)} (expected {counts[kind]})")
+
+    if kind == "crossing":
+        return Crossing(params[:2], params[2:], bodies=bodies,
+                        terminal=terminal)
+    return EVENTS[kind](*params, bodies=bodies, terminal=terminal)
+
+
+class EventDetector:
+    '''
+    Класс обнаружения событий во время шагов модели: значения функций
+    событий в начале и конце шага и их производные задают кубический
+    интерполянт, по которому находятся шаги со сменой знака (в том
+    числе внутри шага), а момент события уточняется делением пополам
+    по интерполянту Эрмита координат тел
+
+    Состояние в конце шага используется как состояние в начале
+    следующего, а функции событий вычисляются в конце шага только
+    для составляющих, которые могли пройти через ноль (см. PairEvent)
+    '''
+
+    def __init__(self, events):
+        '''
+        Функция, инициализирующая обнаружение событий
+        :param events: список объектов Event
+        '''
+        self.events = list(events)
+        self.occurrences = []
+        self.stopped = False
+        self.stop_time = None
+        self.listeners = []
+
+        self.start = None
+        self.last = None
+
+        # пары тел, касания которых найдены на последнем шаге (модель
+        # сливает их в начале следующего шага, и сообщать о них
+        # повторно не нужно)
+        self.recent = set()
+
+    def add_listener(self, listener):
+        '''
+        Функция, добавляющая функцию, которая вызывается при каждом
+        произошедшем событии
+        :param listener: функция, принимающая словарь события
+        '''
+        self.listeners.append(listener)
+
+    def begin(self, model):
+        '''
+        Функция, запоминающая состояние модели в начале шага
+        :param model: объект solar_model.Model
+        '''
+        if self.last is not None and self.last[0] == model.version:
+            self.start = self.last[1:]
+            return
+
+        objs = model.space_objs
+        pos = np.array(objs.get_positions(), dtype=float)
+        vel = np.array(objs.vel, dtype=float)
+        self.start = (model.time, pos, vel)
+
+    def end(self, model, dt):
+        '''
+        Функция, ищущая события за прошедший шаг
+        :param model: объект solar_model.Model
+        :param dt: шаг модели
+        '''
+        start, self.start = self.start, None
+        objs = model.space_objs
+        pos = np.array(objs.get_positions(), dtype=float)
+        vel = np.array(objs.vel, dtype=float)
+        self.last = (model.version, model.time, pos, vel)
+
+        # после слияния объектов состояния в начале и конце шага
+        # не сопоставимы
+        if start is None or len(start[1]) != len(pos) or dt <= 0:
+            return
+
+        time0, pos0, vel0 = start
+        found = []
+        for event in self.events:
+            bodies = event.components(objs, dt)
+            g0, rate0 = event.function(pos0[bodies], vel0[bodies], objs,
+                                       bodies)
+            g1, rate1 = event.function(pos[bodies], vel[bodies], objs,
+                                       bodies)
+            s = self.find_crossings(event, g0, rate0 * dt, g1, rate1 * dt)
+            if s is None:
+                continue
+            lo, hi, components = s
+            s = self.refine(event, objs, bodies[components],
+                            (pos0, vel0, pos, vel), dt, lo, hi)
+            for component, fraction in zip(components, s):
+                found.append({"event": event.describe(),
+                              "kind": event.name,
+                              "time": float(time0 + fraction * dt),
+                              "bodies": tuple(int(body) for body in
+                                              bodies[component]),
+                              "terminal": event.terminal})
+
+        self.recent = {occurrence["bodies"] for occurrence in found
+                       if occurrence["kind"] == Collision.name}
+        self.report(found)
+
+    def report(self, found):
+        '''
+        Функция, добавляющая произошедшие события в список
+        и останавливающая модель, если событие завершающее
+        :param found: список словарей событий
+        '''
+        found.sort(key=lambda occurrence: occurrence["time"])
+        for occurrence in found:
+            self.occurrences.append(occurrence)
+            for listener in self.listeners:
+                listener(occurrence)
+            if occurrence["terminal"] and not self.stopped:
+                self.stopped = True
+                self.stop_time = occurrence["time"]
+
+    @staticmethod
+    def find_crossings(event, g0, d0, g1, d1):
+        '''
+        Функция, находящая составляющие, функция события которых
+        проходит через ноль за шаг, по кубическому интерполянту
+        g(s) = a s^3 + b s^2 + d0 s + g0 по значениям g и их приращениям
+        d = g' * dt в начале и конце шага (кроме равномерной сетки
+        долей шага проверяются экстремумы интерполянта, так что
+        находятся и касания, начавшиеся и закончившиеся внутри шага)
+        Возвращает границы первого отрезка долей шага со сменой знака
+        и номера составляющих (или None, если таких нет)
+        '''
+        # интерполянт отличается от линейного не больше, чем на
+        # 4/27 (|d0| + |d1|), и для большинства составляющих этого
+        # достаточно, чтобы исключить смену знака
+        spread = 4 / 27 * (np.abs(d0) + np.abs(d1))
+        possible = (np.minimum(g0, g1) - spread <= 0) & \
+            (np.maximum(g0, g1) + spread >= 0)
+        if not possible.any():
+            return None
+        possible = np.nonzero(possible)[0]
+        g0, d0, g1, d1 = g0[possible], d0[possible], g1[possible], \
+            d1[possible]
+
+        a = 2 * (g0 - g1) + d0 + d1
+        b = 3 * (g1 - g0) - 2 * d0 - d1
+
+        # корни производной 3a s^2 + 2b s + d0 (для a = 0 - корень
+        # линейного уравнения, для отсутствующих корней - nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            root = np.sqrt(b * b - 3 * a * d0)
+            extrema = np.where(a != 0, (-b + np.array([[-1], [1]]) * root) /
+                               (3 * a), -d0 / (2 * b))
+        extrema = np.where((extrema > 0) & (extrema < 1), extrema, 0)
+
+        grid = np.linspace(0, 1, SUBDIVISIONS + 1)[:, np.newaxis]
+        s = np.sort(np.vstack((np.broadcast_to(grid, (len(grid), len(g0))),
+                               extrema)), axis=0)
+        g = ((a * s + b) * s + d0) * s + g0
+        g[-1] = g1
+
+        before, after = g[:-1], g[1:]
+        if event.direction < 0:
+            crossed = (before > 0) & (after <= 0)
+        elif event.direction > 0:
+            crossed = (before < 0) & (after >= 0)
+        else:
+            crossed = ((before > 0) & (after <= 0)) | \
+                ((before < 0) & (after >= 0))
+
+        components = np.nonzero(crossed.any(axis=0))[0]
+        if len(components) == 0:
+            return None
+        first = np.argmax(crossed[:, components], axis=0)
+        return s[first, components], s[first + 1, components], \
+            possible[components]
+
+    @staticmethod
+    def refine(event, objs, bodies, state, dt, lo, hi):
+        '''
+        Функция, уточняющая моменты событий делением пополам
+        :param event: объект Event
+        :param objs: объект solar_obj.Objects
+        :param bodies: массив размера (C, k) индексов тел составляющих
+        :param state: координаты и скорости объектов в начале и конце
+                      шага
+        :param dt: шаг модели
+        :param lo, hi: массивы размера (C,) границ долей шага, на
+                       которых функция события меняет знак
+        Возвращает массив размера (C,) долей шага
+        '''
+        pos0, vel0, pos1, vel1 = (column[bodies] for column in state)
+
+        def value(s):
+            pos, vel = hermite(pos0, vel0, pos1, vel1, dt, s)
+            return event.function(pos, vel, objs, bodies)[0]
+
+        sign = np.sign(value(lo))
+        for _ in range(int(np.ceil(np.log2(1 / TIME_TOLERANCE)))):
+            middle = (lo + hi) / 2
+            same = np.sign(value(middle)) == sign
+            lo = np.where(same, middle, lo)
+            hi = np.where(same, hi, middle)
+
+        return hi
+
+    def compact(self, keep, contacts=(), time=None):
+        '''
+        Функция, перенумеровывающая тела событий после слияния
+        объектов и сообщающая о касаниях слившихся объектов, которые
+        не были найдены на прошлом шаге (при поиске касаний в течение
+        шага объекты сливаются в момент касания, и шаг со слиянием
+        не проверяется)
+        :param keep: булев массив оставшихся объектов (по старым
+                     индексам)
+        :param contacts: массив пар индексов (по старым индексам)
+                         слившихся объектов
+        :param time: модельное время слияния
+        '''
+        found = []
+        for event in self.events:
+            if not isinstance(event, Collision):
+                continue
+            for pair in map(tuple, np.asarray(contacts).tolist()):
+                if pair in self.recent or event.bodies is not None and \
+                        not np.isin(pair, event.bodies).all():
+                    continue
+                found.append({"event": event.describe(),
+                              "kind": event.name,
+                              "time": float(time),
+                              "bodies": pair,
+                              "terminal": event.terminal})
+        self.report(found)
+
+        for event in self.events:
+            event.compact(keep)
+            event.invalidate()
+        self.recent = set()
+        self.last = None
+        self.start = None
+
+    def discard_after(self, time):
+        '''
+        Функция, удаляющая события, произошедшие позже указанного
+        модельного времени (например, после возврата модели назад)
+        :param time: модельное время
+        '''
+        self.occurrences = [occurrence for occurrence in self.occurrences
+                            if occurrence["time"] <= time]
+        terminal = [occurrence["time"] for occurrence in self.occurrences
+                    if occurrence["terminal"]]
+        self.stopped = bool(terminal)
+        self.stop_time = min(terminal) if terminal else None
+        self.last = None
+        for event in self.events:
+            event.invalidate()
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,151 @@
+# coding:utf-8
+import numpy as np
+
+# среднее кол-во объектов в ячейке сетки
+PER_CELL = 4
+
+
+class GridIndex:
+    '''
+    Класс пространственного индекса: равномерная сетка по
+    ограничивающему прямоугольнику объектов, в которой номера объектов
+    упорядочены по номерам ячеек (номер ячейки - cx * ny + cy, так что
+    столбец ячеек - это непрерывный отрезок упорядоченного массива)
+
+    Запрос просматривает только ячейки, которые пересекает область
+    запроса: для каждого столбца ячеек отрезок номеров находится
+    двоичным поиском, а расстояния до найденных объектов считаются
+    за одну векторную операцию
+    '''
+
+    def __init__(self, positions):
+        '''
+        Функция, строящая индекс
+        :param positions: массив numpy размера (N, 2) с координатами
+                          объектов (копируется)
+        '''
+        self.positions = np.array(positions, dtype=np.float64)
+        n = len(self.positions)
+
+        self.low = self.positions.min(axis=0) if n else np.zeros(2)
+        size = self.positions.max(axis=0) - self.low if n else np.zeros(2)
+
+        # ячейки квадратные, но их не больше, чем n / PER_CELL вдоль
+        # каждой стороны (объекты могут лежать на одной прямой)
+        cells = max(1.0, n / PER_CELL)
+        self.cell = max((size[0] * size[1] / cells) ** 0.5,
+                        size.max() / cells) or 1.0
+        self.shape = (size // self.cell).astype(np.int64) + 1
+
+        keys = self.cell_keys(self.positions)
+        self.order = np.argsort(keys, kind="stable")
+        self.keys = keys[self.order]
+
+    def __len__(self):
+        return len(self.positions)
+
+    def cell_coords(self, points):
+        '''
+        Функция, возвращающая номера столбца и строки ячеек точек
+        (для точек вне сетки - номера за ее пределами)
+        :param points: массив numpy размера (N, 2) с координатами точек
+        '''
+        return np.floor((points - self.low) / self.cell).astype(np.int64)
+
+    def cell_keys(self, points):
+        '''
+        Функция, возвращающая номера ячеек точек, лежащих в сетке
+        :param points: массив numpy размера (N, 2) с координатами точек
+        '''
+        coords = np.clip(self.cell_coords(points), 0, self.shape - 1)
+        return coords[:, 0] * self.shape[1] + coords[:, 1]
+
+    def candidates(self, x0, y0, x1, y1):
+        '''
+        Функция, возвращающая номера объектов из ячеек, которые
+        пересекает прямоугольник [x0, x1] x [y0, y1]
+        '''
+        low, high = self.cell_coords(np.array([[x0, y0], [x1, y1]]))
+        if (high < 0).any() or (low >= self.shape).any():
+            return np.empty(0, dtype=np.int64)
+        low = np.maximum(low, 0)
+        high = np.minimum(high, self.shape - 1)
+
+        columns = np.arange(low[0], high[0] + 1) * self.shape[1]
+        starts = np.searchsorted(self.keys, columns + low[1], "left")
+        ends = np.searchsorted(self.keys, columns + high[1], "right")
+
+        # номера элементов всех отрезков [starts, ends) подряд
+        lengths = ends - starts
+        shifts = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+        return self.order[shifts + np.arange(lengths.sum())]
+
+    def in_rect(self, x0, y0, x1, y1):
+        '''
+        Функция, возвращающая номера объектов внутри прямоугольника
+        :param x0, y0: координаты одного угла прямоугольника
+        :param x1, y1: координаты противоположного угла
+        '''
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+
+        found = self.candidates(x0, y0, x1, y1)
+        pos = self.positions[found]
+        inside = (pos[:, 0] >= x0) & (pos[:, 0] <= x1) & \
+            (pos[:, 1] >= y0) & (pos[:, 1] <= y1)
+        return np.sort(found[inside])
+
+    def in_radius(self, x, y, radius):
+        '''
+        Функция, возвращающая номера объектов на расстоянии не больше
+        radius от точки (x, y) в порядке возрастания расстояния
+        '''
+        found = self.candidates(x - radius, y - radius,
+                                x + radius, y + radius)
+        distance = self.distances(found, x, y)
+        inside = distance <= radius
+        found, distance = found[inside], distance[inside]
+        return found[np.argsort(distance, kind="stable")]
+
+    def nearest(self, x, y, max_distance=None):
+        '''
+        Функция, возвращающая номер ближайшего к точке (x, y) объекта
+        (None, если объектов нет или все дальше max_distance)
+        :param max_distance: наибольшее расстояние до объекта,
+                             по умолчанию не ограничено
+        '''
+        if max_distance is not None:
+            found = self.in_radius(x, y, max_distance)
+            return int(found[0]) if len(found) else None
+        if len(self) == 0:
+            return None
+
+        # квадрат ячеек вокруг точки увеличивается вдвое, пока в нем
+        # нет объектов (квадрат со стороной full покрывает всю сетку,
+        # поэтому в нем объекты есть всегда); ближайший объект может
+        # лежать и вне квадрата, но не дальше найденного в нем
+        point = np.array([x, y], dtype=np.float64)
+        coords = self.cell_coords(point[np.newaxis])[0]
+        outside = np.maximum(np.maximum(-coords, coords - self.shape + 1), 0)
+        half = int(outside.max()) + 1
+        full = int(outside.max() + self.shape.max())
+        while True:
+            found = self.candidates(*(point - half * self.cell),
+                                    *(point + half * self.cell))
+            if len(found) or half >= full:
+                break
+            half = min(2 * half, full)
+
+        # квадрат расширяется на ячейку, чтобы округление границ
+        # при далекой точке не отсекло найденный объект
+        reach = self.distances(found, x, y).min() + self.cell
+        found = self.candidates(*(point - reach), *(point + reach))
+        return int(found[np.argmin(self.distances(found, x, y))])
+
+    def distances(self, indices, x, y):
+        '''
+        Функция, возвращающая расстояния от объектов до точки (x, y)
+        :param indices: массив номеров объектов
+        '''
+        pos = self.positions[indices]
+        return np.hypot(pos[:, 0] - x, pos[:, 1] - y)
@@ -0,0 +1,118 @@
+# coding:utf-8
+import numpy as np
+
+# точность и наибольшее кол-во итераций решения уравнения Кеплера
+KEPLER_TOLERANCE = 1e-12
+KEPLER_ITERATIONS = 50
+
+
+def solve_kepler(mean_anomaly, e):
+    '''
+    Функция, решающая уравнение Кеплера E - e * sin(E) = M
+    методом Ньютона сразу для всех тел
+    :param mean_anomaly: массив средних аномалий M
+    :param e: массив эксцентриситетов (0 <= e < 1)
+    Возвращает массив эксцентрических аномалий E
+    '''
+
+    mean_anomaly = np.asarray(mean_anomaly, dtype=float)
+    e = np.asarray(e, dtype=float)
+    anomaly = np.where(e < 0.8, mean_anomaly, np.pi)
+
+    for i in range(KEPLER_ITERATIONS):
+        delta = (anomaly - e * np.sin(anomaly) - mean_anomaly) / \
+            (1 - e * np.cos(anomaly))
+        anomaly = anomaly - delta
+        if np.all(np.abs(delta) < KEPLER_TOLERANCE):
+            break
+
+    return anomaly
+
+
+def state_to_elements(rel_pos, rel_vel, mu):
+    '''
+    Функция, вычисляющая элементы орбит тел относительно
+    центрального тела по их относительным координатам и скоростям
+    :param rel_pos: массив размера (..., 2) относительных координат
+    :param rel_vel: массив размера (..., 2) относительных скоростей
+    :param mu: гравитационный параметр G * (m_центр + m_тела)
+    Возвращает словарь массивов: a - большая полуось, e - эксцентриситет,
+    omega - аргумент перицентра, h - удельный момент импульса (знак
+    задает направление обращения), E - эксцентрическая аномалия,
+    M - средняя аномалия, n - среднее движение, period - период
+    обращения (для незамкнутых орбит a, E, M, n и period равны nan)
+    '''
+
+    rel_pos = np.asarray(rel_pos, dtype=float)
+    rel_vel = np.asarray(rel_vel, dtype=float)
+    mu = np.asarray(mu, dtype=float)
+
+    r = np.hypot(rel_pos[..., 0], rel_pos[..., 1])
+    v2 = (rel_vel ** 2).sum(axis=-1)
+    rv = (rel_pos * rel_vel).sum(axis=-1)
+    h = rel_pos[..., 0] * rel_vel[..., 1] - rel_pos[..., 1] * rel_vel[..., 0]
+
+    e_vec = ((v2 - mu / r)[..., np.newaxis] * rel_pos -
+             rv[..., np.newaxis] * rel_vel) / mu[..., np.newaxis]
+    e = np.hypot(e_vec[..., 0], e_vec[..., 1])
+    omega = np.arctan2(e_vec[..., 1], e_vec[..., 0])
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        inv_a = 2 / r - v2 / mu
+        bound = (inv_a > 0) & (e < 1)
+        a = np.where(bound, 1 / inv_a, np.nan)
+        n = np.sqrt(mu / a ** 3)
+
+        # e * cos(E) и e * sin(E) определены и для круговых орбит
+        anomaly = np.arctan2(rv / np.sqrt(mu * a), 1 - r / a)
+
+    mean_anomaly = anomaly - e * np.sin(anomaly)
+
+    return {"a": a, "e": e, "omega": omega, "h": h, "E": anomaly,
+            "M": mean_anomaly, "n": n, "period": 2 * np.pi / n}
+
+
+def propagate(rel_pos, rel_vel, mu, dt):
+    '''
+    Функция, аналитически продвигающая тела по их замкнутым
+    кеплеровым орбитам на время dt (через функции Лагранжа f и g,
+    поэтому стоимость не зависит от dt)
+    :param rel_pos: массив размера (N, 2) относительных координат
+    :param rel_vel: массив размера (N, 2) относительных скоростей
+    :param mu: массив гравитационных параметров G * (m_центр + m_тела)
+    :param dt: время, на которое продвигаются тела
+    Возвращает новые относительные координаты и скорости
+    '''
+
+    elements = state_to_elements(rel_pos, rel_vel, mu)
+    a = elements["a"]
+    e = elements["e"]
+    n = elements["n"]
+
+    # движение периодично, поэтому целые обороты отбрасываются
+    # (это сохраняет точность g при dt во много периодов)
+    dt = np.mod(dt, elements["period"])
+    mean_anomaly = np.mod(elements["M"] + n * dt, 2 * np.pi)
+    anomaly = solve_kepler(mean_anomaly, e)
+
+    # приращение E отличается от приращения M не больше, чем на 2e,
+    # по нему выбирается нужный оборот
+    delta = anomaly - elements["E"]
+    delta -= 2 * np.pi * np.round((delta - n * dt) / (2 * np.pi))
+
+    r0 = np.hypot(rel_pos[:, 0], rel_pos[:, 1])
+    r = a * (1 - e * np.cos(anomaly))
+
+    f = 1 - a / r0 * (1 - np.cos(delta))
+    g = dt - (delta - np.sin(delta)) / n
+    f_dot = -np.sqrt(mu * a) / (r * r0) * np.sin(delta)
+    g_dot = 1 - a / r * (1 - np.cos(delta))
+
+    new_pos = f[:, np.newaxis] * rel_pos + g[:, np.newaxis] * rel_vel
+    new_vel = f_dot[:, np.newaxis] * rel_pos + g_dot[:, np.newaxis] * rel_vel
+
+    return new_pos, new_vel
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
@@ -0,0 +1,812 @@
+# coding:utf-8
+import hashlib
+import numpy as np
+from solar_system.model import solar_index
+from solar_system.model import solar_kepler
+from solar_system.model import solar_neighbours
+from solar_system.model import solar_obj
+
+# режимы обработки столкновений объектов
+COLLISIONS = ("reflect", "merge")
+
+# режимы продвижения объектов
+PROPAGATIONS = ("nbody", "kepler")
+
+# режимы обнаружения столкновений
+DETECTIONS = ("overlap", "swept")
+
+# точности хранения состояния объектов и соответствующие типы numpy
+PRECISIONS = {"double": np.float64, "single": np.float32}
+
+# наибольшее кол-во столкновений, обрабатываемых за один шаг
+# в режиме "swept" (после него шаг завершается без проверок)
+MAX_SWEEPS = 100
+
+# наибольшее отношение массы объекта к массе центрального тела и
+# наименьшее отношение притяжения центрального тела к притяжению
+# остальных объектов, при которых объект считается движущимся по
+# кеплеровой орбите вокруг центрального тела
+KEPLER_MASS_RATIO = 1e-2
+KEPLER_DOMINANCE = 100
+
+# тесная пара (двойная звезда) движется относительно своего центра
+# масс аналитически, если время прохождения перицентра ее орбиты
+# sqrt(rp ** 3 / mu) меньше BINARY_STEPS шагов, а притяжение внутри
+# пары хотя бы в BINARY_DOMINANCE раз больше разницы ускорений,
+# сообщаемых ее объектам остальными объектами
+BINARY_STEPS = 100
+BINARY_DOMINANCE = 100
+
+# при смягчении гравитации тесная пара продвигается аналитически,
+# только если перицентр ее орбиты дальше BINARY_SOFTENING длин
+# смягчения: кеплерова орбита не учитывает смягчение, а на таком
+# расстоянии смягченная сила отличается от ньютоновской меньше, чем
+# на 0.2%, так что переход пары между численным и аналитическим
+# движением почти не меняет энергию
+BINARY_SOFTENING = 30
+
+# раз в сколько шагов ищутся новые тесные пары (уже найденные
+# проверяются на каждом шаге)
+BINARY_EVERY = 10
+
+# раз в сколько шагов кеплеровы орбиты возмущаются остальными объектами
+KICK_EVERY = 10
+
+
+class Model:
+    '''
+    Класс физической модели
+    '''
+
+    def __init__(self, collisions="reflect", propagation="nbody",
+                 kick_every=KICK_EVERY, detection="overlap",
+                 precision="double", softening=0.0, regularization=True):
+        '''
+        Функция, иницализирующая модель
+        :param collisions: режим обработки столкновений: "reflect" -
+                           отражение скоростей, "merge" - слияние
+                           столкнувшихся объектов
+        :param propagation: режим продвижения объектов: "nbody" -
+                            численно, "kepler" - объекты, движущиеся
+                            вокруг самого массивного тела (отмеченные
+                            в файле или найденные автоматически),
+                            продвигаются аналитически по кеплеровым
+                            орбитам
+        :param kick_every: раз в сколько шагов кеплеровы орбиты
+                           возмущаются остальными массивными объектами
+                           (0 - не возмущаются)
+        :param detection: режим обнаружения столкновений: "overlap" -
+                          по пересечению объектов в начале шага,
+                          "swept" - еще и по касанию объектов во время
+                          шага (столкновение обрабатывается в момент
+                          касания, и шаг продолжается, так что быстрые
+                          объекты не пролетают друг сквозь друга)
+        :param precision: точность хранения координат, скоростей и
+                          ускорений: "double" - float64, "single" -
+                          float32 (вдвое меньше памяти для очень
+                          больших моделей; координаты хранятся
+                          относительно центра масс, а суммы сил и
+                          сохраняющиеся величины считаются в float64)
+        :param softening: длина смягчения гравитации (см.
+                          solar_obj.Objects), по умолчанию 0
+        :param regularization: флаг, показывающий надо ли продвигать
+                               тесные пары объектов (двойные звезды)
+                               аналитически: их относительное движение
+                               - по кеплеровой орбите, а центр масс -
+                               под действием остальных объектов (так
+                               тесные сближения не требуют мелких
+                               шагов); при смягчении аналитически
+                               продвигаются только пары, перицентр
+                               которых дальше BINARY_SOFTENING длин
+                               смягчения (ближе кеплерова орбита
+                               расходится со смягченной силой)
+        '''
+        if collisions not in COLLISIONS:
+            raise ValueError(f"Unknown collisions mode: {collisions}")
+        if propagation not in PROPAGATIONS:
+            raise ValueError(f"Unknown propagation mode: {propagation}")
+        if detection not in DETECTIONS:
+            raise ValueError(f"Unknown detection mode: {detection}")
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        if softening < 0:
+            raise ValueError(f"Negative softening: {softening}")
+
+        self.collisions = collisions
+        self.propagation = propagation
+        self.detection = detection
+        self.precision = precision
+        self.softening = softening
+        self.regularization = regularization
+        self.space_objs = solar_obj.Objects([], [], [], [], [], [], [])
+        self.compact_listeners = []
+        self.restore_listeners = []
+
+        self.primary = None
+        self.kick_every = kick_every
+        self.kick_steps = 0
+        self.kick_time = 0
+
+        # модельное время, кол-во шагов и наблюдение за сохраняющимися
+        # величинами (объект solar_diag.Diagnostics, по умолчанию нет)
+        self.time = 0
+        self.steps = 0
+        self.diagnostics = None
+
+        # обнаружение событий во время шагов (объект
+        # solar_events.EventDetector, по умолчанию нет)
+        self.events = None
+
+        # номер версии координат объектов (увеличивается при каждом их
+        # изменении) и пространственный индекс, построенный для версии
+        # self.index_version (перестраивается при запросе к нему, если
+        # координаты с тех пор изменились)
+        self.version = 0
+        self.index = None
+        self.index_version = None
+
+        # список соседей для поиска касаний массивных объектов
+        self.neighbours = solar_neighbours.NeighbourList()
+
+        # массив пар индексов тесных пар, продвигаемых аналитически
+        # (None - пары нужно найти заново)
+        self.binaries = None
+
+    def load(self, objs_data, progress=None):
+        '''
+        Функция, загружающая объекты из переданного массива
+        :param objects: массив с объектами, которые будут добавлены в проект
+        :param progress: функция, принимающая долю уже загруженных
+                         объектов (от 0 до 1), по умолчанию не вызывается
+        '''
+        columns = {key: [] for key in ("x", "y", "v_x", "v_y",
+                                       "color", "r", "m")}
+        flags = {"particle": [], "kepler": []}
+        step = max(1, len(objs_data) // 100)
+        for i, data in enumerate(objs_data):
+            for key, column in columns.items():
+                column.append(data[key])
+            for key, column in flags.items():
+                column.append(data.get(key, False))
+            if progress is not None and i % step == 0:
+                progress(i / len(objs_data))
+
+        columns.update(flags)
+        self.load_columns(columns)
+
+    def load_columns(self, columns):
+        '''
+        Функция, загружающая объекты из столбцов их параметров
+        :param columns: словарь с ключами x, y, v_x, v_y, color, r, m,
+                        particle и kepler, значения которого - списки
+                        или массивы (например, array.array) параметров
+                        объектов
+        '''
+        self.space_objs = solar_obj.Objects(
+            *(columns[key] for key in ("x", "y", "v_x", "v_y",
+                                       "color", "r", "m")),
+            particle=columns["particle"], analytic=columns["kepler"],
+            dtype=PRECISIONS[self.precision], softening=self.softening)
+        self.version += 1
+        self.neighbours.invalidate()
+        self.binaries = None
+        if self.propagation == "kepler":
+            self.find_kepler()
+        else:
+            self.space_objs.analytic[:] = False
+
+    def find_kepler(self):
+        '''
+        Функция, выбирающая центральное тело (самое массивное) и
+        объекты, которые движутся по замкнутым орбитам вокруг него:
+        отмеченные в файле, а также легкие объекты, на которые
+        остальные объекты почти не влияют
+        '''
+        objs = self.space_objs
+        if objs.n_massive == 0:
+            objs.analytic[:] = False
+            return
+
+        self.primary = int(np.argmax(objs.m[:objs.n_massive]))
+        m_primary = objs.m[self.primary]
+
+        rel_pos = np.asarray(objs.pos - objs.pos[self.primary], dtype=float)
+        rel_vel = np.asarray(objs.vel - objs.vel[self.primary], dtype=float)
+        mu = solar_obj.Objects.grav_constant * (m_primary + objs.m)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            elements = solar_kepler.state_to_elements(rel_pos, rel_vel, mu)
+            bound = np.isfinite(elements["a"])
+
+            light = objs.is_particle() | \
+                (objs.m <= KEPLER_MASS_RATIO * m_primary)
+
+            # притяжение центрального тела и всех остальных объектов
+            explicit = objs.analytic.copy()
+            objs.analytic[:] = False
+            objs.calculate_force()
+            r2 = (rel_pos ** 2).sum(axis=1)
+            acc_primary = rel_pos * (-solar_obj.Objects.grav_constant *
+                                     m_primary / r2 ** 1.5)[:, np.newaxis]
+            acc_other = np.hypot(*(objs.acc - acc_primary).T)
+            dominated = np.hypot(*acc_primary.T) >= \
+                KEPLER_DOMINANCE * acc_other
+
+        objs.analytic = (explicit | (light & dominated)) & bound
+        objs.analytic[self.primary] = False
+        objs.acc[objs.analytic] = 0
+
+    def update(self, dt):
+        '''
+        Функция, обновляющая модель в соответствии с dt
+        :param dt: изменение времени
+        '''
+        objs = self.space_objs
+        if self.events is not None:
+            self.events.begin(self)
+        kepler = self.propagation == "kepler" and objs.analytic.any()
+        if kepler:
+            primary_pos = objs.pos[self.primary].copy()
+            primary_vel = objs.vel[self.primary].copy()
+
+        diagnose = self.diagnostics is not None and \
+            self.steps % self.diagnostics.every == 0
+        contacts = self.find_contacts(dt)
+        objs.calculate_force(potential=diagnose, contacts=contacts)
+        if diagnose:
+            self.diagnose()
+
+        self.collide(contacts)
+
+        # после слияния касающихся объектов не остается
+        if self.collisions == "merge":
+            contacts = contacts[:0]
+        binaries = self.find_binaries(dt, contacts)
+
+        if self.detection == "swept":
+            self.sweep(dt, binaries)
+        elif len(binaries):
+            objs.kick(dt)
+            state = self.binary_state(binaries)
+            objs.drift(dt)
+            self.propagate_binaries(binaries, state, dt)
+        else:
+            objs.move(dt)
+
+        if kepler:
+            self.propagate_kepler(dt, primary_pos, primary_vel)
+
+        self.time += dt
+        self.steps += 1
+        self.version += 1
+
+        if self.events is not None:
+            self.events.end(self, dt)
+
+    def find_contacts(self, dt):
+        '''
+        Функция, возвращающая массив пар индексов касающихся массивных
+        объектов (проверяются только пары из списка соседей)
+        :param dt: шаг модели
+        '''
+        objs = self.space_objs
+        massive, _ = objs.active_indices()
+        candidates = self.neighbours.get_pairs(objs, massive, dt)
+        contacts = objs.find_contacts(candidates)
+        self.neighbours.record(len(candidates), len(contacts))
+
+        return contacts
+
+    def collide(self, contacts, elapsed=0):
+        '''
+        Функция, обрабатывающая столкновения касающихся объектов
+        (слиянием или отражением в зависимости от режима)
+        :param contacts: массив пар индексов касающихся объектов
+        :param elapsed: время от начала шага до столкновения
+        '''
+        objs = self.space_objs
+        if self.collisions == "merge":
+            keep = objs.merge(contacts)
+            if keep is not None:
+                self.neighbours.invalidate()
+                if self.primary is not None:
+                    self.primary = int(keep[:self.primary].sum())
+                self.binaries = None
+                if self.diagnostics is not None:
+                    self.diagnostics.rebase()
+                if self.events is not None:
+                    self.events.compact(keep, contacts, self.time + elapsed)
+                for listener in self.compact_listeners:
+                    listener(keep)
+        else:
+            objs.reflect(contacts)
+
+    def sweep(self, dt, binaries=None):
+        '''
+        Функция, передвигающая объекты за dt с обработкой столкновений
+        в моменты касания: объекты передвигаются до самого раннего
+        касания, столкновение обрабатывается, и передвижение
+        продолжается до конца шага
+        :param dt: изменение времени
+        :param binaries: массив пар индексов тесных пар (их движение
+                         внутри пары после шага заменяется кеплеровым,
+                         если за шаг объекты не сливались)
+        '''
+        objs = self.space_objs
+        objs.kick(dt)
+        if binaries is not None and len(binaries):
+            state = self.binary_state(binaries)
+
+        # пары, уже столкнувшиеся на этом шаге (при отражении они
+        # могут продолжать сближаться и не должны сталкиваться снова)
+        collided = set()
+        if binaries is not None:
+            # объекты тесных пар друг с другом не сталкиваются
+            collided.update(map(tuple, binaries.tolist()))
+        remaining = dt
+        for _ in range(MAX_SWEEPS):
+            massive, _ = objs.active_indices()
+            candidates = self.neighbours.get_pairs(objs, massive, remaining,
+                                                   swept=True)
+            contact_time, contacts = objs.first_contacts(massive, remaining,
+                                                         collided, candidates)
+            if contact_time is None:
+                break
+
+            objs.drift(contact_time)
+            remaining -= contact_time
+            self.collide(contacts, dt - remaining)
+
+            # после слияния индексы объектов меняются
+            if self.collisions == "merge":
+                collided.clear()
+            else:
+                collided.update(map(tuple, contacts.tolist()))
+
+        objs.drift(remaining)
+
+        if binaries is not None and len(binaries) and \
+                self.binaries is not None:
+            self.propagate_binaries(binaries, state, dt)
+
+    def find_binaries(self, dt, contacts):
+        '''
+        Функция, находящая тесные пары, которые продвигаются
+        аналитически, и убирающая из ускорений их объектов взаимное
+        притяжение (раз в BINARY_EVERY шагов ищутся новые пары,
+        на остальных шагах проверяются уже найденные)
+        :param dt: шаг модели
+        :param contacts: массив пар индексов касающихся объектов
+                         (такие пары не продвигаются аналитически)
+        Возвращает массив пар индексов (i < j)
+        '''
+        objs = self.space_objs
+        if not self.regularization or objs.n_massive < 2:
+            self.binaries = np.zeros((0, 2), dtype=int)
+            return self.binaries
+
+        if self.binaries is None or self.steps % BINARY_EVERY == 0:
+            # пары объектов, притягивающих друг друга сильнее всех
+            massive, _ = objs.active_indices()
+            partners = objs.strongest_partners(massive)
+            local = np.searchsorted(massive, partners)
+            mutual = (local[local] == np.arange(len(massive))) & \
+                (massive < partners)
+            pairs = np.column_stack((massive[mutual], partners[mutual]))
+        else:
+            pairs = self.binaries
+
+        if len(pairs) == 0:
+            self.binaries = pairs
+            return pairs
+
+        if len(contacts):
+            touching = set(map(tuple, contacts.tolist()))
+            pairs = pairs[[tuple(pair) not in touching
+                           for pair in pairs.tolist()]]
+
+        i, j = pairs.T
+        rel_pos = np.asarray(objs.pos[j] - objs.pos[i], dtype=float)
+        rel_vel = np.asarray(objs.vel[j] - objs.vel[i], dtype=float)
+        grav = solar_obj.Objects.grav_constant
+        mu = grav * (objs.m[i] + objs.m[j])
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # перицентр замкнутой орбиты по энергии и моменту импульса
+            # (без вычисления остальных элементов орбиты)
+            l = np.hypot(rel_pos[:, 0], rel_pos[:, 1])
+            energy = (rel_vel ** 2).sum(axis=1) - 2 * mu / l
+            h = rel_pos[:, 0] * rel_vel[:, 1] - rel_pos[:, 1] * rel_vel[:, 0]
+            e = np.sqrt(np.maximum(1 + h * h * energy / (mu * mu), 0))
+            periapsis = h * h / (mu * (1 + e))
+            tight = (energy < 0) & \
+                (periapsis ** 3 < mu * (BINARY_STEPS * dt) ** 2) & \
+                (periapsis > BINARY_SOFTENING * self.softening)
+
+        # обычно тесных пар нет, и ускорения можно не проверять
+        if not tight.any():
+            self.binaries = pairs[:0]
+            return self.binaries
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            # ускорения от остальных объектов (без взаимного притяжения,
+            # смягченного так же, как в вычислении сил)
+            soft = np.sqrt(l * l + self.softening ** 2)
+            mutual_acc = rel_pos / (soft ** 3)[:, np.newaxis]
+            acc_i = objs.acc[i] - grav * objs.m[j, np.newaxis] * mutual_acc
+            acc_j = objs.acc[j] + grav * objs.m[i, np.newaxis] * mutual_acc
+            tidal = np.hypot(*(acc_j - acc_i).T)
+            dominated = mu / (l * l) >= BINARY_DOMINANCE * tidal
+
+        binary = tight & dominated
+        self.binaries = pairs[binary]
+        objs.acc[i[binary]] = acc_i[binary]
+        objs.acc[j[binary]] = acc_j[binary]
+
+        return self.binaries
+
+    def binary_state(self, binaries):
+        '''
+        Функция, возвращающая координаты и скорости объектов тесных
+        пар (в float64) перед передвижением
+        :param binaries: массив пар индексов тесных пар
+        '''
+        objs = self.space_objs
+        i, j = binaries.T
+
+        return tuple(np.asarray(column, dtype=float) for column in
+                     (objs.pos[i], objs.pos[j], objs.vel[i], objs.vel[j]))
+
+    def propagate_binaries(self, binaries, state, dt):
+        '''
+        Функция, продвигающая тесные пары: центр масс пары движется
+        прямолинейно со скоростью после толчка остальными объектами,
+        а объекты относительно него - по кеплеровой орбите
+        :param binaries: массив пар индексов тесных пар
+        :param state: координаты и скорости объектов пар перед
+                      передвижением (см. binary_state)
+        :param dt: изменение времени
+        '''
+        objs = self.space_objs
+        i, j = binaries.T
+        pos_i, pos_j, vel_i, vel_j = state
+
+        m_i = objs.m[i, np.newaxis]
+        m_j = objs.m[j, np.newaxis]
+        total = m_i + m_j
+        center_vel = (m_i * vel_i + m_j * vel_j) / total
+        center_pos = (m_i * pos_i + m_j * pos_j) / total + center_vel * dt
+
+        rel_pos, rel_vel = solar_kepler.propagate(
+            pos_j - pos_i, vel_j - vel_i,
+            solar_obj.Objects.grav_constant * total[:, 0], dt)
+
+        objs.pos[i] = center_pos - m_j / total * rel_pos
+        objs.pos[j] = center_pos + m_i / total * rel_pos
+        objs.vel[i] = center_vel - m_j / total * rel_vel
+        objs.vel[j] = center_vel + m_i / total * rel_vel
+
+    def diagnose(self):
+        '''
+        Функция, измеряющая сохраняющиеся величины массивных объектов
+        в начале шага (потенциальная энергия берется из прохода
+        вычисления сил, если в нем участвовали все массивные объекты)
+        '''
+        objs = self.space_objs
+        n = objs.n_massive
+
+        if objs.analytic[:n].any():
+            potential = objs.potential_energy()
+        else:
+            potential = objs.potential
+
+        self.diagnostics.measure(self.time, objs.m[:n],
+                                 np.asarray(objs.pos[:n], dtype=float),
+                                 np.asarray(objs.vel[:n], dtype=float),
+                                 potential)
+
+    def propagate_kepler(self, dt, primary_pos, primary_vel):
+        '''
+        Функция, продвигающая объекты по кеплеровым орбитам вокруг
+        центрального тела (раз в kick_every шагов их скорости
+        возмущаются остальными массивными объектами)
+
+        Аналитические объекты не притягивают центральное тело в
+        численном проходе, поэтому его отдача задается через импульс:
+        скорость центрального тела выбирается так, чтобы суммарный
+        импульс его и аналитических объектов за шаг не изменился
+        :param dt: изменение времени
+        :param primary_pos: координаты центрального тела до шага
+        :param primary_vel: скорость центрального тела до шага
+        '''
+        objs = self.space_objs
+        indices = np.nonzero(objs.analytic)[0]
+        m = objs.m[indices]
+        momentum = objs.m[self.primary] * \
+            np.asarray(objs.vel[self.primary], dtype=float) + \
+            m @ np.asarray(objs.vel[indices], dtype=float)
+
+        self.kick_steps += 1
+        self.kick_time += dt
+        if self.kick_every and self.kick_steps >= self.kick_every:
+            objs.vel[indices] += self.perturbation(indices) * self.kick_time
+            self.kick_steps = 0
+            self.kick_time = 0
+
+        rel_pos = np.asarray(objs.pos[indices] - primary_pos, dtype=float)
+        rel_vel = np.asarray(objs.vel[indices] - primary_vel, dtype=float)
+        mu = solar_obj.Objects.grav_constant * \
+            (objs.m[self.primary] + objs.m[indices])
+
+        # объекты, орбиты которых разомкнулись, дальше
+        # двигаются численно
+        bound = (rel_vel ** 2).sum(axis=1) < \
+            2 * mu / np.hypot(*rel_pos.T)
+        objs.analytic[indices[~bound]] = False
+        momentum -= m[~bound] @ np.asarray(objs.vel[indices[~bound]],
+                                           dtype=float)
+        indices = indices[bound]
+        m = m[bound]
+
+        new_pos, new_vel = solar_kepler.propagate(rel_pos[bound],
+                                                  rel_vel[bound],
+                                                  mu[bound], dt)
+        objs.vel[self.primary] = (momentum - m @ new_vel) / \
+            (objs.m[self.primary] + m.sum())
+        objs.pos[indices] = objs.pos[self.primary] + new_pos
+        objs.vel[indices] = objs.vel[self.primary] + new_vel
+
+    def perturbation(self, targets):
+        '''
+        Функция, вычисляющая ускорения объектов относительно
+        центрального тела, вызванные остальными массивными объектами
+        :param targets: массив индексов объектов
+        '''
+        objs = self.space_objs
+        sources = np.arange(objs.n_massive)
+        sources = sources[sources != self.primary]
+        pos = np.asarray(objs.pos[sources], dtype=float)
+        coeff_m = solar_obj.Objects.grav_constant * objs.m[sources]
+
+        # ускорение, которое те же объекты сообщают центральному телу
+        d_primary = pos - objs.pos[self.primary]
+        l_primary = np.hypot(*d_primary.T)
+        indirect = (d_primary * (coeff_m / l_primary ** 3)[:, np.newaxis]) \
+            .sum(axis=0)
+
+        acc = np.empty((len(targets), 2))
+        chunk = max(1, solar_obj.CHUNK_SIZE // max(len(sources), 1))
+        for start in range(0, len(targets), chunk):
+            chunk_targets = targets[start:start + chunk]
+
+            d = pos[np.newaxis, :, :] - objs.pos[chunk_targets, np.newaxis, :]
+            l = np.sqrt((d ** 2).sum(axis=2))
+            l[chunk_targets[:, np.newaxis] == sources] = np.inf
+            coeff = coeff_m / l ** 3
+            acc[start:start + chunk] = \
+                (d * coeff[:, :, np.newaxis]).sum(axis=1) - indirect
+
+        # притяжение центрального тела самим объектом уже входит в его
+        # кеплерову орбиту (mu = G * (m_центр + m_объекта))
+        own = np.searchsorted(sources, targets)
+        mask = own < len(sources)
+        mask[mask] = sources[own[mask]] == targets[mask]
+        own = own[mask]
+        acc[mask] += d_primary[own] * \
+            (coeff_m[own] / l_primary[own] ** 3)[:, np.newaxis]
+
+        return acc
+
+    def add_compact_listener(self, listener):
+        '''
+        Функция, добавляющая функцию, которая будет вызываться
+        после удаления объектов из модели (например, при слиянии)
+        :param listener: функция, принимающая булев массив оставшихся
+                         объектов (по старым индексам)
+        '''
+
+        self.compact_listeners.append(listener)
+
+    def add_restore_listener(self, listener):
+        '''
+        Функция, добавляющая функцию, которая будет вызываться
+        после восстановления модели из снимка
+        :param listener: функция без аргументов
+        '''
+
+        self.restore_listeners.append(listener)
+
+    def snapshot(self):
+        '''
+        Функция, возвращающая полный снимок состояния модели,
+        из которого ее можно восстановить функцией restore
+        '''
+
+        return {
+                "objects": self.space_objs.copy(),
+                "primary": self.primary,
+                "kick steps": self.kick_steps,
+                "kick time": self.kick_time,
+                "binaries": None if self.binaries is None
+                else self.binaries.copy(),
+                "time": self.time,
+                "steps": self.steps
+               }
+
+    def restore(self, snapshot):
+        '''
+        Функция, восстанавливающая состояние модели из снимка
+        (сам снимок не изменяется и может использоваться повторно)
+        :param snapshot: словарь, возвращенный функцией snapshot
+        '''
+
+        self.space_objs = snapshot["objects"].copy()
+        self.primary = snapshot["primary"]
+        self.kick_steps = snapshot["kick steps"]
+        self.kick_time = snapshot["kick time"]
+        self.binaries = snapshot["binaries"]
+        if self.binaries is not None:
+            self.binaries = self.binaries.copy()
+        self.time = snapshot["time"]
+        self.steps = snapshot["steps"]
+        self.version += 1
+        self.neighbours.invalidate()
+
+        if self.diagnostics is not None:
+            self.diagnostics.discard_after(self.time)
+        if self.events is not None:
+            self.events.discard_after(self.time)
+
+        for listener in self.restore_listeners:
+            listener()
+
+    def get_link(self):
+        '''
+        Функция, возращающая ссылку на реальный набор
+        космических объектов (solar_obj.Objects)
+        '''
+
+        return self.space_objs
+
+    def get_positions(self):
+        '''
+        Функция, возвращающая массив numpy размера (N, 2)
+        с координатами всех космических объектов
+        '''
+
+        return self.space_objs.get_positions()
+
+    def get_index(self):
+        '''
+        Функция, возвращающая пространственный индекс
+        (solar_index.GridIndex) текущих координат объектов,
+        перестраивая его, только если координаты изменились
+        '''
+
+        if self.index is None or self.index_version != self.version:
+            self.index = solar_index.GridIndex(self.get_positions())
+            self.index_version = self.version
+
+        return self.index
+
+    def find_nearest(self, x, y, max_distance=None):
+        '''
+        Функция, возвращающая номер объекта, ближайшего к точке (x, y)
+        (None, если объектов нет или все они дальше max_distance)
+        :param x: горизонтальная координата точки
+        :param y: вертикальная координата точки
+        :param max_distance: наибольшее расстояние до объекта,
+                             по умолчанию не ограничено
+        '''
+
+        return self.get_index().nearest(x, y, max_distance)
+
+    def find_in_radius(self, x, y, radius):
+        '''
+        Функция, возвращающая массив номеров объектов на расстоянии
+        не больше radius от точки (x, y) в порядке возрастания расстояния
+        :param x: горизонтальная координата центра круга
+        :param y: вертикальная координата центра круга
+        :param radius: радиус круга
+        '''
+
+        return self.get_index().in_radius(x, y, radius)
+
+    def find_in_rect(self, x0, y0, x1, y1):
+        '''
+        Функция, возвращающая упорядоченный массив номеров объектов
+        внутри прямоугольника
+        :param x0: горизонтальная координата одного угла
+        :param y0: вертикальная координата одного угла
+        :param x1: горизонтальная координата противоположного угла
+        :param y1: вертикальная координата противоположного угла
+        '''
+
+        return self.get_index().in_rect(x0, y0, x1, y1)
+
+    def dump(self):
+        '''
+        Функция, возвращающая последнее состояние модели
+        '''
+
+        return list(self.iter_dump())
+
+    def iter_dump(self):
+        '''
+        Функция-генератор, по одному выдающая описания объектов
+        последнего состояния модели (для потокового сохранения)
+        '''
+
+        return self.space_objs.iter_dump()
+
+    def get_digest(self):
+        '''
+        Функция, возвращающая хэш sha256 текущего состояния модели
+        (координат, скоростей, радиусов и масс всех объектов)
+        '''
+
+        objs = self.space_objs
+        state = np.column_stack((objs.get_positions(), objs.vel,
+                                 objs.r, objs.m))
+
+        return hashlib.sha256(state.astype("<f8").tobytes()).hexdigest()
+
+    def get_max_distance(self, progress=None):
+        '''
+        Функция, возвращающая максимальное расстояние между
+        объектами (самые удаленные объекты всегда лежат на
+        выпуклой оболочке, поэтому перебираются только ее вершины)
+        :param progress: функция, принимающая долю уже обработанных
+                         объектов (от 0 до 1), по умолчанию не вызывается
+        '''
+
+        hull = convex_hull(self.space_objs.pos)
+        chunk = max(1, solar_obj.CHUNK_SIZE // max(len(hull), 1))
+
+        distance = 0
+        for start in range(0, len(hull), chunk):
+            if progress is not None:
+                progress(start / len(hull))
+            d = hull[start:start + chunk, np.newaxis, :] - hull
+            distance = max(distance, (d ** 2).sum(axis=2).max())
+
+        distance = distance ** 0.5
+
+        return distance
+
+
+def convex_hull(points):
+    '''
+    Функция, возвращающая вершины выпуклой оболочки набора точек
+    (алгоритм Эндрю, точки внутри четырехугольника из крайних
+    точек отбрасываются заранее)
+    :param points: массив numpy размера (N, 2) с координатами точек
+    '''
+
+    if len(points) < 3:
+        return points
+
+    # крайние точки в порядке против часовой стрелки
+    quad = points[[np.argmin(points[:, 0]), np.argmin(points[:, 1]),
+                   np.argmax(points[:, 0]), np.argmax(points[:, 1])]]
+    inside = np.ones(len(points), dtype=bool)
+    for a, b in zip(quad, np.roll(quad, -1, axis=0)):
+        inside &= ((b[0] - a[0]) * (points[:, 1] - a[1]) -
+                   (b[1] - a[1]) * (points[:, 0] - a[0])) > 0
+    points = np.unique(points[~inside], axis=0)
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    upper = []
+    for point in points.tolist():
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], point) <= 0:
+            lower.pop()
+        lower.append(point)
+    for point in reversed(points.tolist()):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], point) <= 0:
+            upper.pop()
+        upper.append(point)
+
+    return np.array(lower[:-1] + upper[:-1])
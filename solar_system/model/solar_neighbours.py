@@ -0,0 +1,165 @@
+# coding:utf-8
+import numpy as np
+from solar_system.model import solar_obj
+
+# на сколько шагов самого быстрого объекта рассчитывается запас
+# (skin) списка соседей
+LIFETIME = 10
+
+# наименьший запас в радиусах самого большого объекта
+MIN_SKIN_RADII = 1
+
+
+class NeighbourList:
+    '''
+    Класс списка соседей (Verlet list) массивных объектов: пар,
+    расстояние между которыми при построении списка было меньше порога
+    (суммы радиусов и/или заданного расстояния) плюс запас (skin).
+    Пока ни один объект не сместился больше чем на половину запаса,
+    сблизиться до порога могут только пары из списка, поэтому близкие
+    взаимодействия (столкновения, события сближения) проверяются
+    только для них, а список перестраивается лишь изредка
+
+    Запас выбирается при построении так, чтобы самого быстрого объекта
+    хватило примерно на LIFETIME шагов
+
+    Метрики: rebuild rate - доля запросов, при которых список
+    перестраивался, hit rate - доля пар-кандидатов, которые
+    оказались касающимися
+    '''
+
+    def __init__(self, lifetime=LIFETIME, distance=0, radii=True):
+        '''
+        Функция, инициализирующая пустой список соседей
+        :param lifetime: на сколько шагов самого быстрого объекта
+                         рассчитывается запас
+        :param distance: расстояние, добавляемое к порогу пары
+        :param radii: флаг, показывающий входит ли в порог пары
+                      сумма радиусов объектов
+        '''
+        self.lifetime = lifetime
+        self.distance = distance
+        self.radii = radii
+        self.indices = None
+        self.built_pos = None
+        self.skin = 0
+        self.pairs = np.zeros((0, 2), dtype=int)
+
+        self.queries = 0
+        self.builds = 0
+        self.candidates = 0
+        self.hits = 0
+
+    def invalidate(self):
+        '''
+        Функция, сбрасывающая список (например, после слияния
+        объектов или восстановления модели из снимка, когда индексы
+        объектов меняются)
+        '''
+        self.indices = None
+
+    def get_pairs(self, objs, indices, dt, swept=False):
+        '''
+        Функция, возвращающая массив размера (K, 2) пар индексов
+        (i < j, по возрастанию) объектов, которые могут касаться,
+        перестраивая список при необходимости
+        :param objs: объект solar_obj.Objects
+        :param indices: упорядоченный массив индексов массивных
+                        объектов, для которых строится список
+        :param dt: шаг модели
+        :param swept: флаг, показывающий что касания ищутся в течение
+                      всего шага (тогда в запас входит и смещение
+                      объектов за шаг)
+        '''
+        self.queries += 1
+        vel = objs.vel[indices]
+        step = float(np.sqrt((vel * vel).sum(axis=1).max(initial=0))) * dt
+        reach = step if swept else 0
+
+        if self.is_stale(objs, indices, reach):
+            self.build(objs, indices, step)
+
+        return self.pairs
+
+    def is_stale(self, objs, indices, reach):
+        '''
+        Функция, проверяющая, нужно ли перестроить список
+        :param objs: объект solar_obj.Objects
+        :param indices: массив индексов массивных объектов
+        :param reach: насколько еще могут сместиться объекты за время,
+                      в течение которого ищутся касания
+        '''
+        # индексы объектов меняются только при слиянии, загрузке и
+        # восстановлении модели, после которых список сбрасывается
+        if self.indices is None or len(self.indices) != len(indices):
+            return True
+
+        allowed = self.skin / 2 - reach
+        if allowed < 0:
+            return True
+        moved = objs.pos[indices] - self.built_pos
+        return float((moved * moved).sum(axis=1).max(initial=0)) > \
+            allowed * allowed
+
+    def build(self, objs, indices, step):
+        '''
+        Функция, строящая список соседей
+        :param objs: объект solar_obj.Objects
+        :param indices: массив индексов массивных объектов
+        :param step: наибольшее смещение объекта за шаг
+        '''
+        self.builds += 1
+        r = objs.r[indices]
+        self.skin = float(max(MIN_SKIN_RADII * r.max(initial=0),
+                              2 * self.lifetime * step))
+
+        n = len(indices)
+        x, y = objs.pos[indices].T.astype(np.float64)
+        chunk = max(1, solar_obj.CHUNK_SIZE // max(n, 1))
+        pairs = []
+
+        # для строк start..stop проверяются только столбцы правее
+        # диагонали (пары i < j)
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            dx = x[np.newaxis, start:] - x[start:stop, np.newaxis]
+            dy = y[np.newaxis, start:] - y[start:stop, np.newaxis]
+            reach = self.distance + self.skin
+            if self.radii:
+                reach = reach + r[start:stop, np.newaxis] + r[start:]
+            near = dx * dx + dy * dy < reach * reach
+            near &= np.arange(n - start) > \
+                np.arange(stop - start)[:, np.newaxis]
+
+            i, j = np.nonzero(near)
+            pairs.append(np.column_stack((indices[i + start],
+                                          indices[j + start])))
+
+        self.pairs = np.concatenate(pairs) if pairs else \
+            np.zeros((0, 2), dtype=int)
+        self.indices = indices.copy()
+        self.built_pos = objs.pos[indices].copy()
+
+    def record(self, candidates, hits):
+        '''
+        Функция, учитывающая проверку пар-кандидатов в метриках
+        :param candidates: кол-во проверенных пар
+        :param hits: кол-во касающихся пар среди них
+        '''
+        self.candidates += candidates
+        self.hits += hits
+
+    def get_metrics(self):
+        '''
+        Функция, возвращающая словарь с метриками списка соседей
+        '''
+        return {
+                "queries": self.queries,
+                "builds": self.builds,
+                "rebuild rate": self.builds / self.queries
+                if self.queries else 0,
+                "hit rate": self.hits / self.candidates
+                if self.candidates else 0,
+                "pairs": len(self.pairs),
+                "skin": self.skin
+               }
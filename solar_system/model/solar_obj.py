@@ -0,0 +1,613 @@
+# coding:utf-8
+import numpy as np
+
+# наибольшее кол-во попарных расстояний, вычисляемых за один раз
+# (ограничивает память, занимаемую промежуточными массивами)
+CHUNK_SIZE = 2 ** 20
+
+# по сколько объектов переводится в списки Python при сохранении
+DUMP_BLOCK = 4096
+
+# относительная разница времен касаний, при которой касания
+# считаются одновременными
+CONTACT_TOLERANCE = 1e-9
+
+
+class Objects:
+    '''
+    Класс набора космических объектов солнечной системы, хранящий
+    их состояние в массивах numpy (i-й объект - i-я строка массивов)
+
+    Объекты делятся на массивные, которые притягивают друг друга, и
+    пробные частицы, которые притягиваются массивными объектами, но
+    сами никого не притягивают и ни с чем не сталкиваются. Массивные
+    объекты всегда идут первыми (первые n_massive строк массивов)
+    '''
+
+    grav_constant = 6.67408e-11
+
+    def __init__(self, x, y, v_x, v_y, color, r, m, particle=None,
+                 analytic=None, dtype=np.float64, softening=0.0):
+        '''
+        инициализация набора объектов солнечной системы
+        x - координаты x
+        y - координаты y
+        v_x - горизонтальные скорости
+        v_y - вертикальные скорости
+        color - список цветов
+        r - радиусы
+        m - массы
+        particle - флаги пробных частиц, по умолчанию все
+                   объекты массивные
+        analytic - флаги объектов, которые двигаются аналитически,
+                   по умолчанию все объекты двигаются численно
+        dtype - тип хранения координат, скоростей и ускорений; при
+                типе меньшей точности (np.float32) координаты хранятся
+                относительно центра масс (self.origin), чтобы большие
+                абсолютные координаты не теряли точность
+        softening - длина смягчения гравитации: притяжение считается
+                    по расстоянию sqrt(l ** 2 + softening ** 2), чтобы
+                    сила не росла неограниченно при тесных сближениях
+                    (по умолчанию не смягчается)
+        '''
+        if particle is None:
+            particle = np.zeros(len(m), dtype=bool)
+        particle = np.asarray(particle, dtype=bool)
+
+        # массивные объекты ставятся перед пробными частицами
+        order = np.argsort(particle, kind="stable")
+        self.n_massive = int(len(particle) - particle.sum())
+
+        self.pos = np.column_stack((np.asarray(x, dtype=float),
+                                    np.asarray(y, dtype=float)))[order]
+        self.vel = np.column_stack((np.asarray(v_x, dtype=float),
+                                    np.asarray(v_y, dtype=float)))[order]
+        self.color = [color[i] for i in order.tolist()]
+        self.r = np.asarray(r, dtype=float)[order]
+        self.m = np.asarray(m, dtype=float)[order]
+
+        # начало отсчета координат (в float64)
+        self.origin = np.zeros(2)
+        if np.dtype(dtype) != np.float64:
+            if len(self.m):
+                weights = self.m if self.m.sum() > 0 else \
+                    np.ones(len(self.m))
+                self.origin = weights @ self.pos / weights.sum()
+            self.pos = (self.pos - self.origin).astype(dtype)
+            self.vel = self.vel.astype(dtype)
+        self.acc = np.zeros_like(self.pos)
+
+        # объекты, которые двигаются аналитически (не участвуют
+        # в численном вычислении сил и передвижении)
+        if analytic is None:
+            analytic = np.zeros(len(self.m), dtype=bool)
+        self.analytic = np.asarray(analytic, dtype=bool)[order]
+        self.softening = softening
+
+    def is_particle(self):
+        '''
+        Функция, возвращающая булев массив флагов пробных частиц
+        '''
+        return np.arange(len(self)) >= self.n_massive
+
+    def __len__(self):
+        '''
+        Функция, возвращающая кол-во объектов
+        '''
+        return len(self.m)
+
+    def copy(self):
+        '''
+        создание независимой копии набора объектов
+        '''
+        objs = Objects([], [], [], [], [], [], [])
+        objs.n_massive = self.n_massive
+        objs.origin = self.origin.copy()
+        objs.pos = self.pos.copy()
+        objs.vel = self.vel.copy()
+        objs.acc = self.acc.copy()
+        objs.color = list(self.color)
+        objs.r = self.r.copy()
+        objs.m = self.m.copy()
+        objs.analytic = self.analytic.copy()
+        objs.softening = self.softening
+
+        return objs
+
+    def absolute(self, pos):
+        '''
+        перевод координат из хранимых (относительно self.origin)
+        в абсолютные (в float64 координаты хранятся абсолютными
+        и возвращаются без копирования)
+        pos - массив размера (N, 2) хранимых координат
+        '''
+        if pos.dtype == np.float64:
+            return pos
+        return pos + self.origin
+
+    def get_positions(self):
+        '''
+        массив размера (N, 2) абсолютных координат объектов
+        '''
+        return self.absolute(self.pos)
+
+    def nbytes(self):
+        '''
+        кол-во байт, занимаемых массивами состояния объектов
+        '''
+        return sum(column.nbytes for column in (self.pos, self.vel,
+                                                 self.acc, self.r, self.m,
+                                                 self.analytic))
+
+    @staticmethod
+    def attraction(gm, l):
+        '''
+        коэффициенты ускорений gm / l ** 3 в типе расстояний l (куб
+        расстояний солнечной системы не помещается в float32, поэтому
+        для него деление идет по частям)
+        gm - массив произведений гравитационной постоянной на массы
+        l - массив расстояний
+        '''
+        if l.dtype == np.float64:
+            return gm / l ** 3
+        return gm.astype(l.dtype) / l / (l * l)
+
+    def soften(self, l):
+        '''
+        смягченные расстояния sqrt(l ** 2 + softening ** 2) (без
+        смягчения возвращается сам массив l)
+        l - массив расстояний
+        '''
+        if not self.softening:
+            return l
+        return np.sqrt(l * l + l.dtype.type(self.softening) ** 2)
+
+    @staticmethod
+    def pull(dx, dy, coeff):
+        '''
+        суммарные ускорения sum_j coeff[k, j] * (dx[k, j], dy[k, j])
+        (суммы всегда считаются в float64)
+        dx, dy - массивы составляющих векторов к притягивающим объектам
+        coeff - массив коэффициентов ускорений (см. attraction)
+        Возвращает массив размера (K, 2)
+        '''
+        return np.column_stack((
+            np.einsum("kj,kj->k", dx, coeff, dtype=np.float64),
+            np.einsum("kj,kj->k", dy, coeff, dtype=np.float64)))
+
+    def iter_dump(self):
+        '''
+        генератор, по одному выдающий словари с описаниями объектов
+        (в формате файла модели); массивы переводятся в списки
+        блоками по DUMP_BLOCK объектов, чтобы не копировать их целиком
+        '''
+        particle = self.is_particle()
+        for start in range(0, len(self), DUMP_BLOCK):
+            block = slice(start, start + DUMP_BLOCK)
+            pos = self.absolute(self.pos[block])
+            columns = zip(pos[:, 0].tolist(), pos[:, 1].tolist(),
+                          self.vel[block, 0].tolist(),
+                          self.vel[block, 1].tolist(),
+                          self.color[block], self.r[block].tolist(),
+                          self.m[block].tolist(), particle[block].tolist(),
+                          self.analytic[block].tolist())
+
+            for x, y, v_x, v_y, color, r, m, particle_flag, kepler in columns:
+                obj_data = {
+                            "x": x,
+                            "y": y,
+                            "v_x": v_x,
+                            "v_y": v_y,
+                            "color": color,
+                            "r": r,
+                            "m": m,
+                           }
+                if particle_flag:
+                    obj_data["particle"] = True
+                if kepler:
+                    obj_data["kepler"] = True
+                yield obj_data
+
+    def calculate_force(self, potential=False, contacts=None):
+        '''
+        вычисление ускорений всех объектов, вызванных притяжением
+        массивных объектов (объекты, касающиеся друг друга, не
+        притягиваются)
+        potential - флаг, показывающий надо ли заодно вычислить
+                    потенциальную энергию массивных объектов
+                    (сохраняется в self.potential)
+        contacts - массив пар индексов касающихся массивных объектов,
+                   если они уже найдены (например, по списку соседей),
+                   по умолчанию касания ищутся среди всех пар
+        Возвращает массив размера (K, 2) с парами индексов (i < j)
+        касающихся массивных объектов
+        '''
+        self.acc = np.zeros_like(self.pos)
+        massive, particles = self.active_indices()
+        contacts = self.massive_force(massive, potential, contacts)
+        self.particle_force(massive, particles)
+
+        return contacts
+
+    def active_indices(self):
+        '''
+        Функция, возвращающая массивы индексов массивных объектов и
+        пробных частиц, которые двигаются численно (не аналитически)
+        '''
+        indices = np.arange(len(self))
+        active = ~self.analytic
+        n = self.n_massive
+
+        return indices[:n][active[:n]], indices[n:][active[n:]]
+
+    def massive_force(self, indices, potential=False, known=None):
+        '''
+        вычисление ускорений массивных объектов, вызванных их
+        взаимным притяжением
+        indices - массив индексов массивных объектов
+        potential - флаг, показывающий надо ли заодно вычислить
+                    потенциальную энергию этих объектов по тем же
+                    расстояниям
+        known - массив уже найденных пар индексов касающихся
+                объектов, по умолчанию касания ищутся среди всех пар
+        Возвращает массив пар индексов касающихся массивных объектов
+        '''
+        n = len(indices)
+        x, y = self.pos[indices].T.copy()
+        r = self.r[indices]
+        m = self.m[indices]
+        contacts = []
+        chunk = max(1, CHUNK_SIZE // max(n, 1))
+        if potential:
+            self.potential = 0
+
+        # номера касающихся объектов среди indices (в обе стороны)
+        if known is not None and len(known):
+            local = np.searchsorted(indices, known)
+            known_i = np.concatenate((local[:, 0], local[:, 1]))
+            known_j = np.concatenate((local[:, 1], local[:, 0]))
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            rows = np.arange(stop - start)
+
+            # (dx[k, j], dy[k, j]) - вектор от объекта start + k
+            # к объекту j (составляющие хранятся отдельными массивами,
+            # так как операции над осью длины 2 очень медленные)
+            dx = x[np.newaxis, :] - x[start:stop, np.newaxis]
+            dy = y[np.newaxis, :] - y[start:stop, np.newaxis]
+            l = np.sqrt(dx * dx + dy * dy)
+            l[rows, rows + start] = np.inf
+
+            # проверка слишком близкого сближения
+            if known is None:
+                touching = l < (r[start:stop, np.newaxis] + r)
+                i, j = np.nonzero(touching)
+                i += start
+                pairs = np.column_stack((indices[i], indices[j]))
+                contacts.append(pairs[i < j])
+            elif len(known):
+                in_chunk = (known_i >= start) & (known_i < stop)
+                touching = (known_i[in_chunk] - start, known_j[in_chunk])
+            else:
+                touching = None
+
+            # непосредственное вычисление ускорения,
+            # если объекты не слишком близко
+            if touching is not None:
+                l[touching] = np.inf
+            l = self.soften(l)
+            coeff = Objects.attraction(Objects.grav_constant * m, l)
+            self.acc[indices[start:stop]] = Objects.pull(dx, dy, coeff)
+
+            # каждая пара встречается дважды
+            if potential:
+                self.potential -= 0.5 * Objects.grav_constant * \
+                    (m[start:stop] @ (m / l)).sum()
+
+        if known is not None:
+            return known
+        if contacts:
+            return np.concatenate(contacts)
+        return np.zeros((0, 2), dtype=int)
+
+    def strongest_partners(self, indices):
+        '''
+        поиск для каждого массивного объекта объекта, притягивающего
+        его сильнее всех (по массе и расстоянию)
+        indices - массив индексов массивных объектов
+        Возвращает массив индексов (для каждого объекта indices)
+        '''
+        n = len(indices)
+        x, y = self.pos[indices].T.astype(np.float64)
+        m = self.m[indices]
+        partners = np.zeros(n, dtype=int)
+        chunk = max(1, CHUNK_SIZE // max(n, 1))
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            rows = np.arange(stop - start)
+
+            dx = x[np.newaxis, :] - x[start:stop, np.newaxis]
+            dy = y[np.newaxis, :] - y[start:stop, np.newaxis]
+            l2 = dx * dx + dy * dy
+            l2[rows, rows + start] = np.inf
+            with np.errstate(divide="ignore"):
+                partners[start:stop] = np.argmax(m / l2, axis=1)
+
+        return indices[partners]
+
+    def find_contacts(self, pairs):
+        '''
+        поиск касающихся объектов среди пар-кандидатов (например,
+        из списка соседей)
+        pairs - массив размера (K, 2) пар индексов (i < j)
+        Возвращает массив пар индексов касающихся объектов
+        (в том же порядке, что и в pairs)
+        '''
+        if len(pairs) == 0:
+            return pairs
+        i, j = pairs.T
+        dx = self.pos[j, 0] - self.pos[i, 0]
+        dy = self.pos[j, 1] - self.pos[i, 1]
+        l = np.sqrt(dx * dx + dy * dy)
+
+        return pairs[l < self.r[i] + self.r[j]]
+
+    def particle_force(self, sources, targets):
+        '''
+        вычисление ускорений пробных частиц, вызванных притяжением
+        массивных объектов (за один проход по парам массивный
+        объект - частица)
+        sources - массив индексов притягивающих массивных объектов
+        targets - массив индексов пробных частиц
+        '''
+        x, y = self.pos[sources].T.copy()
+        m = self.m[sources]
+        chunk = max(1, CHUNK_SIZE // max(len(sources), 1))
+
+        for start in range(0, len(targets), chunk):
+            chunk_targets = targets[start:start + chunk]
+
+            dx = x[np.newaxis, :] - self.pos[chunk_targets, 0, np.newaxis]
+            dy = y[np.newaxis, :] - self.pos[chunk_targets, 1, np.newaxis]
+            l = self.soften(np.sqrt(dx * dx + dy * dy))
+            coeff = Objects.attraction(Objects.grav_constant * m, l)
+            self.acc[chunk_targets] = Objects.pull(dx, dy, coeff)
+
+    def potential_energy(self):
+        '''
+        вычисление потенциальной энергии взаимодействия всех
+        массивных объектов (в том числе двигающихся аналитически)
+        '''
+        n = self.n_massive
+        pos = self.pos[:n]
+        m = self.m[:n]
+        chunk = max(1, CHUNK_SIZE // max(n, 1))
+        energy = 0
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            rows = np.arange(stop - start)
+
+            dx = pos[np.newaxis, :, 0] - pos[start:stop, 0, np.newaxis]
+            dy = pos[np.newaxis, :, 1] - pos[start:stop, 1, np.newaxis]
+            l = np.sqrt(dx * dx + dy * dy)
+            l[rows, rows + start] = np.inf
+            l = self.soften(l)
+            energy -= 0.5 * Objects.grav_constant * \
+                (m[start:stop] @ (m / l)).sum()
+
+        return energy
+
+    def reflect(self, contacts):
+        '''
+        изменение скоростей касающихся объектов, сближающихся
+        друг с другом, (отражение составляющих скорости, параллельных
+        линии, соединяющей их центры)
+        contacts - массив пар индексов касающихся объектов
+        '''
+        for i, j in contacts:
+            normal = self.pos[i] - self.pos[j]
+            normal /= np.hypot(*normal)
+            vp_i = self.vel[i] @ normal
+            vp_j = self.vel[j] @ normal
+            if vp_i * vp_j < 0:
+                self.vel[i] -= 2 * vp_i * normal
+                self.vel[j] -= 2 * vp_j * normal
+
+    def merge(self, contacts):
+        '''
+        слияние касающихся объектов (цепочки касающихся объектов
+        сливаются в один объект) с сохранением массы, импульса
+        и объема, цвет берется у самого массивного объекта
+        contacts - массив пар индексов касающихся объектов
+        Возвращает булев массив оставшихся объектов или None,
+        если объекты не сливались
+        '''
+        if len(contacts) == 0:
+            return None
+
+        # объединение касающихся объектов в группы
+        parent = {}
+
+        def find(i):
+            while parent.get(i, i) != i:
+                i = parent[i]
+            return i
+
+        for i, j in contacts.tolist():
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+        groups = {}
+        for i in set(contacts.ravel().tolist()):
+            groups.setdefault(find(i), []).append(i)
+
+        keep = np.ones(len(self), dtype=bool)
+        for members in groups.values():
+            members = np.array(members)
+            m = self.m[members]
+            total = m.sum()
+            weights = m / total if total > 0 else np.full(len(m),
+                                                          1 / len(m))
+            main = members[np.argmax(m)]
+
+            self.pos[main] = weights @ self.pos[members]
+            self.vel[main] = weights @ self.vel[members]
+            self.acc[main] = weights @ self.acc[members]
+            self.r[main] = (self.r[members] ** 3).sum() ** (1 / 3)
+            self.m[main] = total
+
+            keep[members] = False
+            keep[main] = True
+
+        self.compact(keep)
+        return keep
+
+    def compact(self, keep):
+        '''
+        удаление объектов из набора
+        keep - булев массив объектов, которые нужно оставить
+        '''
+        self.n_massive = int(keep[:self.n_massive].sum())
+        self.pos = self.pos[keep]
+        self.vel = self.vel[keep]
+        self.acc = self.acc[keep]
+        self.r = self.r[keep]
+        self.m = self.m[keep]
+        self.analytic = self.analytic[keep]
+        self.color = [color for color, kept in zip(self.color, keep)
+                      if kept]
+
+    def move(self, dt):
+        '''
+        передвижение тел (кроме аналитически двигающихся)
+        за определенное время
+        dt - время, за которое рассматривается изменение
+        '''
+        self.kick(dt)
+        self.drift(dt)
+
+    def kick(self, dt):
+        '''
+        изменение скоростей тел (кроме аналитически двигающихся)
+        под действием ускорений за определенное время
+        dt - время, за которое рассматривается изменение
+        '''
+        if self.analytic.any():
+            active = ~self.analytic
+            self.vel[active] += self.acc[active] * dt
+        else:
+            self.vel += self.acc * dt
+
+    def drift(self, dt):
+        '''
+        передвижение тел (кроме аналитически двигающихся) с текущими
+        скоростями за определенное время
+        dt - время, за которое рассматривается изменение
+        '''
+        if self.analytic.any():
+            active = ~self.analytic
+            self.pos[active] += self.vel[active] * dt
+        else:
+            self.pos += self.vel * dt
+
+    def first_contacts(self, indices, dt, skip=(), pairs=None):
+        '''
+        поиск самого раннего касания массивных объектов, движущихся
+        по прямым с текущими скоростями в течение dt (объекты,
+        которые уже касаются или удаляются друг от друга, не
+        учитываются)
+        indices - массив индексов массивных объектов
+        dt - время, в течение которого ищется касание
+        skip - множество пар индексов (i < j), которые не учитываются
+        pairs - массив пар-кандидатов (i < j, по возрастанию),
+                по умолчанию проверяются все пары объектов indices
+        Возвращает пару из времени касания (None, если за dt объекты
+        не касаются) и массива пар индексов (i < j) объектов,
+        касающихся в это время
+        '''
+        if pairs is not None:
+            times, pairs = self.contact_times(pairs, dt)
+            return Objects.earliest(times, pairs, skip)
+
+        n = len(indices)
+        pos = self.pos[indices]
+        vel = self.vel[indices]
+        r = self.r[indices]
+        chunk = max(1, CHUNK_SIZE // max(n, 1))
+        times = []
+        pairs = []
+
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+
+            # расстояние между объектами start + k и j через время t:
+            # |d + w t|, касание - когда оно равно сумме радиусов
+            d = pos[np.newaxis, :, :] - pos[start:stop, np.newaxis, :]
+            w = vel[np.newaxis, :, :] - vel[start:stop, np.newaxis, :]
+            a = (w ** 2).sum(axis=2)
+            b = (d * w).sum(axis=2)
+            c = (d ** 2).sum(axis=2) - (r[start:stop, np.newaxis] + r) ** 2
+            disc = b ** 2 - a * c
+
+            # меньший корень в виде, устойчивом к потере точности
+            with np.errstate(invalid="ignore", divide="ignore"):
+                t = c / (np.sqrt(disc) - b)
+            hit = (c > 0) & (b < 0) & (disc >= 0) & (t <= dt)
+            hit &= np.arange(n) > np.arange(start, stop)[:, np.newaxis]
+
+            i, j = np.nonzero(hit)
+            times.append(t[i, j])
+            pairs.append(np.column_stack((indices[i + start], indices[j])))
+
+        if not times:
+            return None, np.zeros((0, 2), dtype=int)
+        return Objects.earliest(np.concatenate(times),
+                                np.concatenate(pairs), skip)
+
+    def contact_times(self, pairs, dt):
+        '''
+        вычисление времен касания пар объектов, движущихся по прямым
+        с текущими скоростями (как в first_contacts, но только для
+        пар-кандидатов)
+        pairs - массив пар индексов (i < j)
+        dt - время, в течение которого ищется касание
+        Возвращает пару из массива времен касания и массива пар,
+        которые касаются в течение dt
+        '''
+        i, j = pairs.T
+        d = self.pos[j] - self.pos[i]
+        w = self.vel[j] - self.vel[i]
+        a = (w ** 2).sum(axis=1)
+        b = (d * w).sum(axis=1)
+        c = (d ** 2).sum(axis=1) - (self.r[i] + self.r[j]) ** 2
+        disc = b ** 2 - a * c
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = c / (np.sqrt(disc) - b)
+        hit = (c > 0) & (b < 0) & (disc >= 0) & (t <= dt)
+
+        return t[hit], pairs[hit]
+
+    @staticmethod
+    def earliest(times, pairs, skip):
+        '''
+        выбор самого раннего касания
+        times - массив времен касания
+        pairs - массив пар индексов, касающихся в эти времена
+        skip - множество пар индексов (i < j), которые не учитываются
+        Возвращает пару из времени касания (None, если касаний нет)
+        и массива пар, касающихся в это время
+        '''
+        if skip:
+            fresh = [tuple(pair) not in skip for pair in pairs.tolist()]
+            times = times[fresh]
+            pairs = pairs[fresh]
+        if len(times) == 0:
+            return None, pairs
+
+        first = times.min()
+        return first, pairs[times <= first * (1 + CONTACT_TOLERANCE)]
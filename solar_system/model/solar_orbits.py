@@ -0,0 +1,269 @@
+# coding:utf-8
+import numpy as np
+from solar_system.model import solar_kepler
+from solar_system.model import solar_obj
+
+# кол-во кадров записи, обрабатываемых за раз
+CHUNK_FRAMES = 2 ** 16
+
+# углы, по скорости изменения которых находятся периоды и прецессия:
+# долгота тела (сидерический период), средняя аномалия (аномалистический
+# период) и аргумент перицентра (прецессия)
+ANGLES = ("longitude", "M", "omega")
+
+
+def find_primary(m):
+    '''
+    Функция, возвращающая индекс центрального (самого массивного) тела
+    :param m: массив масс тел
+    '''
+    return int(np.argmax(m))
+
+
+def relative_elements(pos, vel, m, primary=None):
+    '''
+    Функция, вычисляющая элементы орбит всех тел относительно
+    центрального тела за один векторный проход (для одного состояния
+    или сразу для всех кадров записи)
+    :param pos: массив размера (..., N, 2) координат тел
+    :param vel: массив размера (..., N, 2) скоростей тел
+    :param m: массив размера (N,) масс тел
+    :param primary: индекс центрального тела, по умолчанию самое
+                    массивное тело
+    Возвращает словарь массивов размера (..., N) (см.
+    solar_kepler.state_to_elements) с долготой тела longitude; для
+    самого центрального тела значения равны nan
+    '''
+    pos = np.asarray(pos, dtype=float)
+    vel = np.asarray(vel, dtype=float)
+    m = np.asarray(m, dtype=float)
+    if primary is None:
+        primary = find_primary(m)
+
+    rel_pos = pos - pos[..., primary:primary + 1, :]
+    rel_vel = vel - vel[..., primary:primary + 1, :]
+    mu = solar_obj.Objects.grav_constant * (m[primary] + m)
+
+    with np.errstate(all="ignore"):
+        elements = solar_kepler.state_to_elements(rel_pos, rel_vel, mu)
+    elements["longitude"] = np.arctan2(rel_pos[..., 1], rel_pos[..., 0])
+
+    for values in elements.values():
+        values[..., primary] = np.nan
+    return elements
+
+
+def unwrap(angles, previous):
+    '''
+    Функция, убирающая скачки углов на 2 pi между соседними кадрами
+    (кадры со значением nan пропускаются)
+    :param angles: массив размера (F, N) углов
+    :param previous: массив размера (N,) последних развернутых углов
+                     предыдущей части ряда (nan, если их не было)
+    Возвращает массив развернутых углов (nan там, где были nan) и
+    последние развернутые углы
+    '''
+    if len(angles) == 0:
+        return angles, previous
+    valid = ~np.isnan(angles)
+    complete = valid.all()
+
+    if complete:
+        filled = angles
+        start = np.where(np.isnan(previous), angles[0], previous)
+    else:
+        # номер последнего кадра с известным углом (-1 - кадров еще
+        # не было), по которому пропуски заполняются последним углом
+        frames = np.arange(len(angles))[:, np.newaxis]
+        last = np.maximum.accumulate(np.where(valid, frames, -1), axis=0)
+        filled = np.take_along_axis(angles, np.maximum(last, 0), axis=0)
+
+        # ряд, у которого еще не было углов, начинается с первого угла
+        first = np.take_along_axis(
+            filled, valid.argmax(axis=0)[np.newaxis], axis=0)[0]
+        start = np.where(np.isnan(previous), first, previous)
+        filled = np.where(last >= 0, filled, start)
+
+    steps = np.diff(filled, axis=0, prepend=start[np.newaxis])
+    steps = (steps + np.pi) % (2 * np.pi) - np.pi
+    if not complete:
+        steps = np.nan_to_num(steps)
+    unwrapped = start + np.cumsum(steps, axis=0)
+
+    if complete:
+        return unwrapped, unwrapped[-1]
+    previous = np.where(np.isnan(filled[-1]), previous, unwrapped[-1])
+    return np.where(valid, unwrapped, np.nan), previous
+
+
+class OrbitAnalysis:
+    '''
+    Класс анализа рядов элементов орбит: кадры добавляются частями,
+    для каждого тела накапливаются средние большая полуось и
+    эксцентриситет и суммы для линейной регрессии развернутых углов
+    по времени, по наклонам которой находятся периоды обращения и
+    скорость прецессии перицентра
+
+    Прецессия определена только для заметно вытянутых орбит: у почти
+    круговых орбит аргумент перицентра меняется скачками
+    '''
+
+    def __init__(self, m, primary=None):
+        '''
+        Функция, инициализирующая анализ
+        :param m: массив масс тел
+        :param primary: индекс центрального тела, по умолчанию самое
+                        массивное тело
+        '''
+        self.m = np.asarray(m, dtype=float)
+        self.primary = find_primary(self.m) if primary is None \
+            else primary
+        self.origin = None
+
+        # центральное тело в рядах не участвует
+        self.others = np.delete(np.arange(len(self.m)), self.primary)
+        bodies = len(self.others)
+        self.sums = {key: np.zeros(bodies) for key in ("a", "e", "count")}
+        self.previous = {angle: np.full(bodies, np.nan) for angle in ANGLES}
+        self.regression = {angle: np.zeros((5, bodies)) for angle in ANGLES}
+
+    def add(self, times, pos, vel):
+        '''
+        Функция, добавляющая кадры
+        :param times: массив размера (F,) моментов кадров
+        :param pos: массив размера (F, N, 2) координат тел
+        :param vel: массив размера (F, N, 2) скоростей тел
+        '''
+        times = np.asarray(times, dtype=float)
+        if len(times) == 0:
+            return
+        if self.origin is None:
+            self.origin = times[0]
+        elements = relative_elements(pos, vel, self.m, self.primary)
+        elements = {key: elements[key][:, self.others]
+                    for key in ("a", "e") + ANGLES}
+
+        bound = ~np.isnan(elements["a"])
+        self.sums["a"] += np.where(bound, elements["a"], 0).sum(axis=0)
+        self.sums["e"] += np.where(bound, elements["e"], 0).sum(axis=0)
+        self.sums["count"] += bound.sum(axis=0)
+
+        # суммы n, t, y, t^2, t*y по кадрам с известным углом (время
+        # отсчитывается от первого кадра, чтобы суммы не теряли точность)
+        t = (times - self.origin)[:, np.newaxis]
+        for angle in ANGLES:
+            y, self.previous[angle] = unwrap(elements[angle],
+                                             self.previous[angle])
+            valid = ~np.isnan(y)
+            if valid.all():
+                tv = np.broadcast_to(t, y.shape)
+            else:
+                y = np.where(valid, y, 0)
+                tv = np.where(valid, t, 0)
+            self.regression[angle] += np.array([valid.sum(axis=0),
+                                                tv.sum(axis=0),
+                                                y.sum(axis=0),
+                                                (tv * tv).sum(axis=0),
+                                                (tv * y).sum(axis=0)])
+
+    def rate(self, angle):
+        '''
+        Функция, возвращающая наклон линейной регрессии развернутого
+        угла по времени (рад/с) для каждого тела
+        :param angle: имя угла из ANGLES
+        '''
+        n, t, y, tt, ty = self.regression[angle]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 1, (n * ty - t * y) / (n * tt - t * t),
+                            np.nan)
+
+    def result(self):
+        '''
+        Функция, возвращающая словарь массивов результатов по телам:
+        a, e - средние большая полуось и эксцентриситет по кадрам
+        замкнутых орбит, period - сидерический период, anomalistic
+        period - аномалистический период (от перицентра до
+        перицентра), precession - скорость прецессии перицентра
+        (рад/с), direction - направление обращения (1 - против часовой
+        стрелки, -1 - по часовой), frames - кол-во кадров замкнутых
+        орбит
+        '''
+        count = self.sums["count"]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            longitude = self.rate("longitude")
+            values = {
+                      "a": self.sums["a"] / count,
+                      "e": self.sums["e"] / count,
+                      "period": 2 * np.pi / np.abs(longitude),
+                      "anomalistic period": 2 * np.pi / self.rate("M"),
+                      "precession": self.rate("omega"),
+                      "direction": np.sign(longitude)
+                     }
+
+        # для центрального тела значения равны nan (кадров - 0)
+        result = {}
+        for key, value in values.items():
+            result[key] = np.full(len(self.m), np.nan)
+            result[key][self.others] = value
+        result["frames"] = np.zeros(len(self.m), dtype=int)
+        result["frames"][self.others] = count
+        return result
+
+
+def analyze_series(times, pos, vel, m, primary=None):
+    '''
+    Функция, анализирующая ряды координат и скоростей тел, целиком
+    находящиеся в памяти (см. OrbitAnalysis)
+    :param times: массив размера (F,) моментов кадров
+    :param pos: массив размера (F, N, 2) координат тел
+    :param vel: массив размера (F, N, 2) скоростей тел
+    :param m: массив масс тел
+    :param primary: индекс центрального тела
+    '''
+    analysis = OrbitAnalysis(m, primary)
+    for start in range(0, len(times), CHUNK_FRAMES):
+        stop = start + CHUNK_FRAMES
+        analysis.add(times[start:stop], pos[start:stop], vel[start:stop])
+    return analysis.result()
+
+
+def analyze_trajectory(trajectory, m=None, primary=None, progress=None):
+    '''
+    Функция, анализирующая запись траекторий частями по CHUNK_FRAMES
+    кадров; в записи хранятся только координаты, поэтому скорости
+    находятся центральными разностями по соседним кадрам
+    :param trajectory: объект solar_trajectory.Trajectory
+    :param m: массив масс тел, по умолчанию из заголовка записи
+    :param primary: индекс центрального тела
+    :param progress: функция, принимающая долю обработанных кадров
+                     (от 0 до 1), по умолчанию не вызывается
+    '''
+    if m is None:
+        if "m" not in trajectory.header:
+            raise ValueError(f"{trajectory.path} has no body masses")
+        m = trajectory.header["m"]
+    analysis = OrbitAnalysis(m, primary)
+    times = trajectory.times
+    frames = len(trajectory)
+
+    for start in range(0, frames, CHUNK_FRAMES):
+        stop = min(start + CHUNK_FRAMES, frames)
+
+        # к части добавляется по кадру с каждой стороны для разностей
+        low, high = max(start - 1, 0), min(stop + 1, frames)
+        chunk_times = np.asarray(times[low:high])
+        pos = np.asarray(trajectory.positions(low, high))
+        if len(chunk_times) < 2:
+            break
+        vel = np.gradient(pos, chunk_times, axis=0)
+
+        inner = slice(start - low, stop - low)
+        analysis.add(chunk_times[inner], pos[inner], vel[inner])
+        if progress is not None:
+            progress(stop / frames)
+
+    return analysis.result()
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
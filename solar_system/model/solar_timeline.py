@@ -0,0 +1,268 @@
+# coding:utf-8
+import array
+import bisect
+import collections
+import numpy as np
+
+# раз в сколько шагов модели сохраняется полный снимок ее состояния
+KEYFRAME_EVERY = 1000
+
+# раз в сколько шагов модели сохраняются координаты объектов
+# (в float32) для быстрого просмотра промежуточных моментов
+FRAME_EVERY = 10
+
+# наибольший объем памяти (в байтах), занимаемый снимками, координатами
+# и записанными шагами
+MEMORY_LIMIT = 256 * 2 ** 20
+
+# кол-во байт, занимаемых одним записанным шагом (dt и время после него)
+STEP_SIZE = 2 * array.array('d').itemsize
+
+
+class Timeline:
+    '''
+    Класс истории модели: хранит полные снимки состояния модели
+    через равные промежутки шагов и компактные координаты объектов
+    между ними, что позволяет вернуть модель к любому прошедшему
+    моменту
+
+    История разбита на блоки (снимок и координаты до следующего
+    снимка), которые при превышении лимита памяти вытесняются
+    в порядке давности использования (LRU). Последний блок не
+    вытесняется, а шаги модели хранятся от самого раннего
+    сохранившегося снимка, поэтому к любому моменту после него
+    можно вернуться повторным вычислением от ближайшего снимка;
+    при вытеснении самого раннего блока начало истории сдвигается
+    к следующему снимку, и более ранние шаги отбрасываются
+    '''
+
+    def __init__(self, model, keyframe_every=KEYFRAME_EVERY,
+                 frame_every=FRAME_EVERY, memory_limit=MEMORY_LIMIT):
+        '''
+        Функция, инициализирующая историю текущим состоянием модели
+        :param model: объект solar_model.Model
+        :param keyframe_every: раз в сколько шагов сохраняется снимок
+        :param frame_every: раз в сколько шагов сохраняются координаты
+        :param memory_limit: наибольший объем памяти снимков, координат
+                             и шагов
+        '''
+        self.model = model
+        self.keyframe_every = keyframe_every
+        self.frame_every = frame_every
+        self.memory_limit = memory_limit
+
+        # шаги модели и время после каждого из них (times[s] - время
+        # модели после start + s шагов от начала истории; первые start
+        # шагов отброшены вместе с вытесненными блоками)
+        self.first_step = model.steps
+        self.start = 0
+        self.dts = array.array('d')
+        self.times = array.array('d', [model.time])
+
+        # блоки истории по номеру шага их снимка в порядке давности
+        # использования и отсортированный список этих номеров
+        self.blocks = collections.OrderedDict()
+        self.keyframe_steps = []
+        self.memory = STEP_SIZE
+
+        self.add_keyframe()
+
+    def record(self, dt):
+        '''
+        Функция, добавляющая в историю только что сделанный
+        шаг модели (если модель была возвращена назад, история
+        после этого момента отбрасывается)
+        :param dt: изменение времени модели на этом шаге
+        '''
+        index = self.model.steps - self.first_step
+        if index <= self.start + len(self.dts):
+            self.truncate(index - 1)
+
+        self.dts.append(dt)
+        self.times.append(self.model.time)
+        self.memory += STEP_SIZE
+
+        if index % self.keyframe_every == 0:
+            self.add_keyframe()
+        elif index % self.frame_every == 0:
+            self.add_frame(index)
+
+        self.evict()
+
+    def add_keyframe(self):
+        '''
+        Функция, начинающая новый блок истории со снимка
+        текущего состояния модели
+        '''
+        index = self.model.steps - self.first_step
+        snapshot = self.model.snapshot()
+        size = snapshot["objects"].nbytes()
+
+        self.blocks[index] = {"snapshot": snapshot, "frame steps": [],
+                              "frames": [], "size": size}
+        self.keyframe_steps.append(index)
+        self.memory += size
+        self.add_frame(index)
+
+    def add_frame(self, index):
+        '''
+        Функция, добавляющая координаты объектов в последний блок
+        :param index: номер шага от начала истории
+        '''
+        block = self.blocks[self.keyframe_steps[-1]]
+        frame = self.model.get_positions().astype(np.float32)
+
+        block["frame steps"].append(index)
+        block["frames"].append(frame)
+        block["size"] += frame.nbytes
+        self.memory += frame.nbytes
+
+    def evict(self):
+        '''
+        Функция, вытесняющая давно не использованные блоки,
+        пока история не уложится в лимит памяти
+        '''
+        pinned = self.keyframe_steps[-1]
+
+        for index in list(self.blocks):
+            if self.memory <= self.memory_limit:
+                break
+            if index == pinned:
+                continue
+
+            self.memory -= self.blocks.pop(index)["size"]
+            del self.keyframe_steps[bisect.bisect_left(self.keyframe_steps,
+                                                       index)]
+            self.drop_steps(self.keyframe_steps[0])
+
+    def drop_steps(self, index):
+        '''
+        Функция, отбрасывающая записанные шаги до указанного шага
+        (к ним уже нельзя вернуться без вытесненных снимков)
+        :param index: номер нового первого шага от начала истории
+        '''
+        count = index - self.start
+        if count <= 0:
+            return
+        del self.dts[:count]
+        del self.times[:count]
+        self.start = index
+        self.memory -= count * STEP_SIZE
+
+    def truncate(self, index):
+        '''
+        Функция, отбрасывающая историю после указанного шага
+        :param index: номер последнего оставляемого шага
+                      от начала истории
+        '''
+        self.memory -= (self.start + len(self.dts) - index) * STEP_SIZE
+        del self.dts[index - self.start:]
+        del self.times[index - self.start + 1:]
+
+        while self.keyframe_steps[-1] > index:
+            self.memory -= self.blocks.pop(self.keyframe_steps.pop())["size"]
+
+        block = self.blocks[self.keyframe_steps[-1]]
+        while block["frame steps"][-1] > index:
+            block["frame steps"].pop()
+            frame = block["frames"].pop()
+            block["size"] -= frame.nbytes
+            self.memory -= frame.nbytes
+
+    def get_start_time(self):
+        '''
+        Функция, возвращающая модельное время начала истории
+        '''
+        return self.times[0]
+
+    def get_end_time(self):
+        '''
+        Функция, возвращающая модельное время конца истории
+        '''
+        return self.times[-1]
+
+    def find_step(self, time):
+        '''
+        Функция, возвращающая номер последнего шага от начала
+        истории, сделанного не позже указанного времени
+        :param time: модельное время
+        '''
+        return self.start + max(0, bisect.bisect_right(self.times, time) - 1)
+
+    def find_block(self, index):
+        '''
+        Функция, возвращающая номер шага ближайшего сохранившегося
+        снимка не позже указанного шага и отмечающая его блок
+        как использованный
+        :param index: номер шага от начала истории
+        '''
+        keyframe = self.keyframe_steps[
+            bisect.bisect_right(self.keyframe_steps, index) - 1]
+        self.blocks.move_to_end(keyframe)
+
+        return keyframe
+
+    def positions_at(self, time):
+        '''
+        Функция, возвращающая приближенные координаты объектов
+        в указанный момент (линейной интерполяцией между сохраненными
+        координатами), не изменяя модель
+        :param time: модельное время
+        Возвращает массив numpy размера (N, 2) или None, если
+        координаты этого момента не сохранились
+        '''
+        index = self.find_step(time)
+        block = self.blocks[self.find_block(index)]
+        steps = block["frame steps"]
+
+        i = bisect.bisect_right(steps, index) - 1
+        if steps[i] != index - index % self.frame_every:
+            return None
+
+        frame = block["frames"][i]
+        if i + 1 < len(steps):
+            next_frame = block["frames"][i + 1]
+            next_step = steps[i + 1]
+        else:
+            next_index = steps[i] + self.frame_every
+            if next_index not in self.blocks:
+                return frame.astype(float)
+            next_frame = self.blocks[next_index]["frames"][0]
+            next_step = next_index
+
+        # после слияния объектов кол-во координат меняется
+        if len(next_frame) != len(frame):
+            return frame.astype(float)
+
+        t0 = self.times[steps[i] - self.start]
+        t1 = self.times[next_step - self.start]
+        weight = min(max((time - t0) / (t1 - t0), 0), 1) if t1 > t0 else 0
+
+        return frame + (next_frame.astype(float) - frame) * weight
+
+    def seek(self, time):
+        '''
+        Функция, возвращающая модель к последнему шагу, сделанному
+        не позже указанного времени: модель восстанавливается из
+        ближайшего снимка и повторяет записанные шаги (если модель
+        уже находится между снимком и нужным шагом, она продолжает
+        с текущего состояния)
+        :param time: модельное время
+        Возвращает модельное время, к которому вернулась модель
+        '''
+        index = self.find_step(time)
+        keyframe = self.find_block(index)
+        current = self.model.steps - self.first_step
+
+        if not keyframe <= current <= index:
+            self.model.restore(self.blocks[keyframe]["snapshot"])
+            current = keyframe
+
+        for dt in self.dts[current - self.start:index - self.start]:
+            self.model.update(dt)
+
+        return self.model.time
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!")
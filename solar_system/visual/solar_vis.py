@@ -0,0 +1,470 @@
+# coding:utf-8
+import contextlib
+import numpy as np
+import pygame as pg
+
+# наибольший радиус спрайта, при котором он еще может быть
+# виден на экране, если его центр за пределами экрана
+MAX_SPRITE_R = 100
+
+# размер шрифта подписи подэкрана модели
+CAPTION_SIZE = 20
+
+# на сколько пикселей курсор может промахнуться мимо объекта
+# при его выборе мышью
+PICK_RADIUS = 5
+
+
+class COLORS:
+    TRANSPARENT = (255, 255, 255, 0),
+    BLACK = (0, 0, 0),
+    WHITE = (255, 255, 255),
+    GREY = (200, 200, 200),
+    RED = (255, 0, 0),
+    GREEN = (0, 255, 0),
+    BLUE = (0, 0, 255),
+    YELLOW = (255, 255, 0),
+    CYAN = (0, 255, 255),
+    MAGENTA = (255, 0, 255)
+    ALL = [
+        TRANSPARENT,
+        BLACK,
+        WHITE,
+        GREY,
+        RED,
+        GREEN,
+        BLUE,
+        YELLOW,
+        CYAN,
+        MAGENTA
+    ]
+
+
+class Screen:
+    '''
+    Класс экрана, на котором будет отрисовываться
+    некоторая сцена
+    '''
+
+    def __init__(self, size, bg_color=COLORS.TRANSPARENT):
+        '''
+        Функция для инициализации экрана
+        :param size: словарь вида {"w", "h"}, размеры экрана
+        :param bg_color: цвет из COLORS, цвет заднего фона экрана
+                         (заливка), по умолчания он прозрачный
+        '''
+
+        self.size = dict(size)
+        self.bg_color = bg_color
+        self.surf = pg.Surface((self.size["w"], self.size["h"]),
+                               pg.SRCALPHA)
+        self.to_draw_list = []
+
+    def update(self):
+        '''
+        Функция, которая перерисовывате экран
+        (делает заливку bg_color и поочереди отрисовывает
+        все обЪекты, содержащиеся в списке для отрисовки)
+        '''
+
+        self.surf.fill(self.bg_color)
+        for obj in self.to_draw_list:
+            obj.draw()
+
+    def add_obj(self, obj):
+        '''
+        Функция, добавляющая переданный объект в список
+        для отрисовки, если его там еще не было
+        :param obj: обЪект, который нужно добавить в
+                    список для отрисовки (обязательно должен
+                    иметь метод draw() для отрисовки и метод
+                    set_screen примающий объект Screen)
+        '''
+
+        if obj not in self.to_draw_list:
+            self.to_draw_list.append(obj)
+
+    def remove_obj(self, obj):
+        '''
+        Функция, исключающая переданный объект из списка
+        для отрисовки (если он там был)
+        :param obj: объект, который будет исключен из
+                    списка для отрисовки
+        '''
+
+        if obj in self.to_draw_list:
+            self.to_draw_list.remove(obj)
+
+    def get_surface(self):
+        '''
+        Функция, возвращающая основную поверхность для рисования
+        '''
+
+        return self.surf
+
+
+class MainScreen(Screen):
+    '''
+    Класс главного экрана приложения
+    '''
+
+    def __init__(self, size, bg_color=COLORS.WHITE):
+        '''
+        Функция для инициализации главного экрана приложения
+        :param size: словарь вида {"w", "h"}, размеры экрана
+        :param bg_color: цвет из COLORS, цвет заднего фона экрана
+                         (заливка), по умолчания он белый
+        '''
+
+        super().__init__(size, bg_color)
+        self.surf = pg.display.set_mode((self.size["w"],
+                                         self.size["h"]))
+
+    def update(self):
+        '''
+        Функция, которая перерисовывате экран
+        (делает заливку bg_color и поочереди отрисовывает
+        все обЪекты, содержащиеся в списке для отрисовки)
+        '''
+
+        super().update()
+
+        pg.display.update()
+
+
+class SubScreen(Screen):
+    '''
+    Класс подэкрана для отображения на главном экране сразу
+    нескольких сцен
+    '''
+
+    def __init__(self, pos, size, bg_color=COLORS.TRANSPARENT):
+        '''
+        Функция для инициализации подэкрана приложения
+        :param pos: словарь {x, y} с позицией левого верхнего
+                    угла подэкрана
+        :param size: словарь вида {"w", "h"}, размеры подэкрана
+        :param bg_color: цвет из COLORS, цвет заднего фона подэкрана
+                         (заливка), по умолчания он прозрачный
+        '''
+        self.pos = dict(pos)
+        super().__init__(size, bg_color)
+        self.screen = None
+
+    def move(self, pos):
+        '''
+        Функция, предвигающая подэкран в указанные координаты
+        :param pos: словарь {x, y} с координатами точки, в
+                    которую необходимо переместить левый верхний
+                    угл подэкрана
+        '''
+        self.pos = dict(pos)
+
+    def set_screen(self, screen):
+        '''
+        Функция, устанавливающая связь с экраном для
+        отрисовки
+        :param screen: объект Screen, с которым
+                              нужно установить связь
+        '''
+        self.screen = screen
+
+    def draw(self):
+        '''
+        Функция, рисующая подэкран на предустановленном экране
+        '''
+        self.update()
+        pg.draw.rect(self.surf, COLORS.BLACK,
+                     self.surf.get_rect(), 2)
+        self.screen.get_surface().blit(self.surf,
+                                       (self.pos["x"], self.pos["y"]))
+
+
+class ModelVisual(SubScreen):
+    '''
+    класс Обертки модели
+    '''
+
+    def __init__(self, scale, model, pos, size, bg_color=COLORS.BLACK):
+        '''
+        инициализация обретки
+         model - объект класса Model
+         bg_color=COLORS.BLACK - цвет фона
+         scale - масштаб
+         pos - словарь {x, y} с позицией левого верхнего
+                    угла экрана для отрисовки
+         size - размер экрана для отрисовки
+        '''
+        self.model = model
+        self.scale = scale
+        super().__init__(pos, size, bg_color)
+
+        # камера - аффинное преобразование координат модели в координаты
+        # подэкрана: screen = model * camera["scale"] + camera["offset"]
+        self.camera = None
+        self.default_camera()
+
+        # координаты, которые рисуются вместо координат модели
+        # (например, при просмотре истории модели), по умолчанию нет
+        self.preview = None
+
+        # подпись в углу подэкрана (например, частота шагов модели)
+        # и блокировка, захватываемая на время отрисовки, если модель
+        # продвигается в другом потоке, по умолчанию нет
+        self.caption = None
+        self.caption_font = None
+        self.lock = None
+
+        # номер выбранного мышью объекта модели (None - не выбран)
+        self.selected = None
+
+        self.particle_colors = None
+        self.reset_objects()
+
+        self.model.add_compact_listener(self.compact)
+        self.model.add_restore_listener(self.reset_objects)
+
+    def reset_objects(self):
+        '''
+        Функция, заново создающая спрайты и цвета частиц по
+        объектам модели (например, после ее восстановления из снимка)
+        '''
+
+        # массивные объекты рисуются спрайтами, а пробные частицы -
+        # точками сразу все вместе
+        self.to_draw_list = []
+        objs = self.model.get_link()
+        for color in objs.color[:objs.n_massive]:
+            new_sprite = Sprite(color)
+            new_sprite.set_screen(self)
+            self.add_obj(new_sprite)
+
+        self.particle_colors = np.array([color[:3] for color
+                                         in objs.color[objs.n_massive:]],
+                                        dtype=np.uint8).reshape(-1, 3)
+
+        if self.selected is not None and self.selected >= len(objs):
+            self.selected = None
+
+    def update(self):
+        '''
+        Функция, которая перерисовывает подэкран: переводит координаты
+        всех объектов модели в координаты подэкрана за одну векторную
+        операцию и отрисовывает только видимые спрайты и частицы
+        '''
+
+        with self.lock or contextlib.nullcontext():
+            self.draw_model()
+
+        if self.caption is not None:
+            if self.caption_font is None:
+                self.caption_font = pg.font.Font(None, CAPTION_SIZE)
+            text = self.caption_font.render(self.caption, True,
+                                            COLORS.WHITE[0])
+            self.surf.blit(text, (5, 5))
+
+    def draw_model(self):
+        '''
+        Функция, отрисовывающая объекты модели на подэкране
+        '''
+
+        self.surf.fill(self.bg_color)
+
+        n_sprites = len(self.to_draw_list)
+        positions = self.model.get_positions()
+        if self.preview is not None and len(self.preview) == len(positions):
+            positions = self.preview
+        all_pos = self.to_screen(positions)
+        self.draw_particles(all_pos[n_sprites:])
+
+        screen_pos = all_pos[:n_sprites]
+        visible = ((screen_pos[:, 0] > -MAX_SPRITE_R) &
+                   (screen_pos[:, 0] < self.size["w"] + MAX_SPRITE_R) &
+                   (screen_pos[:, 1] > -MAX_SPRITE_R) &
+                   (screen_pos[:, 1] < self.size["h"] + MAX_SPRITE_R))
+
+        indices = np.nonzero(visible)[0]
+        coords = screen_pos[indices].astype(int).tolist()
+        radii = self.model.get_link().r[indices].astype(int).tolist()
+        for i, (x, y), r in zip(indices.tolist(), coords, radii):
+            self.to_draw_list[i].draw(x, y, r)
+
+        self.draw_selection(all_pos)
+
+    def draw_selection(self, screen_pos):
+        '''
+        Функция, обводящая выбранный объект окружностью
+        :param screen_pos: массив numpy размера (N, 2) с координатами
+                           объектов на подэкране
+        '''
+
+        if self.selected is None:
+            return
+
+        r = int(self.model.get_link().r[self.selected]) \
+            if self.selected < len(self.to_draw_list) else 0
+        x, y = screen_pos[self.selected]
+        pg.draw.circle(self.surf, COLORS.WHITE[0], (int(x), int(y)),
+                       r + PICK_RADIUS, 1)
+
+    def draw_particles(self, screen_pos):
+        '''
+        Функция, рисующая пробные частицы точками за одну
+        векторную операцию
+        :param screen_pos: массив numpy размера (N, 2) с координатами
+                           частиц на подэкране
+        '''
+
+        if len(screen_pos) == 0:
+            return
+
+        inside = ((screen_pos[:, 0] >= 0) &
+                  (screen_pos[:, 0] < self.size["w"]) &
+                  (screen_pos[:, 1] >= 0) &
+                  (screen_pos[:, 1] < self.size["h"]))
+        coords = screen_pos[inside].astype(int)
+
+        pixels = pg.surfarray.pixels3d(self.surf)
+        pixels[coords[:, 0], coords[:, 1]] = self.particle_colors[inside]
+        del pixels
+
+    def compact(self, keep):
+        '''
+        Функция, удаляющая спрайты объектов, удаленных из модели
+        :param keep: булев массив оставшихся объектов модели
+        '''
+
+        if self.selected is not None:
+            self.selected = int(keep[:self.selected].sum()) \
+                if keep[self.selected] else None
+
+        keep_sprites = keep[:len(self.to_draw_list)]
+        self.to_draw_list = [sprite for sprite, kept
+                             in zip(self.to_draw_list, keep_sprites) if kept]
+        self.particle_colors = self.particle_colors[
+            keep[len(keep_sprites):]]
+
+    def pick(self, x, y):
+        '''
+        Функция, выбирающая объект под точкой подэкрана (спрайты
+        выбираются по их нарисованному радиусу, частицы - по точке)
+        Возвращает номер выбранного объекта или None, если под точкой
+        объектов нет
+        :param x: горизонтальная координата точки на подэкране
+        :param y: вертикальная координата точки на подэкране
+        '''
+
+        # частицы ищутся по индексу модели рядом с точкой, а спрайты
+        # (их не больше, чем рисуется за кадр) проверяются все
+        n_sprites = len(self.to_draw_list)
+        objs = self.model.get_link()
+        model_x, model_y = self.to_model(x, y)
+        found = self.model.find_in_radius(model_x, model_y,
+                                          PICK_RADIUS / self.camera["scale"])
+        found = np.concatenate((np.arange(n_sprites),
+                                found[found >= n_sprites]))
+
+        screen_pos = self.to_screen(objs.absolute(objs.pos[found]))
+        radii = np.where(found < n_sprites, objs.r[found], 0)
+        miss = np.hypot(screen_pos[:, 0] - x, screen_pos[:, 1] - y) - radii
+
+        # из спрайтов под курсором выбирается нарисованный последним
+        # (верхний), иначе - ближайший объект
+        self.selected = None
+        under = np.nonzero(miss <= 0)[0]
+        if len(under):
+            self.selected = int(found[under.max()])
+        elif len(found) and miss.min() <= PICK_RADIUS:
+            self.selected = int(found[np.argmin(miss)])
+
+        return self.selected
+
+    def to_screen(self, positions):
+        '''
+        Функция, переводящая координаты модели в координаты подэкрана
+        :param positions: массив numpy размера (N, 2) с координатами модели
+        '''
+
+        return positions * self.camera["scale"] + self.camera["offset"]
+
+    def to_model(self, x, y):
+        '''
+        Функция, переводящая точку подэкрана в координаты модели
+        :param x: горизонтальная координата точки на подэкране
+        :param y: вертикальная координата точки на подэкране
+        '''
+
+        return ((x - self.camera["offset"][0]) / self.camera["scale"],
+                (y - self.camera["offset"][1]) / self.camera["scale"])
+
+    def move_camera(self, offset):
+        '''
+        Функция, смещающие камеру на указанные координаты
+        :param offset: словарь {x, y} с координатами смещения
+                       камеры
+        '''
+
+        self.camera["offset"] -= (offset["x"], offset["y"])
+
+    def zoom_camera(self, zoom, center=None):
+        '''
+        Функция, приближающая камеру на указанное кол-во процентов
+        :param zoom: кол-во процентов, которое приблизится камера
+                     (например, если zoom = 10, то все рассояния
+                      увеличатся в 1.1 раз)
+        :param center: словарь {x, y} с точкой подэкрана, которая
+                       остается на месте при приближении, по умолчанию
+                       центр подэкрана
+        '''
+
+        if center is None:
+            center = {"x": self.size["w"] / 2, "y": self.size["h"] / 2}
+        center = np.array((center["x"], center["y"]))
+
+        factor = 1 + zoom / 100
+        self.camera["scale"] *= factor
+        self.camera["offset"] = center - (center - self.camera["offset"]) \
+            * factor
+
+    def default_camera(self):
+        '''
+        Функция, возвращающая камеру в дефолтное состояние
+        '''
+
+        self.camera = {"scale": self.scale, "offset": np.zeros(2)}
+
+
+class Sprite:
+    '''
+    класс изображения объекта
+    '''
+
+    def __init__(self, color):
+        '''
+        инициализация изображения
+        color - цвет объекта
+        '''
+        self.color = color
+        self.screen = None
+
+    def draw(self, x, y, r):
+        '''
+        отрисовка изображения объекта
+        x, y - координаты центра объекта на экране
+        r - радиус объекта на экране
+        '''
+        surf = self.screen.get_surface()
+        pg.draw.circle(surf, self.color, (x, y), r)
+
+    def set_screen(self, screen):
+        '''
+        Функция, устанавливающая связь с экраном для
+        отрисовки
+        :param screen: объект Screen, с которым
+                              нужно установить связь
+        '''
+        self.screen = screen
+
+
+if __name__ == "__main__":
+    print("This module is not for direct call!!!")
@@ -0,0 +1,53 @@
+# coding:utf-8
+import os
+
+import pytest
+
+from solar_system.main import solar_headless
+from solar_system.main import solar_main as s_main
+
+MODEL = os.path.join(os.path.dirname(__file__), "..", "models-data",
+                     "one_satellite.yaml")
+
+
+@pytest.fixture(autouse=True)
+def pygame_events():
+    # менеджеры общаются через очередь событий pygame
+    s_main.init_pygame()
+    yield
+    s_main.pg.event.clear()
+
+
+def make_manager(path):
+    model_manager = s_main.ModelManager(s_main.MODEL_POS, s_main.MODEL_SIZE)
+    model_manager.load_now(path)
+    return model_manager
+
+
+def test_checkpoint_resumes_model_time(tmp_path):
+    model_manager = make_manager(MODEL)
+    solar_headless.run(model_manager, 2 * s_main.YEAR, 86400.0)
+    time = model_manager.model.time
+
+    path = str(tmp_path / "checkpoint.yaml")
+    model_manager.saver.save(model_manager.model,
+                             model_manager.get_header(), path)
+    model_manager.saver.flush()
+
+    resumed = make_manager(path)
+    assert resumed.model.time == time
+    assert resumed.timeline.get_start_time() == time
+    assert resumed.stopwatch.get_time() == time
+    assert resumed.get_header()["Time"] == time
+
+    # продолжение сохранения совпадает с продолжением исходной модели
+    solar_headless.run(model_manager, 3 * s_main.YEAR, 86400.0)
+    solar_headless.run(resumed, 3 * s_main.YEAR, 86400.0)
+    assert resumed.model.time == model_manager.model.time
+    assert resumed.model.get_digest() == model_manager.model.get_digest()
+
+
+def test_fresh_model_starts_at_zero():
+    model_manager = make_manager(MODEL)
+    assert model_manager.model.time == 0
+    assert "Time" not in model_manager.get_header()
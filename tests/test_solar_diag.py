@@ -0,0 +1,58 @@
+# coding:utf-8
+import numpy as np
+
+from solar_system.model import solar_diag
+
+
+def measure(diagnostics, time, drift):
+    # уход энергии одного покоящегося объекта задается потенциалом
+    return diagnostics.measure(time, np.ones(1), np.zeros((1, 2)),
+                               np.zeros((1, 2)), -1 - drift)
+
+
+def test_measure_reports_relative_drift():
+    diagnostics = solar_diag.Diagnostics()
+    measure(diagnostics, 0, 0)
+    sample = measure(diagnostics, 1, 0.25)
+    assert sample["energy drift"] == -0.25
+    assert sample["momentum drift"] == 0
+
+
+def test_alert_fires_once_while_drift_oscillates():
+    diagnostics = solar_diag.Diagnostics(threshold=1e-3)
+    alerts = []
+    diagnostics.add_alert_listener(alerts.append)
+
+    measure(diagnostics, 0, 0)
+    drifts = 1e-3 * (1 + 0.9 * np.sin(np.arange(1, 1000)))
+    for time, drift in enumerate(drifts, 1):
+        measure(diagnostics, time, drift)
+    assert len(alerts) == 1 and alerts[0]["time"] == 1
+
+
+def test_alert_fires_again_when_drift_keeps_growing():
+    diagnostics = solar_diag.Diagnostics(threshold=1e-3)
+    alerts = []
+    diagnostics.add_alert_listener(alerts.append)
+
+    drifts = (0, 2e-3, 0, 3e-3, 5e-3, 1e-4, 3e-2)
+    for time, drift in enumerate(drifts):
+        measure(diagnostics, time, drift)
+        assert diagnostics.alarm == (drift > 1e-3)
+    assert [sample["time"] for sample in alerts] == [1, 4, 6]
+
+
+def test_rebase_restarts_from_next_measurement():
+    diagnostics = solar_diag.Diagnostics(threshold=1e-3)
+    measure(diagnostics, 0, 0)
+    measure(diagnostics, 1, 0.5)
+    assert diagnostics.alarm
+
+    diagnostics.rebase()
+    assert not diagnostics.alarm
+    alerts = []
+    diagnostics.add_alert_listener(alerts.append)
+    measure(diagnostics, 2, 0.5)
+    assert measure(diagnostics, 3, 0.5)["energy drift"] == 0
+    measure(diagnostics, 4, 0.502)
+    assert len(alerts) == 1
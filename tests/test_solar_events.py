@@ -0,0 +1,137 @@
+# coding:utf-8
+import numpy as np
+import pytest
+
+from solar_system.model import solar_events
+from solar_system.model import solar_model
+
+
+def make_model(bodies, collisions="reflect"):
+    # массы так малы, что тела движутся по прямым
+    x, y, v_x, v_y, r, m = (list(column) for column in zip(*bodies))
+    model = solar_model.Model(collisions)
+    model.load_columns({"x": x, "y": y, "v_x": v_x, "v_y": v_y,
+                        "color": [[255, 255, 255]] * len(m), "r": r,
+                        "m": m, "particle": [False] * len(m),
+                        "kepler": [False] * len(m)})
+    return model
+
+
+def run_events(model, events, dt, steps):
+    detector = solar_events.EventDetector(events)
+    model.events = detector
+    for _ in range(steps):
+        model.update(dt)
+        if detector.stopped:
+            break
+    return detector
+
+
+def test_collision_time():
+    model = make_model([(0, 0, 1, 0, 1, 1e-20), (100, 0, -1, 0, 1, 1e-20)])
+    detector = run_events(model, [solar_events.Collision()], 3.0, 100)
+
+    assert detector.stopped
+    [occurrence] = detector.occurrences
+    assert occurrence["time"] == pytest.approx(49, abs=1e-8)
+    assert occurrence["bodies"] == (0, 1)
+    assert model.time == 51
+
+
+def test_approach_inside_one_step():
+    # тело проходит на 0.3 от неподвижного, и расстояние меньше 1
+    # держится лишь 0.19 с внутри шага длиной 7 с
+    model = make_model([(-1000, 0.3, 10, 0, 0.01, 1e-20),
+                        (0, 0, 0, 0, 0.01, 1e-20)])
+    detector = run_events(model, [solar_events.Approach(1.0)], 7.0, 30)
+
+    exact = (1000 - np.sqrt(1 - 0.09)) / 10
+    [occurrence] = detector.occurrences
+    assert occurrence["time"] == pytest.approx(exact, abs=1e-7)
+
+
+def test_crossing_directions():
+    model = make_model([(0, 0, 1, 0.3, 1, 1e-20),
+                        (10, 5, -1, 0, 1, 1e-20)])
+    events = [solar_events.Crossing((5, 0), (0, 1), direction=direction,
+                                    terminal=False)
+              for direction in (1, -1, 0)]
+    detector = run_events(model, events, 0.7, 20)
+
+    found = sorted((occurrence["time"], occurrence["bodies"])
+                   for occurrence in detector.occurrences)
+    expected = [(5, (0,)), (5, (0,)), (5, (1,)), (5, (1,))]
+    assert [bodies for _, bodies in found] == \
+        [bodies for _, bodies in expected]
+    for time, _ in found:
+        assert time == pytest.approx(5, abs=1e-8)
+    assert not detector.stopped
+
+
+def test_escape_from_heaviest_body():
+    model = make_model([(3, 4, 0, 0, 1, 2e-20), (13, 4, 1, 0, 1, 1e-20)])
+    detector = run_events(model, [solar_events.parse_event("escape:20")],
+                          1.5, 100)
+
+    [occurrence] = detector.occurrences
+    assert occurrence["time"] == pytest.approx(10, abs=1e-8)
+    assert occurrence["bodies"] == (0, 1)
+
+
+def test_swept_merge_reports_collision_once():
+    model = make_model([(0, 0, 1000, 0, 1, 1e-20),
+                        (100, 0, 0, 0, 1, 1e-20)], "merge")
+    model.detection = "swept"
+    detector = run_events(model, [solar_events.Collision(terminal=False)],
+                          1.0, 3)
+
+    [occurrence] = detector.occurrences
+    assert occurrence["time"] == pytest.approx(0.098)
+    assert len(model.get_link()) == 1
+
+
+def test_parse_event():
+    event = solar_events.parse_event("approach:1e9@2,1", terminal=False)
+    assert isinstance(event, solar_events.Approach)
+    assert event.distance == 1e9
+    assert event.bodies.tolist() == [1, 2] and not event.terminal
+
+    crossing = solar_events.parse_event("crossing:0,0,3,4")
+    np.testing.assert_allclose(crossing.line, [0.6, 0.8])
+
+    for spec in ("boom", "approach", "collision:1", "crossing:0,0,0,0"):
+        with pytest.raises(ValueError):
+            solar_events.parse_event(spec)
+
+
+def test_approach_pairs_match_brute_force():
+    # тела летят по прямым, так что моменты сближения известны точно
+    rng = np.random.default_rng(5)
+    n, distance, dt, steps = 400, 2.0, 0.5, 40
+    pos = rng.uniform(0, 200, (n, 2))
+    vel = rng.uniform(-2, 2, (n, 2))
+    model = make_model([(x, y, vx, vy, 0.01, 1e-20)
+                        for (x, y), (vx, vy) in zip(pos, vel)])
+    event = solar_events.Approach(distance, terminal=False)
+    detector = run_events(model, [event], dt, steps)
+
+    expected = {}
+    i, j = np.triu_indices(n, 1)
+    d, dv = pos[j] - pos[i], vel[j] - vel[i]
+    a = (dv * dv).sum(axis=1)
+    b = (d * dv).sum(axis=1)
+    c = (d * d).sum(axis=1) - distance ** 2
+    with np.errstate(invalid="ignore"):
+        t = (-b - np.sqrt(b * b - a * c)) / a
+    entering = (c > 0) & (t > 0) & (t <= dt * steps)
+    for pair in np.nonzero(entering)[0]:
+        expected[(int(i[pair]), int(j[pair]))] = t[pair]
+
+    found = {occurrence["bodies"]: occurrence["time"]
+             for occurrence in detector.occurrences}
+    assert len(expected) > 10
+    assert found.keys() == expected.keys()
+    for pair, time in expected.items():
+        assert found[pair] == pytest.approx(time, abs=1e-7)
+    # проверяются только близкие пары, а не все n (n - 1) / 2 пар
+    assert len(event.neighbours.pairs) < len(i) / 20
@@ -0,0 +1,102 @@
+# coding:utf-8
+import numpy as np
+import pytest
+
+from solar_system.model import solar_model
+from solar_system.model.solar_index import GridIndex
+
+
+def clouds():
+    rng = np.random.default_rng(0)
+    line = np.column_stack((np.linspace(0, 1e3, 300), np.zeros(300)))
+    yield "uniform", rng.uniform(-1e3, 1e3, (500, 2))
+    yield "clustered", np.vstack(([0, 100], [100, 0],
+                                  50 + rng.normal(0, 1, (40, 2))))
+    yield "line", line
+    yield "duplicates", np.repeat(rng.uniform(0, 10, (20, 2)), 3, axis=0)
+    yield "single", np.array([[5.0, -5.0]])
+    yield "wide", np.vstack((rng.normal(0, 1, (200, 2)), [[1e12, 1e12]]))
+
+
+CLOUDS = dict(clouds())
+
+
+def queries(points, rng):
+    low, high = points.min(axis=0), points.max(axis=0)
+    span = np.maximum(high - low, 1)
+    inside = rng.uniform(low - 0.1 * span, high + 0.1 * span, (100, 2))
+    far = rng.uniform(-1e3, 1e3, (20, 2)) * span + (low + high) / 2
+    return np.vstack((inside, far, points[:5], [[1e5, 1e5], [-1e15, 0]]))
+
+
+def brute_distances(points, x, y):
+    return np.hypot(points[:, 0] - x, points[:, 1] - y)
+
+
+@pytest.mark.parametrize("name", CLOUDS)
+def test_nearest_matches_brute_force(name):
+    points = CLOUDS[name]
+    index = GridIndex(points)
+    for x, y in queries(points, np.random.default_rng(1)):
+        found = index.nearest(x, y)
+        distance = brute_distances(points, x, y)
+        assert distance[found] == distance.min()
+
+
+@pytest.mark.parametrize("name", CLOUDS)
+def test_in_radius_matches_brute_force(name):
+    points = CLOUDS[name]
+    index = GridIndex(points)
+    rng = np.random.default_rng(2)
+    span = np.ptp(points, axis=0).max() or 1
+    for x, y in queries(points, rng):
+        radius = rng.uniform(0, 0.3) * span
+        distance = brute_distances(points, x, y)
+        found = index.in_radius(x, y, radius)
+
+        assert sorted(found.tolist()) == \
+            np.nonzero(distance <= radius)[0].tolist()
+        assert np.all(np.diff(distance[found]) >= 0)
+
+        nearest = index.nearest(x, y, max_distance=radius)
+        if len(found):
+            assert distance[nearest] == distance.min()
+        else:
+            assert nearest is None
+
+
+@pytest.mark.parametrize("name", CLOUDS)
+def test_in_rect_matches_brute_force(name):
+    points = CLOUDS[name]
+    index = GridIndex(points)
+    rng = np.random.default_rng(3)
+    for (x0, y0), (x1, y1) in zip(queries(points, rng),
+                                  queries(points, rng)):
+        inside = (np.minimum(x0, x1) <= points[:, 0]) & \
+            (points[:, 0] <= np.maximum(x0, x1)) & \
+            (np.minimum(y0, y1) <= points[:, 1]) & \
+            (points[:, 1] <= np.maximum(y0, y1))
+        assert index.in_rect(x0, y0, x1, y1).tolist() == \
+            np.nonzero(inside)[0].tolist()
+
+
+def test_empty_index():
+    index = GridIndex(np.zeros((0, 2)))
+    assert index.nearest(0, 0) is None
+    assert len(index.in_radius(0, 0, 1)) == 0
+    assert len(index.in_rect(-1, -1, 1, 1)) == 0
+
+
+def test_model_find_nearest_outside_bodies():
+    model = solar_model.Model()
+    points = CLOUDS["clustered"]
+    n = len(points)
+    model.load_columns({"x": points[:, 0], "y": points[:, 1],
+                        "v_x": np.zeros(n), "v_y": np.zeros(n),
+                        "color": [[255, 255, 255]] * n,
+                        "r": np.full(n, 1e-3), "m": np.ones(n),
+                        "particle": [False] * n, "kepler": [False] * n})
+
+    distance = brute_distances(points, 1e5, 1e5)
+    assert distance[model.find_nearest(1e5, 1e5)] == distance.min()
+    assert model.find_nearest(1e5, 1e5, max_distance=10) is None
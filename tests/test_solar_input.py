@@ -0,0 +1,77 @@
+# coding:utf-8
+import glob
+import math
+import os
+
+import pytest
+
+from solar_system.input import solar_input
+
+MODELS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..",
+                                       "models-data", "*.yaml")))
+
+OBJECTS = [
+           {"x": 1.5e11, "y": -2, "v_x": 0.0, "v_y": 1e-300,
+            "color": [255, 0, 0], "r": 2, "m": 6e24},
+           {"x": 1e20, "y": float("inf"), "v_x": -0.5, "v_y": 3,
+            "color": [0, 0, 255], "r": 1.5, "m": 0.0, "particle": True},
+           {"x": 0, "y": 0, "v_x": 0, "v_y": 0, "color": [1, 2, 3],
+            "r": 1, "m": 2e30, "kepler": True}
+          ]
+
+
+def to_columns(objects):
+    return {key: [obj.get(key, False) for obj in objects]
+            for key in solar_input.OBJECT_NUMBERS +
+            solar_input.OBJECT_FLAGS + ("color",)}
+
+
+def as_lists(columns):
+    return {key: list(column) for key, column in columns.items()}
+
+
+@pytest.mark.parametrize("path", MODELS)
+def test_stream_reader_matches_reference(path):
+    data = solar_input.read_data_from_file(path)
+    header, columns = solar_input.read_model_stream(path)
+
+    assert header == {key: value for key, value in data.items()
+                      if key != "Objects"}
+    assert as_lists(columns) == to_columns(data["Objects"])
+
+
+@pytest.mark.parametrize("name", ("model.yaml", "model.jsonl"))
+def test_stream_writer_round_trip(tmp_path, name):
+    path = str(tmp_path / name)
+    header = {"Time scale": 8760, "Softening": 1e9}
+    solar_input.write_model_stream(path, header, iter(OBJECTS))
+
+    read_header, columns = solar_input.read_model_stream(path)
+    assert read_header == header
+    assert as_lists(columns) == to_columns(OBJECTS)
+    if name.endswith(".yaml"):
+        assert solar_input.read_data_from_file(path) == \
+            dict(header, Objects=OBJECTS)
+
+
+def test_reference_writer_output_reads_back(tmp_path):
+    path = str(tmp_path / "model.yaml")
+    solar_input.write_data_to_file(path, {"Time scale": 1,
+                                          "Objects": OBJECTS})
+    header, columns = solar_input.read_model_stream(path)
+    assert header == {"Time scale": 1}
+    assert as_lists(columns) == to_columns(OBJECTS)
+
+
+def test_yaml_value_keeps_special_floats():
+    assert solar_input.yaml_value(1e20) == "1.0e+20"
+    assert solar_input.yaml_value(float("-inf")) == "-.inf"
+    assert solar_input.yaml_value(math.nan) == ".nan"
+    assert solar_input.yaml_value([1, 2.5, True]) == "[1, 2.5, true]"
+
+
+def test_empty_object_list(tmp_path):
+    path = str(tmp_path / "empty.yaml")
+    solar_input.write_model_stream(path, {}, iter(()))
+    assert solar_input.read_data_from_file(path) == {"Objects": []}
+    assert solar_input.read_model_stream(path)[1]["color"] == []
@@ -0,0 +1,110 @@
+# coding:utf-8
+import numpy as np
+
+from solar_system.model import solar_kepler
+from solar_system.model import solar_model
+from solar_system.model.solar_obj import Objects
+
+MU = 1.32712e20
+AU = 1.496e11
+
+
+def rk4(pos, vel, mu, dt, steps):
+    def derivative(state):
+        r = state[:2]
+        return np.concatenate((state[2:], -mu * r / np.hypot(*r) ** 3))
+
+    state = np.concatenate((pos, vel))
+    h = dt / steps
+    for _ in range(steps):
+        k1 = derivative(state)
+        k2 = derivative(state + h / 2 * k1)
+        k3 = derivative(state + h / 2 * k2)
+        k4 = derivative(state + h * k3)
+        state = state + h / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+    return state[:2], state[2:]
+
+
+def periapsis_state(a, e, angle=0.0):
+    # тело в перицентре орбиты, повернутой на angle
+    r = a * (1 - e)
+    v = np.sqrt(MU * (1 + e) / r)
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([r * c, r * s]), np.array([-v * s, v * c])
+
+
+def test_solve_kepler_satisfies_equation():
+    rng = np.random.default_rng(0)
+    mean_anomaly = rng.uniform(0, 2 * np.pi, 10000)
+    e = rng.uniform(0, 0.99, 10000)
+    anomaly = solar_kepler.solve_kepler(mean_anomaly, e)
+    np.testing.assert_allclose(anomaly - e * np.sin(anomaly),
+                               mean_anomaly, atol=1e-10)
+
+
+def test_state_to_elements_of_known_orbit():
+    pos, vel = periapsis_state(AU, 0.3, angle=1.0)
+    elements = solar_kepler.state_to_elements(pos, vel, np.float64(MU))
+
+    np.testing.assert_allclose(elements["a"], AU, rtol=1e-12)
+    np.testing.assert_allclose(elements["e"], 0.3, rtol=1e-12)
+    np.testing.assert_allclose(elements["omega"], 1.0, rtol=1e-12)
+    np.testing.assert_allclose(elements["M"], 0, atol=1e-12)
+    np.testing.assert_allclose(elements["period"],
+                               2 * np.pi * np.sqrt(AU ** 3 / MU))
+
+
+def test_state_to_elements_of_unbound_orbit():
+    pos, vel = periapsis_state(AU, 0.3)
+    elements = solar_kepler.state_to_elements(pos, 2 * vel, np.float64(MU))
+    assert np.isnan(elements["a"]) and elements["e"] > 1
+
+
+def test_propagate_matches_rk4():
+    orbits = [periapsis_state(AU, e, angle)
+              for e, angle in ((0, 0), (0.3, 1), (0.8, -2))]
+    pos = np.array([orbit[0] for orbit in orbits])
+    vel = np.array([orbit[1] for orbit in orbits])
+    mu = np.full(len(pos), MU)
+
+    for dt in (86400.0, 1e7, 3.3e7):
+        new_pos, new_vel = solar_kepler.propagate(pos, vel, mu, dt)
+        for k in range(len(pos)):
+            ref_pos, ref_vel = rk4(pos[k], vel[k], MU, dt, 20000)
+            np.testing.assert_allclose(new_pos[k], ref_pos, rtol=0,
+                                       atol=1e-8 * AU)
+            np.testing.assert_allclose(new_vel[k], ref_vel, rtol=0,
+                                       atol=1e-8 * np.hypot(*vel[k]))
+
+
+def test_propagate_over_many_periods():
+    pos, vel = periapsis_state(AU, 0.5)
+    period = 2 * np.pi * np.sqrt(AU ** 3 / MU)
+    new_pos, new_vel = solar_kepler.propagate(
+        pos[np.newaxis], vel[np.newaxis], np.array([MU]), 1000 * period)
+    np.testing.assert_allclose(new_pos[0], pos, atol=1e-6 * AU)
+    np.testing.assert_allclose(new_vel[0], vel,
+                               atol=1e-6 * np.hypot(*vel))
+
+
+def test_kepler_mode_conserves_momentum():
+    sun = Objects.grav_constant * 2e30
+    bodies = [(0, 0, 0, 0, 2e30)]
+    for a, m in ((AU, 6e24), (5.2 * AU, 1.9e27), (9.5 * AU, 5.7e26)):
+        v = np.sqrt(sun / a)
+        bodies.append((a, 0, 0, v, m))
+    x, y, v_x, v_y, m = map(list, zip(*bodies))
+
+    model = solar_model.Model(propagation="kepler")
+    model.load_columns({"x": x, "y": y, "v_x": v_x, "v_y": v_y,
+                        "color": [[255, 255, 255]] * 4, "r": [1] * 4,
+                        "m": m, "particle": [False] * 4,
+                        "kepler": [False] * 4})
+    objs = model.get_link()
+    assert objs.analytic[1:].all()
+
+    momentum = objs.m @ objs.vel
+    scale = objs.m @ np.hypot(*objs.vel.T)
+    for _ in range(2000):
+        model.update(86400)
+    assert np.hypot(*(objs.m @ objs.vel - momentum)) < 1e-9 * scale
@@ -0,0 +1,105 @@
+# coding:utf-8
+import os
+import sys
+
+import pytest
+
+from solar_system.main import solar_headless
+from solar_system.main import solar_main as s_main
+
+MODEL = os.path.join(os.path.dirname(__file__), "..", "models-data",
+                     "one_satellite.yaml")
+
+
+@pytest.fixture(autouse=True)
+def pygame_events():
+    # менеджеры общаются через очередь событий pygame
+    s_main.init_pygame()
+    s_main.pg.event.clear()
+    yield
+    s_main.pg.event.clear()
+
+
+def posted(event_type):
+    return [event for event in s_main.pg.event.get()
+            if event.type == event_type]
+
+
+def test_failed_load_reaches_ui(tmp_path):
+    path = tmp_path / "broken.yaml"
+    path.write_text("Objects: [")
+    model_manager = s_main.ModelManager(s_main.MODEL_POS, s_main.MODEL_SIZE)
+
+    error = model_manager.load_now(str(path))
+
+    assert error.startswith(f"Failed to load {path}: ")
+    [finished] = posted(s_main.UIManager.LOADFINISHED)
+    assert not finished.loaded and finished.error == error
+    assert model_manager.model is None
+
+
+def test_headless_exits_on_failed_load(tmp_path, monkeypatch):
+    path = tmp_path / "missing.yaml"
+    monkeypatch.setattr(sys, "argv", ["solar_headless", "--run", str(path)])
+
+    with pytest.raises(SystemExit) as exit_info:
+        solar_headless.main()
+
+    assert str(exit_info.value).startswith(f"Failed to load {path}")
+
+
+def test_catalog_failure_reaches_ui():
+    class BrokenCatalog:
+        def update(self):
+            raise PermissionError("models-data is not readable")
+
+    ui = s_main.UIManager(s_main.WIN_SIZE)
+    ui.catalog = BrokenCatalog()
+    s_main.pg.event.clear()
+
+    ui.update_catalog()
+    [updated] = posted(s_main.UIManager.CATALOGUPDATED)
+    assert updated.changed == 0
+    assert updated.error.startswith("Failed to update the model catalog")
+
+    # интерфейс без элементов: событие обрабатывается только самим
+    # менеджером
+    class NoGui:
+        def process_events(self, event):
+            pass
+
+        def update(self, dt):
+            pass
+
+    ui.gui_manager = NoGui()
+    ui.call(updated)
+    assert ui.catalog_error == updated.error
+    [message] = posted(s_main.UIManager.MESSAGE)
+    assert message.text == updated.error
+
+
+def test_jump_into_the_past_reaches_ui():
+    model_manager = s_main.ModelManager(s_main.MODEL_POS, s_main.MODEL_SIZE)
+    assert model_manager.load_now(MODEL) is None
+    solar_headless.run(model_manager, 2 * s_main.YEAR, 86400.0)
+    s_main.pg.event.clear()
+
+    assert not model_manager.start_jump(s_main.YEAR)
+    assert model_manager.jump_target is None
+    [message] = posted(s_main.UIManager.MESSAGE)
+    assert message.text == "Model time is already past 1y 0m"
+
+    # без перемотки модель остается на месте
+    stats = solar_headless.run(model_manager, s_main.YEAR)
+    assert stats["steps"] == 0
+
+
+def test_messages_wait_for_interface(tmp_path):
+    ui = s_main.UIManager(s_main.WIN_SIZE)
+    model_manager = s_main.ModelManager(s_main.MODEL_POS, s_main.MODEL_SIZE)
+    error = model_manager.load_now(str(tmp_path / "missing.yaml"))
+
+    for event in s_main.pg.event.get():
+        ui.call(event)
+
+    assert ui.gui_manager is None and ui.message == error
@@ -0,0 +1,81 @@
+# coding:utf-8
+import numpy as np
+import pytest
+
+from solar_system.model import solar_model
+from solar_system.model.solar_obj import Objects
+
+# двойная звезда из models-data/double_star.yaml (перицентр ~3.2e9 м)
+DOUBLE_STAR = {"x": [0.7e10, 1.7e10], "y": [1e10, 1e10],
+               "v_x": [0, 0], "v_y": [40e3, -40e3],
+               "color": [[255, 255, 255]] * 2, "r": [30, 30],
+               "m": [1e30, 1e30], "particle": [False] * 2,
+               "kepler": [False] * 2}
+
+
+def total_energy(model):
+    objs = model.get_link()
+    return 0.5 * objs.m @ (objs.vel ** 2).sum(axis=1) + \
+        objs.potential_energy()
+
+
+def run_double_star(steps, dt=20000.0, **kwargs):
+    model = solar_model.Model(**kwargs)
+    model.load_columns(DOUBLE_STAR)
+    energy = total_energy(model)
+    regularized = 0
+    for _ in range(steps):
+        model.update(dt)
+        regularized += len(model.binaries)
+    return model, abs(total_energy(model) / energy - 1), regularized
+
+
+def test_regularized_binary_conserves_energy():
+    _, drift, regularized = run_double_star(500)
+    assert regularized == 500
+    assert drift < 1e-10
+
+
+def test_softening_close_to_periapsis_disables_regularization():
+    model, _, regularized = run_double_star(50, softening=1e9)
+    assert regularized == 0
+
+
+def test_small_softening_keeps_regularization():
+    # кеплерова орбита расходится со смягченной силой на (eps / r) ** 2
+    _, drift, regularized = run_double_star(500, softening=1e7)
+    assert regularized == 500
+    assert drift < 1e-4
+
+
+@pytest.mark.parametrize("softening", (0.0, 1e9))
+def test_softened_potential_and_force(softening):
+    objs = Objects([0, 3e9], [0, 4e9], [0, 0], [0, 0], ["w"] * 2,
+                   [1, 1], [2e30, 1e30], softening=softening)
+    objs.calculate_force(potential=True)
+
+    l = np.hypot(5e9, softening)
+    grav = Objects.grav_constant
+    assert objs.potential == pytest.approx(-grav * 2e60 / l)
+    assert objs.potential_energy() == pytest.approx(-grav * 2e60 / l)
+    np.testing.assert_allclose(objs.acc[0],
+                               grav * 1e30 * np.array([3e9, 4e9]) / l ** 3)
+    np.testing.assert_allclose(objs.m @ objs.acc, 0,
+                               atol=1e-12 * objs.m @ np.hypot(*objs.acc.T))
+
+
+@pytest.mark.parametrize("detection, merged", (("overlap", False),
+                                               ("swept", True)))
+def test_swept_detection_stops_tunnelling(detection, merged):
+    # быстрый объект за один шаг пролетает сквозь неподвижный
+    model = solar_model.Model("merge", detection=detection)
+    model.load_columns({"x": [0, 100], "y": [0, 0], "v_x": [1000, 0],
+                        "v_y": [0, 0], "color": [[255, 255, 255]] * 2,
+                        "r": [1, 1], "m": [1, 1], "particle": [False] * 2,
+                        "kepler": [False] * 2})
+    model.update(1)
+
+    objs = model.get_link()
+    assert (len(objs) == 1) == merged
+    if merged:
+        np.testing.assert_allclose(objs.vel[0], [500, 0], rtol=1e-6)
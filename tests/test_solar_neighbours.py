@@ -0,0 +1,39 @@
+# coding:utf-8
+import numpy as np
+
+from solar_system.model.solar_neighbours import NeighbourList
+from solar_system.model.solar_obj import Objects
+
+
+def brute_contacts(objs):
+    i, j = np.triu_indices(len(objs), 1)
+    return objs.find_contacts(np.column_stack((i, j))).tolist()
+
+
+def test_contacts_match_brute_force_while_bodies_move():
+    rng = np.random.default_rng(5)
+    n = 300
+    objs = Objects(*rng.uniform(-200, 200, (2, n)),
+                   *rng.normal(0, 1, (2, n)), ["w"] * n,
+                   rng.uniform(0.5, 3, n), np.ones(n))
+    neighbours = NeighbourList()
+    indices = np.arange(n)
+    dt = 0.5
+
+    for step in range(300):
+        pairs = neighbours.get_pairs(objs, indices, dt)
+        assert objs.find_contacts(pairs).tolist() == brute_contacts(objs)
+
+        # скорости меняются, чтобы объекты не двигались только по прямым
+        objs.vel += rng.normal(0, 0.2, (n, 2))
+        objs.drift(dt)
+
+    metrics = neighbours.get_metrics()
+    assert 1 < metrics["builds"] < metrics["queries"]
+
+
+def test_empty_and_single_body():
+    neighbours = NeighbourList()
+    objs = Objects([0], [0], [1], [0], ["w"], [1], [1])
+    assert len(neighbours.get_pairs(objs, np.arange(1), 1.0)) == 0
+    assert len(neighbours.get_pairs(objs, np.arange(0), 1.0)) == 0
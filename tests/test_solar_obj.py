@@ -0,0 +1,149 @@
+# coding:utf-8
+import numpy as np
+import pytest
+
+from solar_system.model.solar_obj import Objects
+
+
+def make_objects(pos, vel, r, m, **kwargs):
+    pos = np.asarray(pos, dtype=float)
+    vel = np.asarray(vel, dtype=float)
+    return Objects(pos[:, 0], pos[:, 1], vel[:, 0], vel[:, 1],
+                   ["white"] * len(m), r, m, **kwargs)
+
+
+def random_objects(n, seed):
+    rng = np.random.default_rng(seed)
+    return make_objects(rng.uniform(-10, 10, (n, 2)),
+                        rng.normal(0, 1, (n, 2)),
+                        rng.uniform(0.5, 2, n), rng.uniform(1, 100, n))
+
+
+def totals(objs):
+    m = objs.m
+    pos = objs.get_positions()
+    return {"mass": m.sum(),
+            "momentum": m @ objs.vel,
+            "center": m @ pos / m.sum(),
+            "volume": (objs.r ** 3).sum()}
+
+
+def test_merge_conserves_mass_momentum_and_volume():
+    for seed in range(20):
+        objs = random_objects(40, seed)
+        before = totals(objs)
+        contacts = objs.calculate_force()
+        assert len(contacts)
+
+        keep = objs.merge(contacts)
+        after = totals(objs)
+        assert len(objs) == keep.sum() < len(keep)
+        for key, value in before.items():
+            np.testing.assert_allclose(after[key], value, rtol=1e-12,
+                                       atol=1e-9)
+
+
+def test_merge_joins_chains_into_one_body():
+    objs = make_objects([[0, 0], [1.5, 0], [3, 0], [50, 0]],
+                        [[1, 0], [0, 0], [0, 2], [0, 0]],
+                        [1, 1, 1, 1], [1, 3, 2, 5])
+    keep = objs.merge(objs.calculate_force())
+
+    assert keep.tolist() == [False, True, False, True]
+    assert objs.m.tolist() == [6, 5]
+    np.testing.assert_allclose(objs.vel[0], [1 / 6, 4 / 6])
+    np.testing.assert_allclose(objs.pos[0], [(4.5 + 6) / 6, 0])
+    np.testing.assert_allclose(objs.r[0], 3 ** (1 / 3))
+
+
+def test_merge_without_contacts_keeps_objects():
+    objs = random_objects(5, 0)
+    assert objs.merge(np.zeros((0, 2), dtype=int)) is None
+    assert len(objs) == 5
+
+
+def test_merge_keeps_particles_after_massive_bodies():
+    objs = make_objects([[0, 0], [1, 0], [100, 0], [5, 5]],
+                        np.zeros((4, 2)), [1, 1, 1, 1], [2, 1, 1, 0],
+                        particle=[False, False, False, True])
+    objs.merge(np.array([[0, 1]]))
+
+    assert objs.n_massive == 2
+    assert objs.is_particle().tolist() == [False, False, True]
+
+
+def test_reflect_conserves_kinetic_energy():
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        objs = random_objects(30, rng.integers(1000))
+        energy = 0.5 * objs.m @ (objs.vel ** 2).sum(axis=1)
+        objs.reflect(objs.calculate_force())
+        np.testing.assert_allclose(
+            0.5 * objs.m @ (objs.vel ** 2).sum(axis=1), energy, rtol=1e-12)
+
+
+def test_reflect_head_on_conserves_momentum():
+    # в системе центра масс лобовой удар обращает обе скорости
+    objs = make_objects([[0, 0], [1.9, 0]], [[2, 1], [-1, 3]],
+                        [1, 1], [1, 2])
+    momentum = objs.m @ objs.vel
+    objs.reflect(objs.calculate_force())
+
+    np.testing.assert_allclose(objs.vel, [[-2, 1], [1, 3]])
+    np.testing.assert_allclose(objs.m @ objs.vel, momentum)
+
+
+def test_reflect_ignores_bodies_moving_the_same_way():
+    objs = make_objects([[0, 0], [1.9, 0]], [[2, 0], [1, 1]],
+                        [1, 1], [1, 1])
+    objs.reflect(objs.calculate_force())
+    np.testing.assert_allclose(objs.vel, [[2, 0], [1, 1]])
+
+
+def test_first_contact_time_of_head_on_pair():
+    objs = make_objects([[0, 0], [10, 0], [0, 50]],
+                        [[1, 0], [-1, 0], [0, 0]], [1, 1, 1], [1, 1, 1])
+    time, pairs = objs.first_contacts(np.arange(3), 10)
+    assert time == pytest.approx(4)
+    assert pairs.tolist() == [[0, 1]]
+
+    # касание позже шага, удаляющиеся и уже касающиеся пары не учитываются
+    assert objs.first_contacts(np.arange(3), 3.9)[0] is None
+    objs.vel[:2] *= -1
+    assert objs.first_contacts(np.arange(3), 100)[0] is None
+    objs.pos[1] = [1.5, 0]
+    objs.vel[:2] *= -1
+    assert objs.first_contacts(np.arange(3), 100)[0] is None
+
+
+def test_first_contacts_match_brute_force():
+    rng = np.random.default_rng(4)
+    for _ in range(20):
+        objs = random_objects(60, rng.integers(1000))
+        objs.pos *= 20
+        objs.vel *= 40
+        indices = np.arange(len(objs))
+        if len(objs.calculate_force()):
+            continue
+        dt = 1.0
+        time, pairs = objs.first_contacts(indices, dt)
+
+        i, j = np.triu_indices(len(objs), 1)
+        candidates = np.column_stack((i, j))
+        same_time, same_pairs = objs.first_contacts(indices, dt,
+                                                    pairs=candidates)
+        assert same_time == time
+        assert same_pairs.tolist() == pairs.tolist()
+
+        # до касания объекты не пересекаются, в момент касания
+        # расстояние равно сумме радиусов
+        end = dt if time is None else time
+        for t in np.linspace(0, end, 50)[:-1]:
+            pos = objs.pos + objs.vel * t
+            l = np.hypot(*(pos[j] - pos[i]).T)
+            assert np.all(l > objs.r[i] + objs.r[j])
+        if time is not None:
+            pos = objs.pos + objs.vel * time
+            a, b = pairs.T
+            np.testing.assert_allclose(np.hypot(*(pos[b] - pos[a]).T),
+                                       objs.r[a] + objs.r[b])
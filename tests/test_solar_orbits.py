@@ -0,0 +1,156 @@
+# coding:utf-8
+import json
+
+import numpy as np
+import pytest
+
+from solar_system.input import solar_trajectory
+from solar_system.model import solar_kepler
+from solar_system.model import solar_orbits
+from solar_system.model.solar_obj import Objects
+
+AU = 1.496e11
+M = np.array([1.989e30, 5.97e24, 1.9e27])
+
+
+def orbit_state(a, e, angle, m, retrograde=False):
+    # тело в перицентре орбиты, повернутой на angle
+    mu = Objects.grav_constant * (M[0] + m)
+    r = a * (1 - e)
+    v = np.sqrt(mu * (1 + e) / r) * (-1 if retrograde else 1)
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([r * c, r * s]), np.array([-v * s, v * c])
+
+
+def kepler_series(times, orbits):
+    # кадры точного кеплерова движения тел вокруг неподвижного
+    # центрального тела, сдвинутого от начала координат
+    center = np.array([3e10, -2e10])
+    pos = np.zeros((len(times), len(M), 2)) + center
+    vel = np.zeros((len(times), len(M), 2))
+    for body, (a, e, angle, retrograde) in enumerate(orbits, 1):
+        r0, v0 = orbit_state(a, e, angle, M[body], retrograde)
+        mu = np.full(len(times), Objects.grav_constant * (M[0] + M[body]))
+        r, v = solar_kepler.propagate(np.tile(r0, (len(times), 1)),
+                                      np.tile(v0, (len(times), 1)),
+                                      mu, times)
+        pos[:, body] += r
+        vel[:, body] = v
+    return pos, vel
+
+
+def test_relative_elements_of_known_orbits():
+    orbits = [(AU, 0.0, 0.7, False), (5 * AU, 0.5, -2.0, True)]
+    pos, vel = kepler_series(np.array([0.0]), orbits)
+    elements = solar_orbits.relative_elements(pos[0], vel[0], M)
+
+    for key in ("a", "e", "omega", "longitude", "h"):
+        assert np.isnan(elements[key][0])
+    np.testing.assert_allclose(elements["a"][1:], [AU, 5 * AU], rtol=1e-12)
+    np.testing.assert_allclose(elements["e"][1:], [0, 0.5], atol=1e-12)
+    assert elements["omega"][2] == pytest.approx(-2.0)
+    assert elements["longitude"][1] == pytest.approx(0.7)
+    assert elements["M"][2] == pytest.approx(0, abs=1e-12)
+    assert elements["h"][1] > 0 > elements["h"][2]
+
+    # к скоростям всех тел добавлена скорость центрального тела
+    drift = vel[0] + [1e4, 3e3]
+    moved = solar_orbits.relative_elements(pos[0], drift, M)
+    np.testing.assert_allclose(moved["a"][1:], elements["a"][1:])
+
+    # тело, разогнанное до второй космической скорости
+    vel[0, 1] *= 1.5
+    unbound = solar_orbits.relative_elements(pos[0], vel[0], M)
+    assert np.isnan(unbound["a"][1]) and unbound["e"][1] > 1
+
+
+def test_relative_elements_of_frames():
+    times = np.linspace(0, 3e8, 50)
+    pos, vel = kepler_series(times, [(AU, 0.1, 0, False),
+                                     (3 * AU, 0.3, 1, False)])
+    frames = solar_orbits.relative_elements(pos, vel, M, primary=0)
+
+    assert frames["a"].shape == (50, 3)
+    for frame in (0, 17, 49):
+        single = solar_orbits.relative_elements(pos[frame], vel[frame], M)
+        for key, values in single.items():
+            np.testing.assert_allclose(frames[key][frame], values)
+
+
+def test_analyze_series_periods():
+    orbits = [(AU, 0.2, 0.3, False), (2 * AU, 0.5, -1.0, True)]
+    periods = [2 * np.pi * np.sqrt(a ** 3 / (Objects.grav_constant *
+                                             (M[0] + M[body])))
+               for body, (a, _, _, _) in enumerate(orbits, 1)]
+    times = np.arange(0, 40 * periods[1], periods[0] / 2000)
+    pos, vel = kepler_series(times, orbits)
+
+    result = solar_orbits.analyze_series(times, pos, vel, M)
+
+    assert np.isnan(result["period"][0]) and result["frames"][0] == 0
+    np.testing.assert_allclose(result["period"][1:], periods, rtol=1e-3)
+    np.testing.assert_allclose(result["anomalistic period"][1:], periods,
+                               rtol=1e-9)
+    np.testing.assert_allclose(result["a"][1:], [AU, 2 * AU], rtol=1e-9)
+    np.testing.assert_allclose(result["e"][1:], [0.2, 0.5], atol=1e-9)
+    assert abs(result["precession"][2]) < 1e-6 * 2 * np.pi / periods[1]
+    assert result["direction"][1:].tolist() == [1, -1]
+    assert result["frames"][1:].tolist() == [len(times)] * 2
+
+    # результат не зависит от деления кадров на части
+    analysis = solar_orbits.OrbitAnalysis(M)
+    for part in np.array_split(np.arange(len(times)), 7):
+        analysis.add(times[part], pos[part], vel[part])
+    for key, values in analysis.result().items():
+        np.testing.assert_allclose(values, result[key], rtol=1e-9,
+                                   atol=1e-20)
+
+
+def test_analyze_trajectory_from_positions(tmp_path):
+    orbits = [(AU, 0.1, 0.0, False), (1.5 * AU, 0.3, 2.0, False)]
+    period = 2 * np.pi * np.sqrt(AU ** 3 / (Objects.grav_constant *
+                                            (M[0] + M[1])))
+    times = np.arange(0, 10 * period, period / 1000)
+    pos, _ = kepler_series(times, orbits)
+
+    path = str(tmp_path / "trajectory.bin")
+    header = json.dumps({"bodies": len(M), "every": 1,
+                         "m": M.tolist()}).encode()
+    with open(path, 'wb') as file:
+        file.write((solar_trajectory.MAGIC +
+                    header).ljust(solar_trajectory.HEADER_SIZE))
+        file.write(np.column_stack((times, pos.reshape(len(times), -1)))
+                   .tobytes())
+
+    shares = []
+    result = solar_orbits.analyze_trajectory(
+        solar_trajectory.Trajectory(path), progress=shares.append)
+
+    assert result["anomalistic period"][1] == pytest.approx(period,
+                                                             rel=1e-4)
+    assert result["a"][1] == pytest.approx(AU, rel=1e-4)
+    assert shares[-1] == 1
+
+
+def test_unwrap_skips_gaps_across_parts():
+    rng = np.random.default_rng(3)
+    true = np.cumsum(rng.uniform(-1, 1, (300, 4)), axis=0)
+    angles = np.angle(np.exp(1j * true))
+    angles[40:90, 1] = np.nan
+    angles[:120, 2] = np.nan
+    angles[200:, 3] = np.nan
+
+    previous = np.full(4, np.nan)
+    parts = []
+    for part in np.array_split(angles, 9):
+        unwrapped, previous = solar_orbits.unwrap(part, previous)
+        parts.append(unwrapped)
+    unwrapped = np.concatenate(parts)
+
+    valid = ~np.isnan(angles)
+    assert np.array_equal(valid, ~np.isnan(unwrapped))
+    for body in range(4):
+        start = np.flatnonzero(valid[:, body])[0]
+        offset = true[start, body] - unwrapped[start, body]
+        np.testing.assert_allclose(unwrapped[valid[:, body], body] + offset,
+                                   true[valid[:, body], body], atol=1e-9)
@@ -0,0 +1,53 @@
+# coding:utf-8
+import io
+import socket
+
+import numpy as np
+import pytest
+
+from solar_system.input import solar_server
+
+
+def test_frame_round_trip():
+    state = np.arange(12, dtype=float).reshape(3, 4)
+    frame = {"step": 7, "time": 1.5, "state": state}
+    data = solar_server.encode_frame(frame, np.array([2, 0, 5]))
+
+    decoded = solar_server.read_frame(io.BytesIO(data))
+    assert decoded["step"] == 7 and decoded["time"] == 1.5
+    assert decoded["indices"].tolist() == [2, 0]
+    np.testing.assert_array_equal(decoded["pos"], state[[2, 0], :2])
+    np.testing.assert_array_equal(decoded["vel"], state[[2, 0], 2:])
+    assert solar_server.read_frame(io.BytesIO(data[:-1])) is None
+
+
+def test_parse_address():
+    assert solar_server.parse_address("unix:/tmp/s") == ("unix", "/tmp/s")
+    assert solar_server.parse_address("9000") == \
+        ("tcp", ("127.0.0.1", 9000))
+    assert solar_server.parse_address("0.0.0.0:80") == \
+        ("tcp", ("0.0.0.0", 80))
+
+
+def test_unix_server_keeps_regular_file(tmp_path):
+    path = tmp_path / "model.yaml"
+    path.write_text("Objects: []\n")
+
+    with pytest.raises(FileExistsError):
+        solar_server.StateServer(f"unix:{path}")
+    assert path.read_text() == "Objects: []\n"
+
+
+def test_unix_server_replaces_stale_socket(tmp_path):
+    path = str(tmp_path / "state.sock")
+    stale = socket.socket(socket.AF_UNIX)
+    stale.bind(path)
+    stale.close()
+    assert solar_server.is_socket(path)
+
+    server = solar_server.StateServer(f"unix:{path}")
+    client = socket.socket(socket.AF_UNIX)
+    client.connect(path)
+    client.close()
+    server.close()
+    assert not solar_server.is_socket(path)
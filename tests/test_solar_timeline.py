@@ -0,0 +1,90 @@
+# coding:utf-8
+import numpy as np
+
+from solar_system.model import solar_model
+from solar_system.model import solar_timeline
+
+DT = 86400.0
+
+
+def make_model():
+    model = solar_model.Model()
+    model.load_columns({"x": [0, 1.5e11, -7.8e11], "y": [0, 0, 0],
+                        "v_x": [0, 0, 0], "v_y": [0, 2.98e4, -1.3e4],
+                        "color": [[255, 255, 255]] * 3, "r": [1, 1, 1],
+                        "m": [2e30, 6e24, 1.9e27],
+                        "particle": [False] * 3, "kepler": [False] * 3})
+    return model
+
+
+def run(model, timeline, steps):
+    for _ in range(steps):
+        model.update(DT)
+        timeline.record(DT)
+
+
+def counted_memory(timeline):
+    return sum(block["size"] for block in timeline.blocks.values()) + \
+        len(timeline.times) * solar_timeline.STEP_SIZE
+
+
+def test_seek_replays_steps_exactly():
+    model = make_model()
+    timeline = solar_timeline.Timeline(model, keyframe_every=50,
+                                       frame_every=5)
+    digests = [model.get_digest()]
+    for _ in range(300):
+        model.update(DT)
+        timeline.record(DT)
+        digests.append(model.get_digest())
+
+    for step in (0, 1, 49, 50, 137, 300, 12):
+        assert timeline.seek(step * DT) == timeline.times[step]
+        assert model.get_digest() == digests[step]
+
+
+def test_memory_limit_covers_steps():
+    model = make_model()
+    block = 3 * 8 * 10 + 20 * 3 * 2 * 4 + 20 * solar_timeline.STEP_SIZE
+    timeline = solar_timeline.Timeline(model, keyframe_every=20,
+                                       frame_every=1,
+                                       memory_limit=5 * block)
+    run(model, timeline, 5000)
+
+    assert timeline.memory == counted_memory(timeline)
+    assert timeline.memory <= timeline.memory_limit
+    assert len(timeline.dts) <= 5 * 20
+    assert timeline.start == timeline.keyframe_steps[0]
+
+
+def test_history_starts_at_earliest_kept_keyframe():
+    model = make_model()
+    timeline = solar_timeline.Timeline(model, keyframe_every=20,
+                                       frame_every=1, memory_limit=20000)
+    run(model, timeline, 1000)
+    digest = model.get_digest()
+    start = timeline.get_start_time()
+    assert start > 0
+
+    # раньше начала истории вернуться нельзя
+    assert timeline.seek(0) == start
+    assert timeline.positions_at(start) is not None
+
+    # повторение шагов приводит к тому же состоянию
+    assert timeline.seek(timeline.get_end_time()) == 1000 * DT
+    assert model.get_digest() == digest
+
+
+def test_record_after_seek_truncates_history():
+    model = make_model()
+    timeline = solar_timeline.Timeline(model, keyframe_every=20,
+                                       frame_every=2)
+    run(model, timeline, 100)
+    timeline.seek(45 * DT)
+    run(model, timeline, 3)
+
+    assert len(timeline.dts) == 48
+    assert timeline.get_end_time() == model.time
+    assert timeline.memory == counted_memory(timeline)
+    np.testing.assert_allclose(timeline.positions_at(model.time),
+                               model.get_positions(), rtol=1e-6)
@@ -0,0 +1,120 @@
+# coding:utf-8
+import json
+
+import numpy as np
+import pytest
+
+from solar_system.input import solar_trajectory as trj
+
+
+def write_trajectory(path, times, pos):
+    # файл в формате TrajectoryRecorder без модели
+    bodies = pos.shape[1]
+    header = json.dumps({"bodies": bodies, "every": 1,
+                         "m": [1.0] * bodies}).encode()
+    rows = np.column_stack((times, pos.reshape(len(times), -1)))
+    with open(path, 'wb') as file:
+        file.write((trj.MAGIC + header).ljust(trj.HEADER_SIZE))
+        file.write(rows.astype(np.float64).tobytes())
+
+
+def random_walk(rows, bodies, seed):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((rows, bodies, 2)).cumsum(axis=0)
+
+
+def test_reduce_minmax_keeps_group_extremes():
+    group = trj.FACTOR ** 2
+    pos = random_walk(group * 50, 3, 1)
+    pos[group * 7:group * 9, 1] = np.nan
+    index = np.broadcast_to(np.arange(len(pos))[:, np.newaxis],
+                            pos.shape[:2])
+
+    new_index, new_pos = trj.reduce_minmax(index, pos)
+
+    assert new_index.shape == (len(pos) // trj.FACTOR, 3)
+    np.testing.assert_array_equal(
+        new_pos, pos[new_index, np.arange(3)])
+    for g in range(50):
+        rows = slice(g * group, (g + 1) * group)
+        chosen = slice(g * trj.FACTOR, (g + 1) * trj.FACTOR)
+        # точки группы идут в порядке времени и лежат в ней
+        assert np.all(np.diff(new_index[chosen], axis=0) >= 0)
+        assert np.all(new_index[chosen] // group == g)
+        for body in range(3):
+            present = pos[rows, body]
+            if np.isnan(present).all():
+                continue
+            kept = new_pos[chosen, body]
+            np.testing.assert_array_equal(kept.min(axis=0),
+                                          present.min(axis=0))
+            np.testing.assert_array_equal(kept.max(axis=0),
+                                          present.max(axis=0))
+
+
+def test_pad_repeats_last_point():
+    index = np.arange(5)[:, np.newaxis]
+    pos = np.arange(10.0).reshape(5, 1, 2)
+    index, pos = trj.pad(index, pos, 4)
+
+    assert index.ravel().tolist() == [0, 1, 2, 3, 4, 4, 4, 4]
+    np.testing.assert_array_equal(pos[-3:], np.repeat(pos[4:5], 3, axis=0))
+
+
+@pytest.fixture
+def recording(tmp_path):
+    rows = 100003
+    times = np.arange(rows) * 0.5
+    pos = random_walk(rows, 2, 2)
+    # второй объект исчез (слился) в середине записи
+    pos[rows // 2:, 1] = np.nan
+    path = str(tmp_path / "trajectory.bin")
+    write_trajectory(path, times, pos)
+    return path, times, pos
+
+
+def test_pyramid_keeps_extremes(recording):
+    path, times, pos = recording
+    pyramid = trj.Pyramid(path)
+
+    for body in range(2):
+        fetched_times, fetched, level = pyramid.fetch(body, pixels=100)
+        present = ~np.isnan(pos[:, body, 0])
+        assert level > 0
+        assert len(fetched) <= 4 * trj.POINTS_PER_PIXEL * 100
+        assert np.all(np.diff(fetched_times) >= 0)
+        np.testing.assert_array_equal(fetched.min(axis=0),
+                                      pos[present, body].min(axis=0))
+        np.testing.assert_array_equal(fetched.max(axis=0),
+                                      pos[present, body].max(axis=0))
+
+
+@pytest.mark.parametrize("mode", trj.MODES)
+def test_pyramid_fetch_interval(recording, mode):
+    path, times, pos = recording
+    pyramid = trj.Pyramid(path)
+
+    for pixels in (10, 300, 100000):
+        fetched_times, fetched, level = pyramid.fetch(
+            0, 1000.25, 31000, pixels=pixels, mode=mode)
+        assert fetched_times[0] >= 1000.25 and fetched_times[-1] <= 31000
+        # в minmax одна точка может быть выбрана за два выброса
+        assert np.all(np.diff(fetched_times) >= 0)
+        rows = (fetched_times / 0.5).astype(int)
+        np.testing.assert_array_equal(fetched, pos[rows, 0])
+        if pixels == 100000:
+            assert level == 0 and len(fetched) == 60000
+
+
+def test_pyramid_rebuilt_after_change(recording):
+    path, times, pos = recording
+    first = trj.Pyramid(path).meta
+
+    write_trajectory(path, times[:5000], pos[:5000])
+    pyramid = trj.Pyramid(path)
+
+    assert pyramid.meta["rows"] == 5000 != first["rows"]
+    fetched_times, _, _ = pyramid.fetch(0, pixels=10)
+    assert fetched_times[-1] <= times[4999]
+    with pytest.raises(ValueError):
+        pyramid.fetch(0, mode="average")
@@ -0,0 +1,44 @@
+# coding:utf-8
+import pytest
+
+from solar_system.main import solar_headless  # noqa: F401
+from solar_system.main import solar_main as s_main
+
+
+def test_submit_stops_at_queue_limit():
+    # поток не запущен, так что шаги только копятся в очереди
+    worker = s_main.ModelWorker(None, max_pending=5)
+
+    accepted = [worker.submit(0.1) for _ in range(8)]
+
+    assert accepted == [True] * 5 + [False] * 3
+    assert len(worker.pending) == 5 and worker.saturated
+    assert worker.get_lag() == pytest.approx(0.5)
+
+    worker.clear()
+    assert worker.get_lag() == 0 and not worker.saturated
+    assert worker.submit(0.2) and not worker.saturated
+
+
+def test_running_worker_drains_lag():
+    class Manager:
+        lock = s_main.threading.Lock()
+        steps = []
+
+        def step(self, dt):
+            self.steps.append(dt)
+
+    manager = Manager()
+    worker = s_main.ModelWorker(manager)
+    for _ in range(s_main.MAX_PENDING + 3):
+        worker.submit(1 / 3)
+    worker.start()
+
+    deadline = s_main.time.perf_counter() + 5
+    while worker.pending and s_main.time.perf_counter() < deadline:
+        s_main.time.sleep(0.01)
+    worker.stop()
+
+    assert len(manager.steps) == s_main.MAX_PENDING
+    # сумма очереди обнуляется точно, без ошибок округления
+    assert worker.get_lag() == 0